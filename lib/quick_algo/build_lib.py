@@ -72,6 +72,8 @@ def run_build_sdist(args):
     if args.compile_no_simd:
         # 添加临时环境变量
         os.environ["QUICK_ALGO_NO_SIMD"] = "1"
+    if args.compile_no_openmp:
+        os.environ["QUICK_ALGO_NO_OPENMP"] = "1"
 
     try:
         result = subprocess.run(
@@ -94,6 +96,8 @@ def run_build_wheel(args):
     if args.compile_no_simd:
         # 添加临时环境变量
         os.environ["QUICK_ALGO_NO_SIMD"] = "1"
+    if args.compile_no_openmp:
+        os.environ["QUICK_ALGO_NO_OPENMP"] = "1"
 
     try:
         result = subprocess.run(
@@ -116,6 +120,8 @@ def run_install(args):
     if args.compile_no_simd:
         # 添加临时环境变量
         os.environ["QUICK_ALGO_NO_SIMD"] = "1"
+    if args.compile_no_openmp:
+        os.environ["QUICK_ALGO_NO_OPENMP"] = "1"
 
     try:
         result = subprocess.run(
@@ -177,6 +183,7 @@ if __name__ == "__main__":
     arg_parser.add_argument("--build_wheel", action="store_true", default=False, help="Build the wheel distribution")
     arg_parser.add_argument("--install", action="store_true", default=False, help="Directly install the package")
     arg_parser.add_argument("--compile_no_simd", action="store_true", default=False, help="Compile without SIMD optimization")
+    arg_parser.add_argument("--compile_no_openmp", action="store_true", default=False, help="Compile without OpenMP (single-threaded PageRank)")
     args = arg_parser.parse_args()
 
     main(args)
\ No newline at end of file
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 import os
 import sys
+import tempfile
 import cpuinfo
 
 from setuptools import find_packages, setup, Extension
@@ -10,10 +11,19 @@ platform_info = {
     "os": "Unknown",  # 操作系统
     "avx2": False,      # 是否支持AVX2指令集
     "neon": False,      # 是否支持ARM NEON指令集
+    "openmp": False,    # 编译器是否支持OpenMP
 }
 
 build_args = {
-    "no-simd": os.getenv("QUICK_ALGO_NO_SIMD") == "1"
+    "no-simd": os.getenv("QUICK_ALGO_NO_SIMD") == "1",
+    "no-openmp": os.getenv("QUICK_ALGO_NO_OPENMP") == "1",
+}
+
+# 各平台的OpenMP编译/链接参数
+openmp_args = {
+    "Linux": (["-fopenmp"], ["-fopenmp"]),
+    "Windows": (["/openmp"], []),
+    "macOS": (["-Xpreprocessor", "-fopenmp"], ["-lomp"]),
 }
 
 # 获取平台信息
@@ -68,6 +78,31 @@ def get_platform_info():
             if "avx2" in cpu_info.get("flags", []):
                 platform_info["avx2"] = True
 
+# 检查编译器是否支持OpenMP（尝试编译并链接一个使用OpenMP的测试程序）
+def check_openmp_support(compile_args, link_args):
+    try:
+        from setuptools._distutils import ccompiler, sysconfig
+    except ImportError:
+        from distutils import ccompiler, sysconfig
+
+    compiler = ccompiler.new_compiler()
+    sysconfig.customize_compiler(compiler)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = os.path.join(tmp_dir, "test_openmp.cpp")
+        with open(source, "w") as f:
+            f.write(
+                "#include <omp.h>\n"
+                "int main() { return omp_get_max_threads() > 0 ? 0 : 1; }\n"
+            )
+        try:
+            objects = compiler.compile([source], output_dir=tmp_dir, extra_postargs=compile_args)
+            compiler.link_executable(
+                objects, os.path.join(tmp_dir, "test_openmp"), extra_postargs=link_args
+            )
+        except Exception:
+            return False
+    return True
+
 # 生成构建参数
 def get_compile_and_link_args():
     get_platform_info()
@@ -99,6 +134,20 @@ def get_compile_and_link_args():
     
     link_args = []
 
+    # 编译器支持时启用OpenMP（PageRank多线程计算）
+    if not build_args["no-openmp"] and platform_info["os"] in openmp_args:
+        omp_compile_args, omp_link_args = openmp_args[platform_info["os"]]
+        if check_openmp_support(omp_compile_args, omp_link_args):
+            platform_info["openmp"] = True
+            compile_args.extend(omp_compile_args)
+            link_args.extend(omp_link_args)
+            print("Enabled OpenMP support")
+        else:
+            print("OpenMP is not supported by the compiler, building without OpenMP")
+    if not platform_info["openmp"] and platform_info["os"] in ("Linux", "macOS"):
+        # 未启用OpenMP时忽略源码中的OpenMP编译指令
+        compile_args.append("-Wno-unknown-pragmas")
+
     return compile_args, link_args
 
 # 获取扩展模块
@@ -0,0 +1,116 @@
+#ifndef CSR_GRAPH_H
+#define CSR_GRAPH_H
+
+#include <stdio.h>
+#include <stdexcept>
+#include <vector>
+
+#include "di_graph.hpp"
+
+/**
+ * @brief 有向图的CSR（压缩稀疏行）快照
+ *
+ * 按目标节点组织入边：节点i的入边为[indptr[i], indptr[i + 1])，
+ * 其中indices为源节点ID，weights为按源节点出边权重和归一化后的权重。
+ * 同时按源节点组织出边（out_indptr/out_indices/out_weights，权重同样归一化），供前向推送使用。
+ * 快照构建后与原图无关，原图变化后需重新构建。
+ * （仅含头文件实现，供各扩展模块共同使用）
+ */
+class CSRGraph
+{
+public:
+    long long node_array_size; // 节点数组大小（包含已删除节点留下的空位）
+    long long num_nodes;       // 节点数量
+    long long num_edges;       // 边数量
+
+    std::vector<long long> indptr;  // 各节点入边的起始位置（长度为node_array_size + 1）
+    std::vector<long long> indices; // 入边的源节点ID
+    std::vector<double> weights;    // 入边的归一化权重
+    std::vector<char> valid;        // 节点是否有效（未被删除）
+    std::vector<char> dangling;     // 节点是否为悬挂节点（出边权重和为0的有效节点）
+
+    std::vector<long long> out_indptr;  // 各节点出边的起始位置（长度为node_array_size + 1）
+    std::vector<long long> out_indices; // 出边的目标节点ID
+    std::vector<double> out_weights;    // 出边的归一化权重
+
+    CSRGraph(CDiGraph *graph)
+    {
+        node_array_size = graph->nodes->size();
+        num_nodes = graph->num_nodes;
+        num_edges = graph->num_edges;
+
+        indptr.assign(node_array_size + 1, 0);
+        out_indptr.assign(node_array_size + 1, 0);
+        valid.assign(node_array_size, 0);
+        dangling.assign(node_array_size, 0);
+
+        // 计算各节点的出边权重之和
+        std::vector<double> out_weight_sum(node_array_size, 0.0L);
+        for (long long i = 0; i < node_array_size; i++)
+        {
+            CDiNode *node = graph->nodes->at(i);
+            if (node == NULL)
+                continue; // 跳过无效节点
+            valid[i] = 1;
+
+            CDiEdge *edge = node->first_out_edge;
+            while (edge != NULL)
+            {
+                out_weight_sum[i] += edge->weight; // 累加出边权重
+                edge = edge->next_same_src;        // 移动到下一条同源边
+            }
+            if (out_weight_sum[i] < 0)
+            {
+                // 出边权重和小于零，异常退出
+                printf("[Err] Sum of out weights is negative for node %lld\n", i);
+                throw std::runtime_error("Sum of out weights is negative");
+            }
+            dangling[i] = out_weight_sum[i] == 0.0L;
+            indptr[i + 1] = node->num_in_edges;
+            out_indptr[i + 1] = node->num_out_edges;
+        }
+        for (long long i = 0; i < node_array_size; i++)
+        {
+            indptr[i + 1] += indptr[i];
+            out_indptr[i + 1] += out_indptr[i];
+        }
+
+        // 填充入边（保持入边链表中的顺序）
+        indices.resize(indptr[node_array_size]);
+        weights.resize(indptr[node_array_size]);
+        for (long long i = 0; i < node_array_size; i++)
+        {
+            if (!valid[i])
+                continue;
+            CDiEdge *edge = graph->nodes->at(i)->first_in_edge;
+            long long j = indptr[i];
+            while (edge != NULL && j < indptr[i + 1])
+            {
+                indices[j] = edge->src;                                 // 源节点ID
+                weights[j] = edge->weight / out_weight_sum[edge->src]; // 权重归一化
+                edge = edge->next_same_dst;                             // 移动到下一条同目标边
+                j++;
+            }
+        }
+
+        // 填充出边（保持出边链表中的顺序）
+        out_indices.resize(out_indptr[node_array_size]);
+        out_weights.resize(out_indptr[node_array_size]);
+        for (long long i = 0; i < node_array_size; i++)
+        {
+            if (!valid[i] || dangling[i])
+                continue; // 悬挂节点的出边权重均为0，不参与推送
+            CDiEdge *edge = graph->nodes->at(i)->first_out_edge;
+            long long j = out_indptr[i];
+            while (edge != NULL && j < out_indptr[i + 1])
+            {
+                out_indices[j] = edge->dst;                        // 目标节点ID
+                out_weights[j] = edge->weight / out_weight_sum[i]; // 权重归一化
+                edge = edge->next_same_src;                        // 移动到下一条同源边
+                j++;
+            }
+        }
+    }
+};
+
+#endif // CSR_GRAPH_H
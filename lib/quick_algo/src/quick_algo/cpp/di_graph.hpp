@@ -41,6 +41,10 @@ public:
     CDiNode *get_node(long long id);
     // 获取边
     CDiEdge *get_edge(long long src, long long dst);
+    // 批量插入/更新边
+    int upsert_edges(long long num, const long long *src, const long long *dst, const double *weights, bool accumulate, char *is_new);
+    // 从CSR数组批量构建图（要求图为空）
+    int load_csr(long long num_nodes, const long long *indptr, const long long *indices, const double *weights);
 };
 
 /**
@@ -221,8 +221,10 @@ int CDiGraph::remove_node(long long id)
             this->nodes->at(edge->dst)->first_in_edge = edge->next_same_dst;
         if (edge->next_same_dst != NULL) // 如果有同目标后继边，更新后继边的同目标前驱指针
             edge->next_same_dst->prev_same_dst = edge->prev_same_dst;
-        delete edge;      // 删除边
-        edge = next_edge; // 更新当前边为下一条边
+        this->nodes->at(edge->dst)->num_in_edges--; // 目标节点的入边数量减1
+        delete edge;       // 删除边
+        this->num_edges--; // 边数量减1
+        edge = next_edge;  // 更新当前边为下一条边
     }
 
     // 删除节点的入边
@@ -239,8 +241,10 @@ int CDiGraph::remove_node(long long id)
             this->nodes->at(edge->src)->first_out_edge = edge->next_same_src;
         if (edge->next_same_src != NULL) // 如果有同源后继边，更新后继边的同源前驱指针
             edge->next_same_src->prev_same_src = edge->prev_same_src;
-        delete edge;      // 删除边
-        edge = next_edge; // 更新当前边为下一条边
+        this->nodes->at(edge->src)->num_out_edges--; // 源节点的出边数量减1
+        delete edge;       // 删除边
+        this->num_edges--; // 边数量减1
+        edge = next_edge;  // 更新当前边为下一条边
     }
 
     // 释放节点内存
@@ -431,4 +435,140 @@ CDiEdge *CDiGraph::get_edge(long long src, long long dst)
     }
 
     return edge; // 返回找到的边结构体指针
-}
\ No newline at end of file
+}
+
+/**
+ * @brief 批量插入/更新边：边不存在时添加新边，已存在时累加（或覆盖）其权重
+ *
+ * 执行前先校验所有节点，任一节点无效时不修改图
+ *
+ * @param num 边数量
+ * @param src 源节点ID数组
+ * @param dst 目标节点ID数组
+ * @param weights 边权重数组
+ * @param accumulate 已存在的边：true表示累加权重，false表示覆盖权重
+ * @param is_new 输出数组，记录每条边是否为新添加的边（同一批次中重复的边，仅首次出现时为新边）
+ *
+ * @return int 返回0表示成功，-1表示失败
+ */
+int CDiGraph::upsert_edges(long long num, const long long *src, const long long *dst, const double *weights, bool accumulate, char *is_new)
+{
+    long long num_slots = (long long)this->nodes->size(); // 节点数组大小
+
+    // 校验节点
+    for (long long i = 0; i < num; i++)
+    {
+        if (src[i] < 0 || src[i] >= num_slots || this->nodes->at(src[i]) == NULL)
+            return -1; // 返回错误代码
+        if (dst[i] < 0 || dst[i] >= num_slots || this->nodes->at(dst[i]) == NULL)
+            return -1; // 返回错误代码
+    }
+
+    for (long long i = 0; i < num; i++)
+    {
+        CDiEdge *edge = this->get_edge(src[i], dst[i]);
+        if (edge == NULL)
+        {
+            // 新边
+            if (this->add_edge(src[i], dst[i], weights[i]) != 0)
+                return -1; // 返回错误代码
+            is_new[i] = 1;
+        }
+        else
+        {
+            // 已存在的边
+            edge->weight = accumulate ? edge->weight + weights[i] : weights[i];
+            is_new[i] = 0;
+        }
+    }
+
+    return 0; // 返回成功代码
+}
+
+/**
+ * @brief 从CSR数组批量构建图
+ *
+ * 节点i的出边为[indptr[i], indptr[i + 1])，每行的目标节点须严格升序；
+ * 按行依次追加到出边/入边链表的末尾，所得链表顺序与逐条add_edge相同，总耗时与边数成线性关系
+ *
+ * @param num_nodes 节点数量（节点ID为0 ~ num_nodes - 1）
+ * @param indptr 各节点出边的起始位置（长度为num_nodes + 1）
+ * @param indices 出边的目标节点ID
+ * @param weights 出边的权重
+ * @return 0表示成功，-1表示图非空或CSR数组无效（此时图保持不变）
+ */
+int CDiGraph::load_csr(long long num_nodes, const long long *indptr, const long long *indices, const double *weights)
+{
+    if (this->num_nodes != 0 || !this->nodes->empty() || num_nodes < 0)
+        return -1; // 仅支持从空图构建
+
+    // 校验CSR数组
+    if (indptr[0] != 0)
+        return -1;
+    for (long long i = 0; i < num_nodes; i++)
+    {
+        if (indptr[i + 1] < indptr[i])
+            return -1;
+        for (long long j = indptr[i]; j < indptr[i + 1]; j++)
+        {
+            if (indices[j] < 0 || indices[j] >= num_nodes)
+                return -1; // 目标节点无效
+            if (j > indptr[i] && indices[j] <= indices[j - 1])
+                return -1; // 目标节点未严格升序（或有重复边）
+        }
+    }
+
+    // 创建节点
+    this->nodes->reserve(num_nodes);
+    for (long long i = 0; i < num_nodes; i++)
+    {
+        CDiNode *new_node = new CDiNode(i);
+        if (new_node == NULL)
+            throw std::bad_alloc(); // 抛出异常
+        this->nodes->push_back(new_node);
+    }
+    this->num_nodes = num_nodes;
+
+    // 按行追加边（各节点入边链表的末尾）
+    std::vector<CDiEdge *> last_in_edge(num_nodes, NULL);
+    for (long long i = 0; i < num_nodes; i++)
+    {
+        CDiNode *src_node = this->nodes->at(i);
+        CDiEdge *last_out_edge = NULL;
+        for (long long j = indptr[i]; j < indptr[i + 1]; j++)
+        {
+            long long dst = indices[j];
+            CDiNode *dst_node = this->nodes->at(dst);
+            CDiEdge *new_edge = new CDiEdge(i, dst, weights[j]);
+            if (new_edge == NULL)
+                throw std::bad_alloc(); // 抛出异常
+
+            // 追加到源节点的出边列表末尾
+            if (last_out_edge == NULL)
+                src_node->first_out_edge = new_edge;
+            else
+            {
+                last_out_edge->next_same_src = new_edge;
+                new_edge->prev_same_src = last_out_edge;
+            }
+            last_out_edge = new_edge;
+            src_node->num_out_edges++;
+
+            // 追加到目标节点的入边列表末尾（按行处理，入边按源节点ID升序）
+            if (last_in_edge[dst] == NULL)
+                dst_node->first_in_edge = new_edge;
+            else
+            {
+                last_in_edge[dst]->next_same_dst = new_edge;
+                new_edge->prev_same_dst = last_in_edge[dst];
+            }
+            last_in_edge[dst] = new_edge;
+            dst_node->num_in_edges++;
+
+            this->num_edges++;
+        }
+    }
+
+    return 0;
+}
+
@@ -4,19 +4,22 @@
 // #define __AVX2__ // 启用AVX2优化（影响：小）
 
 #include "di_graph.hpp"
+#include "csr_graph.hpp"
 
-class EdgeWeight
+class PageRankStats
 {
 public:
-    long long src; // 源节点ID
-    double weight; // 权重
+    int num_iter;   // 实际迭代次数
+    double diff;    // 最后一次迭代的残差（分数变化量的L1范数）
+    bool converged; // 是否在达到最大迭代次数前收敛
 };
 
-class EdgeList
+class PushStats
 {
 public:
-    long long edge_num; // 边数量
-    EdgeWeight *edges;  // 边权重列表
+    long long num_pushes;  // 推送次数
+    long long num_touched; // 访问到的节点数
+    double residual;       // 剩余残差之和（近似结果与精确结果之差的L1范数上界）
 };
 
 double *pagerank(
@@ -26,7 +29,62 @@ double *pagerank(
     double *dangling_weight_vec, // 悬挂节点权重向量（已概率归一化）
     double alpha,                // 阻尼系数
     int max_iter,                // 最大迭代次数
-    double tol                   // 收敛阈值
+    double tol,                  // 收敛阈值
+    PageRankStats *stats = NULL, // 输出：迭代统计信息（可为NULL）
+    int num_threads = 0          // 线程数（不大于0时使用OpenMP的默认线程数）
 );
 
+double *pagerank_csr(
+    const CSRGraph *graph,       // 图的CSR快照
+    double *init_score_vec,      // 初始节点分数向量（已概率归一化）
+    double *personalization_vec, // 个性化向量（已概率归一化）
+    double *dangling_weight_vec, // 悬挂节点权重向量（已概率归一化）
+    double alpha,                // 阻尼系数
+    int max_iter,                // 最大迭代次数
+    double tol,                  // 收敛阈值
+    PageRankStats *stats = NULL, // 输出：迭代统计信息（可为NULL）
+    int num_threads = 0          // 线程数（不大于0时使用OpenMP的默认线程数）
+);
+
+double *pagerank_csr_batch(
+    const CSRGraph *graph,        // 图的CSR快照
+    long long num_vectors,        // 个性化向量数B
+    double *init_score_mat,       // 初始节点分数矩阵（node_array_size x B，按节点行优先，各列已概率归一化）
+    double *personalization_mat,  // 个性化矩阵（格式同上）
+    double *dangling_weight_mat,  // 悬挂节点权重矩阵（格式同上）
+    double alpha,                 // 阻尼系数
+    int max_iter,                 // 最大迭代次数
+    double tol,                   // 收敛阈值
+    PageRankStats *stats = NULL,  // 输出：各列的迭代统计信息（长度为B，可为NULL）
+    int num_threads = 0           // 线程数（不大于0时使用OpenMP的默认线程数）
+);
+
+long long top_k_nodes(
+    const CSRGraph *graph,        // 图的CSR快照
+    const double *score,          // 节点分数向量
+    const long long *candidates,  // 候选节点索引（为NULL时由mask确定）
+    long long num_candidates,     // 候选节点数
+    const unsigned char *mask,    // 候选节点掩码（为NULL时所有节点均为候选节点）
+    long long top_k,              // 返回的节点数
+    long long *out_idx            // 输出：按分数降序排列的节点索引（容量不小于top_k）
+);
+
+long long pagerank_push(
+    const CSRGraph *graph,        // 图的CSR快照
+    long long num_seeds,          // 种子节点数
+    const long long *seed_idx,    // 种子节点索引
+    const double *seed_weight,    // 种子节点的个性化权重（已概率归一化）
+    double alpha,                 // 阻尼系数
+    double epsilon,               // 残差阈值（节点残差不小于epsilon * 出度时推送）
+    const long long *candidates,  // 候选节点索引（为NULL时由mask确定）
+    long long num_candidates,     // 候选节点数
+    const unsigned char *mask,    // 候选节点掩码（为NULL时所有节点均为候选节点）
+    long long top_k,              // 返回的节点数
+    long long *out_idx,           // 输出：按分数降序排列的节点索引（容量不小于top_k）
+    double *out_score,            // 输出：对应的近似分数（容量不小于top_k）
+    PushStats *stats = NULL       // 输出：推送统计信息（可为NULL）
+);
+
+bool pagerank_openmp_enabled(); // 是否启用了OpenMP多线程
+
 #endif // PAGERANK_H
\ No newline at end of file
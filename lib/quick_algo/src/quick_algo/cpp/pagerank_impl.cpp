@@ -3,6 +3,8 @@
 #include <stdexcept>
 #include <stdlib.h>
 #include <math.h>
+#include <algorithm>
+#include <vector>
 
 #include "pagerank.hpp"
 
@@ -10,32 +12,25 @@
 #include <immintrin.h> // SIMD指令集头文件
 #endif
 
+#ifdef _OPENMP
+#include <omp.h> // OpenMP头文件
+#endif
+
+// 节点数组小于该大小时不启用多线程（线程调度的开销大于收益）
+static const long long PARALLEL_MIN_NODE_ARRAY_SIZE = 4096;
+// 逐行传播时每次分配给线程的行数（各行入边数差异较大，使用动态调度）
+static const long long PARALLEL_CHUNK_SIZE = 1024;
+
 /**
- * @brief 释放内存
- *
- * @param graph
- * @param weight_matrix
- * @param score
+ * @brief 是否启用了OpenMP多线程
  */
-void clean_up(CDiGraph *graph, EdgeList *weight_matrix, double *out_weight_sum, double *score)
+bool pagerank_openmp_enabled()
 {
-    if (graph != NULL && weight_matrix != NULL)
-    {
-        for (long long i = 0; i < graph->nodes->size(); i++)
-        {
-            if (weight_matrix[i].edges != NULL)
-            {
-                free(weight_matrix[i].edges); // 释放边权重列表
-            }
-        }
-        free(weight_matrix); // 释放权重矩阵指针
-    }
-
-    if (out_weight_sum != NULL)
-        free(out_weight_sum); // 释放出边权重和数组
-
-    if (score != NULL)
-        free(score); // 释放Score向量
+#ifdef _OPENMP
+    return true;
+#else
+    return false;
+#endif
 }
 
 /**
@@ -48,84 +43,45 @@ double *pagerank(
     double *dangling_weight_vec, // 悬挂节点权重向量（已概率归一化）
     double alpha,                // 阻尼系数
     int max_iter,                // 最大迭代次数
-    double tol                   // 收敛阈值
+    double tol,                  // 收敛阈值
+    PageRankStats *stats,        // 输出：迭代统计信息（可为NULL）
+    int num_threads              // 线程数（不大于0时使用OpenMP的默认线程数）
 )
 {
-    long long node_array_size = graph->nodes->size(); // 节点数量
-
-    EdgeList *weight_matrix = (EdgeList *)calloc(node_array_size, sizeof(EdgeList)); // 同目标边权重矩阵
-    if (weight_matrix == NULL)
-    {
-        // 内存分配失败，释放已分配的内存并返回NULL
-        printf("[Err] Memory allocation failed for weight_matrix array\n");
-        clean_up(graph, NULL, NULL, NULL);
-        throw std::bad_alloc(); // 抛出异常
-    }
-    double *out_weight_sum = (double *)calloc(node_array_size, sizeof(double)); // 出边权重和
-    if (out_weight_sum == NULL)
-    {
-        // 内存分配失败，释放已分配的内存并返回NULL
-        printf("[Err] Memory allocation failed for out_weight_sum array\n");
-        clean_up(graph, weight_matrix, NULL, NULL);
-        throw std::bad_alloc(); // 抛出异常
-    }
-
-    {
-        for (long long i = 0; i < node_array_size; i++)
-        {
-            if (graph->nodes->at(i) == NULL)
-            {
-                weight_matrix[i].edge_num = -1; // 边数量为-1（表示无效）
-                weight_matrix[i].edges = NULL;  // 如果节点为空，则边权重列表也为空
-                out_weight_sum[i] = 0.0L;       // 出边权重和为0
-            }
-            else
-            {
-                {
-                    // 计算当前节点的出边权重之和
-                    CDiEdge *edge = graph->nodes->at(i)->first_out_edge; // 获取节点的第一条出边
-                    while (edge != NULL)
-                    {
-                        out_weight_sum[i] += edge->weight; // 累加出边权重
-                        edge = edge->next_same_src;        // 移动到下一条同源边
-                    }
-                    if (out_weight_sum[i] < 0)
-                    {
-                        // 出边权重和小于零，异常退出
-                        printf("[Err] Sum of out weights is negative for node %lld\n", i);
-                        clean_up(graph, weight_matrix, out_weight_sum, NULL);
-                        throw std::runtime_error("Sum of out weights is negative"); // 抛出异常
-                    }
-                }
+    // 构建临时CSR快照（多次计算时应复用快照，见pagerank_csr）
+    CSRGraph csr(graph);
+    return pagerank_csr(&csr, init_score_vec, personalization_vec, dangling_weight_vec, alpha, max_iter, tol, stats, num_threads);
+}
 
-                weight_matrix[i].edge_num = graph->nodes->at(i)->num_in_edges;                                // 获取入边数量
-                weight_matrix[i].edges = (EdgeWeight *)calloc(weight_matrix[i].edge_num, sizeof(EdgeWeight)); // 分配内存
-                if (weight_matrix[i].edges == NULL)
-                {
-                    // 内存分配失败，释放已分配的内存并返回NULL
-                    printf("[Err] Memory allocation failed for weight_matrix[%lld]->edges\n", i);
-                    clean_up(graph, weight_matrix, out_weight_sum, NULL);
-                    throw std::bad_alloc(); // 抛出异常
-                }
-            }
-        }
+/**
+ * 基于CSR快照的个性化PageRank算法（无需逐次构建权重矩阵）
+ */
+double *pagerank_csr(
+    const CSRGraph *graph,       // 图的CSR快照
+    double *init_score_vec,      // 初始节点分数向量（已概率归一化）
+    double *personalization_vec, // 个性化向量（已概率归一化）
+    double *dangling_weight_vec, // 悬挂节点权重向量（已概率归一化）
+    double alpha,                // 阻尼系数
+    int max_iter,                // 最大迭代次数
+    double tol,                  // 收敛阈值
+    PageRankStats *stats,        // 输出：迭代统计信息（可为NULL）
+    int num_threads              // 线程数（不大于0时使用OpenMP的默认线程数）
+)
+{
+    long long node_array_size = graph->node_array_size; // 节点数组大小
+    const long long *indptr = graph->indptr.data();     // 各节点入边的起始位置
+    const long long *indices = graph->indices.data();   // 入边的源节点ID
+    const double *weights = graph->weights.data();      // 入边的归一化权重
+    const char *valid = graph->valid.data();            // 节点是否有效
+    const char *dangling = graph->dangling.data();      // 节点是否为悬挂节点
 
-        // 填充权重矩阵
-        for (long long i = 0; i < node_array_size; i++)
-        {
-            if (weight_matrix[i].edge_num < 0)
-                continue;                                       // 跳过无效节点
-            CDiEdge *edge = graph->nodes->at(i)->first_in_edge; // 获取节点的第一条入边
-            long long j = 0;
-            while (edge != NULL && j < weight_matrix[i].edge_num)
-            {
-                weight_matrix[i].edges[j].src = edge->src;                                   // 源节点ID
-                weight_matrix[i].edges[j].weight = edge->weight / out_weight_sum[edge->src]; // 权重归一化
-                edge = edge->next_same_dst;                                                  // 移动到下一条同目标边
-                j++;
-            }
-        }
-    }
+#ifdef _OPENMP
+    if (num_threads <= 0)
+        num_threads = omp_get_max_threads();
+#endif
+    if (num_threads <= 0)
+        num_threads = 1;
+    bool parallel = num_threads > 1 && node_array_size >= PARALLEL_MIN_NODE_ARRAY_SIZE; // 是否多线程计算
 
     // 初始化Score向量
     double *score = (double *)calloc(node_array_size, sizeof(double)); // 初始化Score向量为0
@@ -133,7 +89,6 @@ double *pagerank(
     {
         // 内存分配失败，释放已分配的内存并返回NULL
         printf("[Err] Memory allocation failed for score\n");
-        clean_up(graph, weight_matrix, out_weight_sum, NULL);
         throw std::bad_alloc(); // 抛出异常
     }
     for (long long i = 0; i < node_array_size; i++)
@@ -141,6 +96,13 @@ double *pagerank(
         score[i] = init_score_vec[i]; // 使用init_score_vec初始化Score向量
     }
 
+    if (stats != NULL)
+    {
+        stats->num_iter = 0;
+        stats->diff = 0.0L;
+        stats->converged = false;
+    }
+
     // 迭代计算PageRank
     for (int iter = 0; iter < max_iter; iter++)
     {
@@ -150,18 +112,16 @@ double *pagerank(
         {
             // 内存分配失败，释放已分配的内存并返回NULL
             printf("[Err] Memory allocation failed for new_score\n");
-            clean_up(graph, weight_matrix, out_weight_sum, last_score);
+            free(last_score);
             throw std::bad_alloc(); // 抛出异常
         }
 
         // 统计悬挂节点贡献的总量
         double dangling_sum = 0.0L; // 悬挂节点贡献的总量
+#pragma omp parallel for reduction(+ : dangling_sum) num_threads(num_threads) if (parallel) schedule(static)
         for (long long i = 0; i < node_array_size; i++)
         {
-            if (weight_matrix[i].edge_num < 0)
-                continue; // 跳过无效节点
-
-            if (out_weight_sum[i] == 0.0L)
+            if (dangling[i])
             {
                 dangling_sum += last_score[i]; // 累加悬挂节点的Score
             }
@@ -196,7 +156,7 @@ double *pagerank(
             }
             for (; i < node_array_size; ++i)
             {
-                if (weight_matrix[i].edge_num < 0)
+                if (!valid[i])
                     continue; // 跳过无效节点
 
                 // 计算悬挂节点贡献和个性化向量贡献
@@ -204,25 +164,27 @@ double *pagerank(
                 score[i] += (1.0 - alpha) * personalization_vec[i]; // 个性化向量贡献
             }
         }
-        // 2. 计算节点间传播贡献
+        // 2. 计算节点间传播贡献（各行相互独立，按行并行）
         {
+#pragma omp parallel for num_threads(num_threads) if (parallel) schedule(dynamic, PARALLEL_CHUNK_SIZE)
             for (long long i = 0; i < node_array_size; ++i)
             {
-                if (weight_matrix[i].edge_num < 0)
+                if (!valid[i])
                     continue; // 跳过无效节点
 
                 double sum_propagation = 0.0L; // 节点间传播贡献
                 // 遍历所有入边
-                for (long long j = 0; j < weight_matrix[i].edge_num; j++)
-                    sum_propagation += last_score[weight_matrix[i].edges[j].src] * weight_matrix[i].edges[j].weight;
+                for (long long j = indptr[i]; j < indptr[i + 1]; j++)
+                    sum_propagation += last_score[indices[j]] * weights[j];
                 score[i] += sum_propagation * alpha; // 节点间传播贡献
             }
         }
 #else
-        // 使用普通循环计算
+        // 使用普通循环计算（各行相互独立，按行并行）
+#pragma omp parallel for num_threads(num_threads) if (parallel) schedule(dynamic, PARALLEL_CHUNK_SIZE)
         for (long long i = 0; i < node_array_size; i++)
         {
-            if (weight_matrix[i].edge_num < 0)
+            if (!valid[i])
                 continue; // 跳过无效节点
 
             // 计算新的Score向量：1. 计算悬挂节点贡献和个性化向量贡献
@@ -232,25 +194,427 @@ double *pagerank(
             // 计算新的Score向量：2. 计算节点间传播贡献
             double sum_propagation = 0.0L; // 节点间传播贡献
             // 遍历所有入边
-            for (long long j = 0; j < weight_matrix[i].edge_num; j++)
-                sum_propagation += last_score[weight_matrix[i].edges[j].src] * weight_matrix[i].edges[j].weight;
+            for (long long j = indptr[i]; j < indptr[i + 1]; j++)
+                sum_propagation += last_score[indices[j]] * weights[j];
             score[i] += sum_propagation * alpha; // 节点间传播贡献
         }
 #endif
 
         // 检查收敛
         double diff = 0.0L;
+#pragma omp parallel for reduction(+ : diff) num_threads(num_threads) if (parallel) schedule(static)
         for (long long i = 0; i < node_array_size; i++)
             diff += fabs(score[i] - last_score[i]);
 
         // 释放上一次的Score向量
         free(last_score); // 释放上一次的Score向量
 
+        if (stats != NULL)
+        {
+            stats->num_iter = iter + 1;
+            stats->diff = diff;
+        }
+
         if (diff < graph->num_nodes * tol)
+        {
+            if (stats != NULL)
+                stats->converged = true;
             break;
+        }
     }
 
-    clean_up(graph, weight_matrix, out_weight_sum, NULL); // 释放临时Score向量
+    return score;
+}
 
+/**
+ * @brief 批量个性化PageRank算法（稀疏矩阵 x 稠密矩阵迭代）
+ *
+ * 分数矩阵按节点行优先存储（node_array_size x B），每条入边只读取一次即可更新B列；
+ * 各列独立判断收敛，已收敛的列不再参与后续迭代。
+ * 每一列的计算顺序与pagerank_csr一致，单线程时结果与逐个计算相同。
+ */
+double *pagerank_csr_batch(
+    const CSRGraph *graph,        // 图的CSR快照
+    long long num_vectors,        // 个性化向量数B
+    double *init_score_mat,       // 初始节点分数矩阵（node_array_size x B，按节点行优先，各列已概率归一化）
+    double *personalization_mat,  // 个性化矩阵（格式同上）
+    double *dangling_weight_mat,  // 悬挂节点权重矩阵（格式同上）
+    double alpha,                 // 阻尼系数
+    int max_iter,                 // 最大迭代次数
+    double tol,                   // 收敛阈值
+    PageRankStats *stats,         // 输出：各列的迭代统计信息（长度为B，可为NULL）
+    int num_threads               // 线程数（不大于0时使用OpenMP的默认线程数）
+)
+{
+    long long node_array_size = graph->node_array_size; // 节点数组大小
+    long long B = num_vectors;                          // 列数
+    const long long *indptr = graph->indptr.data();     // 各节点入边的起始位置
+    const long long *indices = graph->indices.data();   // 入边的源节点ID
+    const double *weights = graph->weights.data();      // 入边的归一化权重
+    const char *valid = graph->valid.data();            // 节点是否有效
+    const char *dangling = graph->dangling.data();      // 节点是否为悬挂节点
+
+#ifdef _OPENMP
+    if (num_threads <= 0)
+        num_threads = omp_get_max_threads();
+#endif
+    if (num_threads <= 0)
+        num_threads = 1;
+    bool parallel = num_threads > 1 && node_array_size >= PARALLEL_MIN_NODE_ARRAY_SIZE; // 是否多线程计算
+
+    // 两个分数矩阵交替使用
+    double *score = (double *)calloc(node_array_size * B, sizeof(double));
+    double *last_score = (double *)calloc(node_array_size * B, sizeof(double));
+    if (node_array_size * B > 0 && (score == NULL || last_score == NULL))
+    {
+        // 内存分配失败，释放已分配的内存并抛出异常
+        printf("[Err] Memory allocation failed for score matrix\n");
+        free(score);
+        free(last_score);
+        throw std::bad_alloc(); // 抛出异常
+    }
+    for (long long i = 0; i < node_array_size * B; i++)
+    {
+        score[i] = init_score_mat[i]; // 使用init_score_mat初始化Score矩阵
+    }
+
+    if (stats != NULL)
+    {
+        for (long long c = 0; c < B; c++)
+        {
+            stats[c].num_iter = 0;
+            stats[c].diff = 0.0L;
+            stats[c].converged = false;
+        }
+    }
+
+    std::vector<long long> active(B); // 未收敛的列
+    for (long long c = 0; c < B; c++)
+        active[c] = c;
+    std::vector<double> dangling_sum(B); // 各列悬挂节点贡献的总量
+    std::vector<double> diff(B);         // 各列的残差
+
+    // 迭代计算PageRank
+    for (int iter = 0; iter < max_iter && !active.empty(); iter++)
+    {
+        std::swap(score, last_score); // 上一次的Score矩阵
+        const long long *act = active.data();
+        long long num_active = active.size();
+
+        // 统计各列悬挂节点贡献的总量
+        std::fill(dangling_sum.begin(), dangling_sum.end(), 0.0L);
+        for (long long i = 0; i < node_array_size; i++)
+        {
+            if (!dangling[i])
+                continue;
+            const double *row = last_score + i * B;
+            for (long long k = 0; k < num_active; k++)
+                dangling_sum[act[k]] += row[act[k]]; // 累加悬挂节点的Score
+        }
+        for (long long k = 0; k < num_active; k++)
+            dangling_sum[act[k]] = alpha * dangling_sum[act[k]]; // 计算悬挂节点的贡献
+        const double *d_sum = dangling_sum.data();
+
+        // 逐行计算新的Score矩阵（各行相互独立，按行并行）
+#pragma omp parallel num_threads(num_threads) if (parallel)
+        {
+            std::vector<double> sum_propagation(B); // 各列的节点间传播贡献
+            double *acc = sum_propagation.data();
+#pragma omp for schedule(dynamic, PARALLEL_CHUNK_SIZE)
+            for (long long i = 0; i < node_array_size; i++)
+            {
+                if (!valid[i])
+                    continue; // 跳过无效节点
+
+                for (long long k = 0; k < num_active; k++)
+                    acc[act[k]] = 0.0L;
+                // 遍历所有入边，每条边同时更新所有未收敛的列
+                for (long long j = indptr[i]; j < indptr[i + 1]; j++)
+                {
+                    const double *src_row = last_score + indices[j] * B;
+                    double w = weights[j];
+                    for (long long k = 0; k < num_active; k++)
+                        acc[act[k]] += src_row[act[k]] * w;
+                }
+
+                double *row = score + i * B;
+                const double *dw_row = dangling_weight_mat + i * B;
+                const double *p_row = personalization_mat + i * B;
+                for (long long k = 0; k < num_active; k++)
+                {
+                    long long c = act[k];
+                    row[c] = d_sum[c] * dw_row[c];       // 悬挂节点贡献
+                    row[c] += (1.0 - alpha) * p_row[c]; // 个性化向量贡献
+                    row[c] += acc[c] * alpha;           // 节点间传播贡献
+                }
+            }
+        }
+
+        // 检查各列是否收敛
+        std::fill(diff.begin(), diff.end(), 0.0L);
+        for (long long i = 0; i < node_array_size; i++)
+        {
+            const double *row = score + i * B;
+            const double *last_row = last_score + i * B;
+            for (long long k = 0; k < num_active; k++)
+                diff[act[k]] += fabs(row[act[k]] - last_row[act[k]]);
+        }
+
+        std::vector<long long> still_active;
+        still_active.reserve(num_active);
+        for (long long k = 0; k < num_active; k++)
+        {
+            long long c = act[k];
+            if (stats != NULL)
+            {
+                stats[c].num_iter = iter + 1;
+                stats[c].diff = diff[c];
+            }
+            if (diff[c] < graph->num_nodes * tol)
+            {
+                if (stats != NULL)
+                    stats[c].converged = true;
+                // 已收敛的列在两个矩阵中保持一致，后续迭代不再更新
+                for (long long i = 0; i < node_array_size; i++)
+                    last_score[i * B + c] = score[i * B + c];
+            }
+            else
+            {
+                still_active.push_back(c);
+            }
+        }
+        active.swap(still_active);
+    }
+
+    free(last_score);
     return score;
-}
\ No newline at end of file
+}
+
+/**
+ * @brief 对节点索引按分数部分排序，将分数最高的k个写入out_idx
+ *
+ * 按分数降序排列，分数相同时按索引升序排列
+ */
+static long long select_top_k(
+    const double *score,
+    std::vector<long long> &idx_list,
+    long long top_k,
+    long long *out_idx)
+{
+    long long k = std::min(top_k, (long long)idx_list.size());
+    if (k <= 0)
+        return 0;
+
+    std::partial_sort(
+        idx_list.begin(), idx_list.begin() + k, idx_list.end(),
+        [score](long long a, long long b)
+        {
+            if (score[a] != score[b])
+                return score[a] > score[b];
+            return a < b;
+        });
+    std::copy(idx_list.begin(), idx_list.begin() + k, out_idx);
+
+    return k;
+}
+
+/**
+ * @brief 选出候选节点中分数最高的top_k个节点（部分排序）
+ *
+ * @return 实际返回的节点数（不超过top_k与有效候选节点数）
+ */
+long long top_k_nodes(
+    const CSRGraph *graph,
+    const double *score,
+    const long long *candidates,
+    long long num_candidates,
+    const unsigned char *mask,
+    long long top_k,
+    long long *out_idx)
+{
+    long long node_array_size = graph->node_array_size;
+
+    // 收集有效的候选节点（跳过越界索引与已删除节点）
+    std::vector<long long> idx_list;
+    if (candidates != NULL)
+    {
+        idx_list.reserve(num_candidates);
+        for (long long i = 0; i < num_candidates; i++)
+        {
+            long long idx = candidates[i];
+            if (idx >= 0 && idx < node_array_size && graph->valid[idx])
+                idx_list.push_back(idx);
+        }
+    }
+    else
+    {
+        for (long long idx = 0; idx < node_array_size; idx++)
+        {
+            if (graph->valid[idx] && (mask == NULL || mask[idx]))
+                idx_list.push_back(idx);
+        }
+    }
+
+    return select_top_k(score, idx_list, top_k, out_idx);
+}
+
+/**
+ * @brief 基于前向推送（Andersen-Chung-Lang）的近似个性化PageRank
+ *
+ * 残差初始为个性化向量；每次推送将节点残差的(1 - alpha)计入其分数，其余按出边权重分给出边的目标节点
+ * （悬挂节点的残差按个性化向量分给种子节点，与pagerank_csr中悬挂节点权重取个性化向量时一致），
+ * 直至所有节点的残差均小于epsilon * 出度。
+ * 计算量只与推送所及的邻域有关，与图的规模无关（以candidates指定候选节点时另有与候选节点数成正比的开销，
+ * 候选节点较多时应以mask指定）；近似分数不大于精确分数，两者之差的L1范数不超过剩余残差之和。
+ *
+ * @return 实际返回的节点数（仅包含近似分数大于0的候选节点，不超过top_k）
+ */
+long long pagerank_push(
+    const CSRGraph *graph,
+    long long num_seeds,
+    const long long *seed_idx,
+    const double *seed_weight,
+    double alpha,
+    double epsilon,
+    const long long *candidates,
+    long long num_candidates,
+    const unsigned char *mask,
+    long long top_k,
+    long long *out_idx,
+    double *out_score,
+    PushStats *stats)
+{
+    long long node_array_size = graph->node_array_size;   // 节点数组大小
+    const long long *out_indptr = graph->out_indptr.data(); // 各节点出边的起始位置
+    const long long *out_indices = graph->out_indices.data(); // 出边的目标节点ID
+    const double *out_weights = graph->out_weights.data();  // 出边的归一化权重
+    const char *valid = graph->valid.data();                // 节点是否有效
+    const char *dangling = graph->dangling.data();          // 节点是否为悬挂节点
+
+    // 分数、残差与节点标记（calloc按需分配清零的内存页，开销与访问到的节点数相关）
+    double *score = (double *)calloc(node_array_size + 1, sizeof(double));
+    double *residual = (double *)calloc(node_array_size + 1, sizeof(double));
+    char *flags = (char *)calloc(node_array_size + 1, sizeof(char));
+    if (score == NULL || residual == NULL || flags == NULL)
+    {
+        // 内存分配失败，释放已分配的内存并抛出异常
+        printf("[Err] Memory allocation failed for push vectors\n");
+        free(score);
+        free(residual);
+        free(flags);
+        throw std::bad_alloc(); // 抛出异常
+    }
+
+    const char TOUCHED = 1, QUEUED = 2; // 节点标记：已访问、在队列中
+    std::vector<long long> touched; // 访问到的节点
+    std::vector<long long> queue;   // 待推送的节点（先进先出）
+    size_t head = 0;
+    long long num_pushes = 0;
+
+    // 节点残差达到推送阈值时入队
+    auto enqueue = [&](long long v)
+    {
+        if (flags[v] & QUEUED)
+            return;
+        long long degree = dangling[v] ? 1 : out_indptr[v + 1] - out_indptr[v];
+        if (residual[v] >= epsilon * degree)
+        {
+            flags[v] |= QUEUED;
+            queue.push_back(v);
+        }
+    };
+    // 累加节点残差
+    auto add_residual = [&](long long v, double value)
+    {
+        if (!(flags[v] & TOUCHED))
+        {
+            flags[v] |= TOUCHED;
+            touched.push_back(v);
+        }
+        residual[v] += value;
+        enqueue(v);
+    };
+
+    for (long long s = 0; s < num_seeds; s++)
+    {
+        long long v = seed_idx[s];
+        if (v < 0 || v >= node_array_size || !valid[v] || seed_weight[s] <= 0)
+            continue; // 跳过无效的种子节点
+        add_residual(v, seed_weight[s]);
+    }
+
+    while (head < queue.size())
+    {
+        long long u = queue[head++];
+        flags[u] &= ~QUEUED;
+        double r = residual[u];
+        residual[u] = 0.0L;
+        score[u] += (1.0 - alpha) * r; // 计入节点分数
+        double mass = alpha * r;        // 向外传播的残差
+        num_pushes++;
+
+        if (dangling[u])
+        {
+            // 悬挂节点：按个性化向量分给种子节点
+            for (long long s = 0; s < num_seeds; s++)
+            {
+                long long v = seed_idx[s];
+                if (v < 0 || v >= node_array_size || !valid[v] || seed_weight[s] <= 0)
+                    continue;
+                add_residual(v, mass * seed_weight[s]);
+            }
+        }
+        else
+        {
+            // 按出边权重分给目标节点
+            for (long long j = out_indptr[u]; j < out_indptr[u + 1]; j++)
+                add_residual(out_indices[j], mass * out_weights[j]);
+        }
+
+        // 队列过长时回收已处理的部分
+        if (head > 1024 && head * 2 > queue.size())
+        {
+            queue.erase(queue.begin(), queue.begin() + head);
+            head = 0;
+        }
+    }
+
+    if (stats != NULL)
+    {
+        stats->num_pushes = num_pushes;
+        stats->num_touched = touched.size();
+        stats->residual = 0.0L;
+        for (long long v : touched)
+            stats->residual += residual[v];
+    }
+
+    // 收集近似分数大于0的候选节点（只有访问到的节点分数可能大于0，仅遍历访问到的节点）
+    const char CANDIDATE = 4; // 节点标记：候选节点
+    if (candidates != NULL)
+    {
+        // 候选节点索引转为标记（开销与候选节点数成正比；候选节点较多时应改用mask）
+        for (long long i = 0; i < num_candidates; i++)
+        {
+            long long idx = candidates[i];
+            if (idx >= 0 && idx < node_array_size)
+                flags[idx] |= CANDIDATE;
+        }
+    }
+    std::vector<long long> idx_list;
+    for (long long idx : touched)
+    {
+        if (score[idx] <= 0)
+            continue;
+        if (candidates != NULL ? (flags[idx] & CANDIDATE) : (mask == NULL || mask[idx]))
+            idx_list.push_back(idx);
+    }
+
+    long long k = select_top_k(score, idx_list, top_k, out_idx);
+    for (long long i = 0; i < k; i++)
+        out_score[i] = score[out_idx[i]];
+
+    free(score);
+    free(residual);
+    free(flags);
+    return k;
+}
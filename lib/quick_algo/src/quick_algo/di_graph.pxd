@@ -38,9 +38,28 @@ cdef extern from "cpp/di_graph.hpp":
         int remove_node(long long id)
         int remove_edge(long long src, long long dst)
         int clear()
-        int compact_nodes()
+        int compact_nodes() nogil
         CDiNode *get_node(long long id)
         CDiEdge *get_edge(long long src, long long dst)
+        int upsert_edges(long long num, const long long *src, const long long *dst, const double *weights, bint accumulate, char *is_new) nogil
+        int load_csr(long long num_nodes, const long long *indptr, const long long *indices, const double *weights) nogil
+
+cdef extern from "cpp/csr_graph.hpp":
+    cdef cppclass CCSRGraph "CSRGraph":
+        # C++ CSR snapshot of a directed graph
+        long long node_array_size
+        long long num_nodes
+        long long num_edges
+        vector[long long] indptr
+        vector[long long] indices
+        vector[double] weights
+        vector[char] valid
+        vector[char] dangling
+        vector[long long] out_indptr
+        vector[long long] out_indices
+        vector[double] out_weights
+
+        CCSRGraph(CDiGraph *graph) except + nogil
 
 cdef class DiNode:
     cdef public str name
@@ -51,8 +70,18 @@ cdef class DiEdge:
     cdef public str dst
     cdef public dict[str, str | int | float] attr
 
+cdef class CSRGraph:
+    cdef CCSRGraph *csr  # C++ CSR snapshot object
+    cdef readonly unsigned long long version
+    cdef readonly dict node_name2idx_map
+    cdef readonly list node_idx2name
+
 cdef class DiGraph:
     cdef CDiGraph *graph  # C++ directed graph object
     cdef public dict[str, int] node_name2idx_map
+    cdef readonly list node_idx2name
+    cdef readonly unsigned long long version
+    cdef CSRGraph _frozen
+    cdef object _lock
     cdef dict[tuple[str, str], int] edge_name2idx_map
     cdef dict[str | tuple[str, str], dict] name2attr_map
\ No newline at end of file
@@ -1,4 +1,4 @@
-__all__ = ["DiGraph", "DiEdge", "DiNode", "save_to_file", "load_from_file"]
+__all__ = ["CSRGraph", "DiGraph", "DiEdge", "DiNode", "save_to_file", "load_from_file"]
 
 class DiNode:
     """
@@ -52,11 +52,80 @@ class DiEdge:
     def __contains__(self, item: str) -> bool:
         ...
 
+class CSRGraph:
+    """
+    有向图的只读CSR快照（由DiGraph.freeze()创建）
+    入边以连续数组存储，边权重已按源节点的出边权重和归一化，可被多次PageRank计算直接复用
+    快照创建后不再修改，可在多个线程中同时用于PageRank计算
+    """
+    # 快照对应的图结构版本号
+    version: int
+    # 快照时的节点名到索引的映射
+    node_name2idx_map: dict[str, int]
+    # 快照时的节点索引到节点名的映射（已删除节点的位置为None）
+    node_idx2name: list[str | None]
+
+    def __init__(self, graph: DiGraph):
+        """
+        从有向图构建CSR快照（通常应使用DiGraph.freeze()）
+        :param graph: 有向图
+        """
+        ...
+
+    @property
+    def node_array_size(self) -> int:
+        """
+        节点数组大小（节点索引的上界，包含已删除节点留下的空位）
+        """
+        ...
+
+    @property
+    def num_nodes(self) -> int:
+        """
+        节点数量
+        """
+        ...
+
+    @property
+    def num_edges(self) -> int:
+        """
+        边数量
+        """
+        ...
+
+    @property
+    def indptr(self) -> memoryview:
+        """
+        各节点入边在indices/weights中的起始位置（int64，长度为node_array_size + 1，返回副本）
+        节点i的入边为indices[indptr[i]:indptr[i + 1]]
+        """
+        ...
+
+    @property
+    def indices(self) -> memoryview:
+        """
+        入边的源节点索引（int64，返回副本）
+        """
+        ...
+
+    @property
+    def weights(self) -> memoryview:
+        """
+        入边按源节点出边权重和归一化后的权重（float64，返回副本）
+        """
+        ...
+
 class DiGraph:
     """
     有向图
+    修改图的方法由图的锁（可重入）串行化；批量插入边、压缩节点数组与构建CSR快照的C++部分释放GIL。
+    并发读取图时请先调用freeze()获取快照，在快照上计算。
     """
     node_name2idx_map: dict[str, int]
+    # 节点索引到节点名的映射（已删除节点的位置为None）
+    node_idx2name: list[str | None]
+    # 图结构版本号（节点、边或边权重变化时递增，可用于缓存失效判断）
+    version: int
     
     def __init__(self):
         """
@@ -94,6 +163,27 @@ class DiGraph:
         """
         ...
 
+    def upsert_edges_from(
+        self,
+        src_list: list[str],
+        dst_list: list[str],
+        weights: list[float],
+        attrs: None | dict | list[dict] = None,
+        accumulate: bool = True,
+        new_attrs: None | dict | list[dict] = None,
+    ) -> list[bool]:
+        """
+        批量插入/更新边：不存在的节点与边会被添加，已存在的边累加（或覆盖）权重
+        :param src_list: 源节点名称列表
+        :param dst_list: 目标节点名称列表
+        :param weights: 边权重列表
+        :param attrs: 写入所有边的属性（所有边共用的dict，或与边一一对应的dict列表）
+        :param accumulate: 已存在的边：True表示累加权重，False表示覆盖权重
+        :param new_attrs: 仅写入新添加的边的属性（格式同attrs）
+        :return: 每条边是否为新添加的边 `[bool, bool, ...]`
+        """
+        ...
+
     def remove_edge(self, edge: tuple[str, str]):
         """
         删除边
@@ -129,6 +219,21 @@ class DiGraph:
         """
         ...
 
+    @property
+    def node_array_size(self) -> int:
+        """
+        节点数组大小（节点索引的上界，包含已删除节点留下的空位）
+        :return: 节点数组大小
+        """
+        ...
+
+    def freeze(self) -> CSRGraph:
+        """
+        获取图的CSR快照：图结构未变化时复用上一次的快照，否则重新构建
+        :return: CSR快照
+        """
+        ...
+
     def get_node_list(self) -> list[str]:
         """
         获取节点列表
@@ -172,16 +277,19 @@ class DiGraph:
 
 def save_to_file(graph: DiGraph, filename: str, enable_zip: bool = False):
     """
-    保存图到文件
+    保存图到文件（格式由扩展名决定）
+    - .qag：带版本号的二进制格式，保存节点名、按源节点组织的CSR边、边权重与按列保存的属性
+      （int/float/bool/str，其他类型按str保存），加载时直接映射文件，推荐用于持久化
+    - .graphml/.graphmlz：GraphML格式，用于导出
     :param graph: 图对象
     :param filename: 文件名
-    :param enable_zip: 是否启用压缩
+    :param enable_zip: 是否启用压缩（仅GraphML格式，扩展名须为.graphmlz）
     """
     ...
 
 def load_from_file(filename: str) -> DiGraph:
     """
-    从文件加载图
+    从文件加载图（支持.qag、.graphml与.graphmlz格式；.qag加载后的节点数组是压缩的）
     :param filename: 文件名
     :return: 图对象
     """
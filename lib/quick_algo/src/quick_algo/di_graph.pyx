@@ -1,10 +1,16 @@
 # distutils: language=c++
 
+from array import array
+import json
+import mmap
 import os
+import struct
+import sys
+import threading
 import xml.etree.ElementTree as et
 from xml.dom import minidom
 
-__all__ = ["DiGraph", "DiEdge", "DiNode", "save_to_file", "load_from_file"]
+__all__ = ["CSRGraph", "DiGraph", "DiEdge", "DiNode", "save_to_file", "load_from_file"]
 
 cdef class DiNode:
     """
@@ -100,9 +106,94 @@ cdef class DiEdge:
         """
         return item in self.attr
 
+cdef class CSRGraph:
+    """
+    有向图的只读CSR快照（由DiGraph.freeze()创建）
+    入边以连续数组存储，边权重已按源节点的出边权重和归一化，可被多次PageRank计算直接复用
+    快照创建后不再修改，可在多个线程中同时用于PageRank计算
+    """
+    def __init__(self, DiGraph graph):
+        """
+        从有向图构建CSR快照（构建期间持有图的锁，C++部分释放GIL）
+        :param graph: 有向图
+        """
+        cdef CDiGraph *c_graph = graph.graph
+        with graph._lock:
+            with nogil:
+                self.csr = new CCSRGraph(c_graph)
+            # 快照对应的图结构版本号
+            self.version = graph.version
+            # 快照时的节点映射（与原图之后的变化无关）
+            self.node_name2idx_map = dict(graph.node_name2idx_map)
+            self.node_idx2name = list(graph.node_idx2name)
+
+    def __dealloc__(self):
+        """
+        Destructor to free the C++ CSR object.
+        """
+        if self.csr is not NULL:
+            del self.csr
+            self.csr = NULL
+
+    @property
+    def node_array_size(self) -> int:
+        """
+        节点数组大小（节点索引的上界，包含已删除节点留下的空位）
+        :return: 节点数组大小
+        """
+        return self.csr.node_array_size
+
+    @property
+    def num_nodes(self) -> int:
+        """
+        节点数量
+        :return: 节点数量
+        """
+        return self.csr.num_nodes
+
+    @property
+    def num_edges(self) -> int:
+        """
+        边数量
+        :return: 边数量
+        """
+        return self.csr.num_edges
+
+    @property
+    def indptr(self):
+        """
+        各节点入边在indices/weights中的起始位置（长度为node_array_size + 1，返回副本）
+        :return: int64数组
+        """
+        if self.csr.indptr.size() == 0:
+            return memoryview(b"").cast("q")
+        return (<long long[:self.csr.indptr.size()]> self.csr.indptr.data()).copy()
+
+    @property
+    def indices(self):
+        """
+        入边的源节点索引（返回副本）
+        :return: int64数组
+        """
+        if self.csr.indices.size() == 0:
+            return memoryview(b"").cast("q")
+        return (<long long[:self.csr.indices.size()]> self.csr.indices.data()).copy()
+
+    @property
+    def weights(self):
+        """
+        入边按源节点出边权重和归一化后的权重（返回副本）
+        :return: float64数组
+        """
+        if self.csr.weights.size() == 0:
+            return memoryview(b"").cast("d")
+        return (<double[:self.csr.weights.size()]> self.csr.weights.data()).copy()
+
 cdef class DiGraph:
     """
     A class representing a directed graph.
+    修改图的方法由图的锁（可重入）串行化；批量插入边、压缩节点数组与构建CSR快照的C++部分释放GIL。
+    并发读取图时请先调用freeze()获取快照，在快照上计算。
     """
     def __init__(self, int num_nodes = 10):
         """"""
@@ -111,10 +202,18 @@ cdef class DiGraph:
 
         # 节点名到索引的映射
         self.node_name2idx_map = dict()
+        # 节点索引到节点名的映射（已删除节点的位置为None）
+        self.node_idx2name = list()
         # 边名到索引的映射（仅用来确定边存在，暂无它用）
         self.edge_name2idx_map = dict()
         # 节点名/边名到属性的映射
         self.name2attr_map = dict()
+        # 图结构版本号（节点、边或边权重变化时递增）
+        self.version = 0
+        # 最近一次创建的CSR快照
+        self._frozen = None
+        # 修改图时持有的锁
+        self._lock = threading.RLock()
 
     def __dealloc__(self):
         """
@@ -161,6 +260,7 @@ cdef class DiGraph:
         res = self.graph.add_edge(src_idx, dst_idx, edge.attr["weight"])
         if res != 0:
             raise RuntimeError(f"Failed to add edge {edge.src}->{edge.dst} to the C-graph.")
+        self.version += 1
 
         # 更新边属性
         key = (edge.src, edge.dst)
@@ -172,94 +272,183 @@ cdef class DiGraph:
         添加一条边到图中
         :param edge: (src, dst, weight, attr)
         """
-        # 检查边是否已经存在
-        if (edge.src, edge.dst) in self.edge_name2idx_map:
-            raise KeyError(f"Edge {edge.src}->{edge.dst} already exists in the graph.")
-
-        # 收集节点
-        new_nodes = set()
-        if edge.src not in self.node_name2idx_map:
-            new_nodes.add(edge.src)
-        if edge.dst not in self.node_name2idx_map:
-            new_nodes.add(edge.dst)
-
-        # 添加节点
-        self.add_nodes_from([
-            DiNode(node)
-            for node in new_nodes
-        ])
-
-        self._direct_add_edge(edge)
-
-    def add_edges_from(self, edges: list[DiEdge]):
-        """
-        添加一组边到图中
-        :param edges: [DiEdge, ...]
-        """
-        # 遍历所有边，收集节点
-        new_nodes = set()
-        for edge in edges:
+        with self._lock:
             # 检查边是否已经存在
             if (edge.src, edge.dst) in self.edge_name2idx_map:
                 raise KeyError(f"Edge {edge.src}->{edge.dst} already exists in the graph.")
+
+            # 收集节点
+            new_nodes = set()
             if edge.src not in self.node_name2idx_map:
                 new_nodes.add(edge.src)
             if edge.dst not in self.node_name2idx_map:
                 new_nodes.add(edge.dst)
 
-        # 添加节点
-        self.add_nodes_from([
-            DiNode(node)
-            for node in new_nodes
-        ])
+            # 添加节点
+            self.add_nodes_from([
+                DiNode(node)
+                for node in new_nodes
+            ])
 
-        for edge in edges:
             self._direct_add_edge(edge)
 
+    def add_edges_from(self, edges: list[DiEdge]):
+        """
+        添加一组边到图中
+        :param edges: [DiEdge, ...]
+        """
+        with self._lock:
+            # 遍历所有边，收集节点
+            new_nodes = set()
+            for edge in edges:
+                # 检查边是否已经存在
+                if (edge.src, edge.dst) in self.edge_name2idx_map:
+                    raise KeyError(f"Edge {edge.src}->{edge.dst} already exists in the graph.")
+                if edge.src not in self.node_name2idx_map:
+                    new_nodes.add(edge.src)
+                if edge.dst not in self.node_name2idx_map:
+                    new_nodes.add(edge.dst)
+
+            # 添加节点
+            self.add_nodes_from([
+                DiNode(node)
+                for node in new_nodes
+            ])
+
+            for edge in edges:
+                self._direct_add_edge(edge)
+
     def update_edge(self, edge: DiEdge):
         """
         更新边的属性
         :param edge: (src, dst, weight, attr)
         """
-        # 检查边是否存在
-        if (edge.src, edge.dst) not in self.edge_name2idx_map:
-            raise KeyError(f"Edge {edge.src}->{edge.dst} does not exist in the graph.")
-        # 获取索引
-        src_idx = self.node_name2idx_map[edge.src]
-        dst_idx = self.node_name2idx_map[edge.dst]
-        # 获取边结构体指针
-        cdef CDiEdge *edge_ptr = self.graph.get_edge(src_idx, dst_idx)
-        if edge_ptr is NULL:
-            raise RuntimeError(f"Edge {edge.src}->{edge.dst} does not exist in the C-graph.")
-        # 更新权重
-        edge_ptr.weight = edge.attr["weight"]
-        # 更新边属性
-        key = (edge.src, edge.dst)
-        self.name2attr_map[key] = edge.attr
+        cdef CDiEdge *edge_ptr
+        with self._lock:
+            # 检查边是否存在
+            if (edge.src, edge.dst) not in self.edge_name2idx_map:
+                raise KeyError(f"Edge {edge.src}->{edge.dst} does not exist in the graph.")
+            # 获取索引
+            src_idx = self.node_name2idx_map[edge.src]
+            dst_idx = self.node_name2idx_map[edge.dst]
+            # 获取边结构体指针
+            edge_ptr = self.graph.get_edge(src_idx, dst_idx)
+            if edge_ptr is NULL:
+                raise RuntimeError(f"Edge {edge.src}->{edge.dst} does not exist in the C-graph.")
+            # 更新权重
+            edge_ptr.weight = edge.attr["weight"]
+            self.version += 1
+            # 更新边属性
+            key = (edge.src, edge.dst)
+            self.name2attr_map[key] = edge.attr
+
+    def upsert_edges_from(
+        self,
+        src_list: list[str],
+        dst_list: list[str],
+        weights: list[float],
+        attrs: None | dict | list[dict] = None,
+        bint accumulate = True,
+        new_attrs: None | dict | list[dict] = None,
+    ) -> list[bool]:
+        """
+        批量插入/更新边：不存在的节点与边会被添加，已存在的边累加（或覆盖）权重
+        :param src_list: 源节点名列表
+        :param dst_list: 目标节点名列表
+        :param weights: 边权重列表
+        :param attrs: 写入所有边的属性（所有边共用的dict，或与边一一对应的dict列表）
+        :param accumulate: 已存在的边：True表示累加权重，False表示覆盖权重
+        :param new_attrs: 仅写入新添加的边的属性（格式同attrs）
+        :return: 每条边是否为新添加的边（同一批次中重复的边，仅首次出现时为新边）
+        """
+        cdef long long num
+        cdef vector[long long] src_idx
+        cdef vector[long long] dst_idx
+        cdef vector[double] weight_vec
+        cdef vector[char] is_new
+        cdef long long i
+        cdef int ret = 0
+        cdef CDiGraph *c_graph = self.graph
+        with self._lock:
+            num = len(src_list)
+            if len(dst_list) != num or len(weights) != num:
+                raise ValueError("src_list, dst_list and weights must have the same length.")
+            for extra in (attrs, new_attrs):
+                if isinstance(extra, list) and len(extra) != num:
+                    raise ValueError("Attribute list must have the same length as src_list.")
+
+            # 添加不存在的节点（按首次出现的顺序）
+            new_nodes = dict()
+            for name in src_list:
+                if name not in self.node_name2idx_map:
+                    new_nodes[name] = None
+            for name in dst_list:
+                if name not in self.node_name2idx_map:
+                    new_nodes[name] = None
+            self.add_nodes_from([DiNode(name) for name in new_nodes])
+
+            # 在C-graph中一次完成插入/更新
+            src_idx = [self.node_name2idx_map[name] for name in src_list]
+            dst_idx = [self.node_name2idx_map[name] for name in dst_list]
+            weight_vec = weights
+            is_new = vector[char](num)
+            if num > 0:
+                with nogil:
+                    ret = c_graph.upsert_edges(
+                        num, src_idx.data(), dst_idx.data(), weight_vec.data(), accumulate, is_new.data()
+                    )
+            if ret != 0:
+                raise RuntimeError("Failed to upsert edges in the C-graph.")
+            self.version += 1
+
+            # 同步边属性（权重的计算顺序与C-graph一致）
+            result = [False] * num
+            for i in range(num):
+                key = (src_list[i], dst_list[i])
+                weight = weight_vec[i]
+                edge_attrs = attrs[i] if isinstance(attrs, list) else attrs
+                if is_new[i]:
+                    edge_new_attrs = new_attrs[i] if isinstance(new_attrs, list) else new_attrs
+                    attr = {"weight": weight}
+                    if edge_new_attrs is not None:
+                        attr.update(edge_new_attrs)
+                    if edge_attrs is not None:
+                        attr.update(edge_attrs)
+                    self.name2attr_map[key] = attr
+                    self.edge_name2idx_map[key] = 0
+                    result[i] = True
+                else:
+                    attr = self.name2attr_map[key]
+                    attr["weight"] = attr["weight"] + weight if accumulate else weight
+                    if edge_attrs is not None:
+                        attr.update(edge_attrs)
+            return result
 
     def remove_edge(self, edge: tuple[str, str]):
         """
         删除一条边
         :param edge: (src, dst)
         """
-        # 检查边是否存在
-        src, dst = edge
-        if (src, dst) not in self.edge_name2idx_map:
-            raise KeyError(f"Edge {src}->{dst} does not exist in the graph.")
-
-        # 获取索引
-        src_idx = self.node_name2idx_map[src]
-        dst_idx = self.node_name2idx_map[dst]
-        # 删除边
-        if self.graph.remove_edge(src_idx, dst_idx) != 0:
-            raise RuntimeError(f"Failed to remove edge {src}->{dst} from the C-graph.")
-
-        # 删除边属性
-        key = (src, dst)
-        if key in self.name2attr_map:
-            del self.name2attr_map[key]
-        # 删除边索引映射
-        del self.edge_name2idx_map[key]
+        with self._lock:
+            # 检查边是否存在
+            src, dst = edge
+            if (src, dst) not in self.edge_name2idx_map:
+                raise KeyError(f"Edge {src}->{dst} does not exist in the graph.")
+
+            # 获取索引
+            src_idx = self.node_name2idx_map[src]
+            dst_idx = self.node_name2idx_map[dst]
+            # 删除边
+            if self.graph.remove_edge(src_idx, dst_idx) != 0:
+                raise RuntimeError(f"Failed to remove edge {src}->{dst} from the C-graph.")
+            self.version += 1
+
+            # 删除边属性
+            key = (src, dst)
+            if key in self.name2attr_map:
+                del self.name2attr_map[key]
+            # 删除边索引映射
+            del self.edge_name2idx_map[key]
 
     def add_node(self, node: DiNode):
         """
@@ -267,38 +456,53 @@ cdef class DiGraph:
         :param node: (node_name, attr)
         :return:
         """
-        if node.name in self.node_name2idx_map:
-            raise KeyError(f"Node {node.name} already exists in the graph.")
-
-        # 创建节点
-        cdef long long idx = self.graph.add_node()
-        if idx < 0:
-            raise RuntimeError(f"Failed to add node {node.name} to the C-graph.")
-        # 更新索引映射&属性映射
-        self.node_name2idx_map[node.name] = idx
-        self.name2attr_map[node.name] = node.attr
-
-    def add_nodes_from(self, nodes: list[DiNode]):
-        """
-        添加节点到图中
-        :param nodes: [(node_name, attr), ...]
-        :return:
-        """
-        # 检查节点是否已经存在
-        for node in nodes:
+        cdef long long idx
+        with self._lock:
             if node.name in self.node_name2idx_map:
                 raise KeyError(f"Node {node.name} already exists in the graph.")
 
-        cdef long long idx
-        for node in nodes:
             # 创建节点
             idx = self.graph.add_node()
             if idx < 0:
                 raise RuntimeError(f"Failed to add node {node.name} to the C-graph.")
+            self.version += 1
             # 更新索引映射&属性映射
             self.node_name2idx_map[node.name] = idx
+            self._set_idx2name(idx, node.name)
             self.name2attr_map[node.name] = node.attr
 
+    def add_nodes_from(self, nodes: list[DiNode]):
+        """
+        添加节点到图中
+        :param nodes: [(node_name, attr), ...]
+        :return:
+        """
+        cdef long long idx
+        with self._lock:
+            # 检查节点是否已经存在
+            for node in nodes:
+                if node.name in self.node_name2idx_map:
+                    raise KeyError(f"Node {node.name} already exists in the graph.")
+
+            for node in nodes:
+                # 创建节点
+                idx = self.graph.add_node()
+                if idx < 0:
+                    raise RuntimeError(f"Failed to add node {node.name} to the C-graph.")
+                self.version += 1
+                # 更新索引映射&属性映射
+                self.node_name2idx_map[node.name] = idx
+                self._set_idx2name(idx, node.name)
+                self.name2attr_map[node.name] = node.attr
+
+    def _set_idx2name(self, long long idx, str name):
+        """
+        更新索引到节点名的映射（节点索引可能复用已删除节点的位置）
+        """
+        if idx >= len(self.node_idx2name):
+            self.node_idx2name.extend([None] * (idx + 1 - len(self.node_idx2name)))
+        self.node_idx2name[idx] = name
+
     def update_node(self, node: DiNode):
         """
         更新节点的属性
@@ -319,25 +523,46 @@ cdef class DiGraph:
         :param node_name: node name
         :return:
         """
-        # 检查节点是否存在
-        if node_name not in self.node_name2idx_map:
-            raise KeyError(f"Node \"{node_name}\" does not exist in the graph.")
-        # 获取索引
-        idx = self.node_name2idx_map[node_name]
-        # 删除节点
-        if self.graph.remove_node(idx) != 0:
-            raise RuntimeError(f"Failed to remove node {node_name} from the C-graph.")
-
-        # 删除节点属性
-        del self.name2attr_map[node_name]
-        # 删除节点索引映射
-        del self.node_name2idx_map[node_name]
-
-        # 删除相关的边对应的属性和索引
-        for edge in list(self.edge_name2idx_map.keys()):
-            if edge[0] == node_name or edge[1] == node_name:
-                del self.edge_name2idx_map[edge]
-                del self.name2attr_map[edge]
+        with self._lock:
+            # 检查节点是否存在
+            if node_name not in self.node_name2idx_map:
+                raise KeyError(f"Node \"{node_name}\" does not exist in the graph.")
+            # 获取索引
+            idx = self.node_name2idx_map[node_name]
+            # 删除节点
+            if self.graph.remove_node(idx) != 0:
+                raise RuntimeError(f"Failed to remove node {node_name} from the C-graph.")
+            self.version += 1
+
+            # 删除节点属性
+            del self.name2attr_map[node_name]
+            # 删除节点索引映射
+            del self.node_name2idx_map[node_name]
+            self.node_idx2name[idx] = None
+
+            # 删除相关的边对应的属性和索引
+            for edge in list(self.edge_name2idx_map.keys()):
+                if edge[0] == node_name or edge[1] == node_name:
+                    del self.edge_name2idx_map[edge]
+                    del self.name2attr_map[edge]
+
+    @property
+    def node_array_size(self) -> int:
+        """
+        节点数组大小（节点索引的上界，包含已删除节点留下的空位）
+        :return: 节点数组大小
+        """
+        return self.graph.nodes.size()
+
+    def freeze(self) -> CSRGraph:
+        """
+        获取图的CSR快照：图结构未变化时复用上一次的快照，否则重新构建
+        :return: CSR快照
+        """
+        with self._lock:
+            if self._frozen is None or self._frozen.version != self.version:
+                self._frozen = CSRGraph(self)
+            return self._frozen
 
     def get_node_list(self) -> list[str]:
         """
@@ -381,45 +606,358 @@ cdef class DiGraph:
         压缩节点数组
         :return:
         """
-        # 若果节点数组已经压缩，则不需要再压缩
-        if self.graph.num_nodes == self.graph.nodes.size():
-            return
-
-        # 压缩节点数组
-        self.graph.compact_nodes()
-
-        # 更新索引映射
-        node_list = [
-            (node_name, idx)
-            for node_name, idx in self.node_name2idx_map.items()
-        ]
-
-        node_list = sorted(node_list, key=lambda x: x[1]) # 按照索引排序
-
-        # 重建索引映射
-        count = 0
-        for node_name, _ in node_list:
-            self.node_name2idx_map[node_name] = count
-            count += 1
+        cdef CDiGraph *c_graph = self.graph
+        with self._lock:
+            # 若果节点数组已经压缩，则不需要再压缩
+            if self.graph.num_nodes == self.graph.nodes.size():
+                return
+
+            # 压缩节点数组
+            with nogil:
+                c_graph.compact_nodes()
+            self.version += 1
+
+            # 重建索引映射（压缩后节点保持原有的相对顺序）
+            self.node_idx2name = [
+                node_name for node_name in self.node_idx2name if node_name is not None
+            ]
+            for idx, node_name in enumerate(self.node_idx2name):
+                self.node_name2idx_map[node_name] = idx
 
     def clear(self):
         """
         清空图
         :return:
         """
-        self.graph.clear()
-        self.node_name2idx_map.clear()
-        self.edge_name2idx_map.clear()
-        self.name2attr_map.clear()
+        with self._lock:
+            self.graph.clear()
+            self.version += 1
+            self._frozen = None
+            self.node_name2idx_map.clear()
+            self.node_idx2name.clear()
+            self.edge_name2idx_map.clear()
+            self.name2attr_map.clear()
+
+# 二进制图文件（.qag）
+_BINARY_SUFFIX = ".qag"
+_BINARY_MAGIC = b"QAGRAPH\0"
+_BINARY_VERSION = 1
+# 文件头：魔数、格式版本、保留字段、元数据（JSON）长度；之后依次为元数据与按8字节对齐的数据段
+_BINARY_HEADER = struct.Struct("<8sIIQ")
+_BINARY_ALIGN = 8
+# 各列类型对应的数组格式
+_COLUMN_FORMATS = {"int": "q", "float": "d", "bool": "B"}
+
+
+class _SectionWriter:
+    """
+    收集二进制文件的数据段（按8字节对齐）
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def add(self, data) -> list[int]:
+        """
+        添加数据段
+        :param data: bytes-like对象
+        :return: [偏移量（相对数据区起始位置）, 字节数]
+        """
+        data = memoryview(data).cast("B")
+        section = [self.size, len(data)]
+        self.chunks.append(data)
+        self.size += len(data)
+        padding = -self.size % _BINARY_ALIGN
+        if padding:
+            self.chunks.append(bytes(padding))
+            self.size += padding
+        return section
+
+
+def _str_offsets(texts: list[str]) -> array:
+    """
+    字符串拼接后各字符串的起始位置（按字符计，长度为len(texts) + 1）
+    """
+    offsets = array("q", [0]) * (len(texts) + 1)
+    total = 0
+    for i, text in enumerate(texts):
+        total += len(text)
+        offsets[i + 1] = total
+    return offsets
+
+
+def _column_type(values: list) -> str:
+    """
+    推断属性列的类型（int/float/bool/str，其他类型的值按str保存）
+    """
+    if all(type(value) is bool for value in values):
+        return "bool"
+    if all(type(value) is int for value in values):
+        if -(1 << 63) <= min(values) and max(values) < (1 << 63):
+            return "int"
+        return "str"
+    if all(type(value) is int or type(value) is float for value in values):
+        return "float"
+    return "str"
+
+
+def _encode_columns(writer: _SectionWriter, attr_dicts: list[dict], skip: tuple = ()) -> list[dict]:
+    """
+    将属性按列写入数据段
+    :param writer: 数据段收集器
+    :param attr_dicts: 各节点/边的属性
+    :param skip: 不保存的属性名
+    :return: 各列的元数据
+    """
+    columns = {}
+    for row, attr in enumerate(attr_dicts):
+        for key, value in attr.items():
+            if key in skip:
+                continue
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = ([], [])
+            column[0].append(row)
+            column[1].append(value)
+
+    columns_meta = []
+    for key, (rows, values) in columns.items():
+        col_type = _column_type(values)
+        column_meta = {
+            "name": key,
+            "type": col_type,
+            # 仅部分节点/边具有该属性时，记录所在的行
+            "rows": None if len(rows) == len(attr_dicts) else writer.add(array("q", rows)),
+        }
+        if col_type == "str":
+            texts = [value if type(value) is str else str(value) for value in values]
+            column_meta["offsets"] = writer.add(_str_offsets(texts))
+            column_meta["values"] = writer.add("".join(texts).encode("utf-8"))
+        else:
+            column_meta["values"] = writer.add(array(_COLUMN_FORMATS[col_type], values))
+        columns_meta.append(column_meta)
+    return columns_meta
+
+
+def _section(buf, base: int, section: list[int], fmt: str = "B"):
+    """
+    获取数据段的视图（不复制数据）
+    """
+    offset, length = section
+    if base + offset + length > len(buf):
+        raise ValueError("Invalid binary graph file: section out of range.")
+    return buf[base + offset : base + offset + length].cast(fmt)
+
+
+def _decode_str_list(buf, base: int, offsets_section: list[int], data_section: list[int], count: int) -> list[str]:
+    """
+    解码字符串列表（整体解码后按字符位置切分）
+    """
+    offsets = _section(buf, base, offsets_section, "q").tolist()
+    if len(offsets) != count + 1:
+        raise ValueError("Invalid binary graph file: string offsets do not match.")
+    text = str(_section(buf, base, data_section), "utf-8")
+    return [text[offsets[i] : offsets[i + 1]] for i in range(count)]
+
+
+def _decode_columns(buf, base: int, columns_meta: list[dict], attr_dicts: list[dict]):
+    """
+    将属性列写回各节点/边的属性
+    """
+    for column_meta in columns_meta:
+        name = column_meta["name"]
+        rows = None
+        count = len(attr_dicts)
+        if column_meta["rows"] is not None:
+            rows = _section(buf, base, column_meta["rows"], "q").tolist()
+            count = len(rows)
+            if count > 0 and (min(rows) < 0 or max(rows) >= len(attr_dicts)):
+                raise ValueError(f"Invalid binary graph file: rows of column \"{name}\" out of range.")
+
+        col_type = column_meta["type"]
+        if col_type == "str":
+            values = _decode_str_list(buf, base, column_meta["offsets"], column_meta["values"], count)
+        elif col_type in _COLUMN_FORMATS:
+            values = _section(buf, base, column_meta["values"], _COLUMN_FORMATS[col_type]).tolist()
+            if col_type == "bool":
+                values = [value != 0 for value in values]
+        else:
+            raise ValueError(f"Invalid binary graph file: unknown column type \"{col_type}\".")
+        if len(values) != count:
+            raise ValueError(f"Invalid binary graph file: length of column \"{name}\" does not match.")
+
+        if rows is None:
+            for attr, value in zip(attr_dicts, values):
+                attr[name] = value
+        else:
+            for row, value in zip(rows, values):
+                attr_dicts[row][name] = value
+
+
+def _save_binary(DiGraph graph, str file_path):
+    """
+    保存图为二进制文件：节点名、按源节点组织的CSR边（每行的目标节点升序）、边权重与按列保存的属性
+    """
+    cdef CDiNode *c_node
+    cdef CDiEdge *c_edge
+    cdef long long i, node_array_size
+    cdef long long num_nodes = 0
+
+    with graph._lock:
+        node_array_size = graph.graph.nodes.size()
+        # 压缩节点索引（跳过已删除节点留下的空位，保持相对顺序）
+        new_idx = array("q", [-1]) * node_array_size
+        node_names = []
+        for i in range(node_array_size):
+            c_node = graph.graph.nodes.at(i)
+            if c_node is not NULL:
+                new_idx[i] = num_nodes
+                num_nodes += 1
+                node_names.append(graph.node_idx2name[i])
+
+        # 边（出边链表已按目标节点ID升序排列）
+        indptr = array("q", [0]) * (num_nodes + 1)
+        indices = array("q")
+        weights = array("d")
+        edge_attrs = []
+        name2attr_map = graph.name2attr_map
+        node_idx2name = graph.node_idx2name
+        for i in range(node_array_size):
+            c_node = graph.graph.nodes.at(i)
+            if c_node is NULL:
+                continue
+            src_name = node_idx2name[i]
+            c_edge = c_node.first_out_edge
+            while c_edge is not NULL:
+                indices.append(new_idx[c_edge.dst])
+                weights.append(c_edge.weight)
+                edge_attrs.append(name2attr_map[(src_name, node_idx2name[c_edge.dst])])
+                c_edge = c_edge.next_same_src
+            indptr[new_idx[i] + 1] = len(indices)
+
+        node_attrs = [name2attr_map[node_name] for node_name in node_names]
+
+    writer = _SectionWriter()
+    # 边权重与权重属性一致时不重复保存
+    skip_weight = all(type(attr.get("weight")) is float for attr in edge_attrs)
+    meta = {
+        "byteorder": sys.byteorder,
+        "num_nodes": num_nodes,
+        "num_edges": len(indices),
+        "node_name_offsets": writer.add(_str_offsets(node_names)),
+        "node_names": writer.add("".join(node_names).encode("utf-8")),
+        "edge_indptr": writer.add(indptr),
+        "edge_indices": writer.add(indices),
+        "edge_weights": writer.add(weights),
+        "weight_attr": skip_weight,
+        "node_columns": _encode_columns(writer, node_attrs),
+        "edge_columns": _encode_columns(writer, edge_attrs, ("weight",) if skip_weight else ()),
+    }
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+    header = _BINARY_HEADER.pack(_BINARY_MAGIC, _BINARY_VERSION, 0, len(meta_bytes))
+    padding = -(len(header) + len(meta_bytes)) % _BINARY_ALIGN
+
+    with open(file_path, "wb") as f:
+        f.write(header)
+        f.write(meta_bytes)
+        f.write(bytes(padding))
+        for chunk in writer.chunks:
+            f.write(chunk)
+
+
+def _graph_from_binary(buf) -> DiGraph:
+    """
+    从二进制文件的内容构建图（CSR数组直接从映射的内存读取）
+    """
+    cdef const long long[::1] indptr
+    cdef const long long[::1] indices
+    cdef const double[::1] weights
+    cdef long long num_nodes, num_edges, src, j
+    cdef int ret
+    cdef DiGraph graph
+    cdef CDiGraph *c_graph
+
+    if len(buf) < _BINARY_HEADER.size:
+        raise ValueError("Invalid binary graph file: file is too small.")
+    magic, version, _, meta_len = _BINARY_HEADER.unpack_from(buf, 0)
+    if magic != _BINARY_MAGIC:
+        raise ValueError("Invalid file format. Not a binary graph file.")
+    if version > _BINARY_VERSION:
+        raise ValueError(f"Unsupported binary graph format version {version} (supported: {_BINARY_VERSION}).")
+    meta_end = _BINARY_HEADER.size + meta_len
+    meta = json.loads(str(buf[_BINARY_HEADER.size : meta_end], "utf-8"))
+    if meta["byteorder"] != sys.byteorder:
+        raise ValueError(f"Binary graph file was saved with {meta['byteorder']}-endian byte order.")
+    base = meta_end + (-meta_end % _BINARY_ALIGN)
+
+    num_nodes = meta["num_nodes"]
+    num_edges = meta["num_edges"]
+    node_names = _decode_str_list(buf, base, meta["node_name_offsets"], meta["node_names"], num_nodes)
+    indptr = _section(buf, base, meta["edge_indptr"], "q")
+    indices = _section(buf, base, meta["edge_indices"], "q")
+    weights = _section(buf, base, meta["edge_weights"], "d")
+    if (
+        indptr.shape[0] != num_nodes + 1
+        or indices.shape[0] != num_edges
+        or weights.shape[0] != num_edges
+        or indptr[num_nodes] != num_edges
+    ):
+        raise ValueError("Invalid binary graph file: edge arrays do not match.")
+
+    # 构建C-graph
+    graph = DiGraph(num_nodes)
+    c_graph = graph.graph
+    with nogil:
+        ret = c_graph.load_csr(
+            num_nodes,
+            &indptr[0],
+            &indices[0] if num_edges > 0 else NULL,
+            &weights[0] if num_edges > 0 else NULL,
+        )
+    if ret != 0:
+        raise ValueError("Invalid binary graph file: invalid edge arrays.")
+    graph.version += 1
+
+    # 节点映射与属性
+    node_attrs = [dict() for _ in range(num_nodes)]
+    _decode_columns(buf, base, meta["node_columns"], node_attrs)
+    graph.node_idx2name = node_names
+    graph.node_name2idx_map = dict(zip(node_names, range(num_nodes)))
+    graph.name2attr_map = dict(zip(node_names, node_attrs))
+
+    # 边映射与属性
+    edge_keys = [None] * num_edges
+    for src in range(num_nodes):
+        src_name = node_names[src]
+        for j in range(indptr[src], indptr[src + 1]):
+            edge_keys[j] = (src_name, node_names[indices[j]])
+    if meta["weight_attr"]:
+        edge_attrs = [{"weight": weights[j]} for j in range(num_edges)]
+    else:
+        edge_attrs = [dict() for _ in range(num_edges)]
+    _decode_columns(buf, base, meta["edge_columns"], edge_attrs)
+    graph.edge_name2idx_map = dict.fromkeys(edge_keys, 0)
+    graph.name2attr_map.update(zip(edge_keys, edge_attrs))
+
+    return graph
+
 
 def save_to_file(graph: DiGraph, file_path: str, enable_zip: bool = False):
     """
     保存图到文件
+    .qag：二进制格式（加载时直接映射文件，推荐用于持久化）；.graphml/.graphmlz：GraphML格式（用于导出）
     :param graph: 图对象
     :param file_path: 文件路径
-    :param enable_zip: 是否压缩
+    :param enable_zip: 是否压缩（仅GraphML格式）
     :return:
     """
+    if file_path.endswith(_BINARY_SUFFIX):
+        if enable_zip:
+            raise ValueError("enable_zip is not supported for the binary (.qag) format.")
+        _save_binary(graph, file_path)
+        return
+
     # 创建XML根节点
     root = et.Element("graphml")
     # 添加头信息
@@ -505,6 +1043,14 @@ def load_from_file(file_path: str) -> DiGraph:
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File {file_path} does not exist.")
 
+    if file_path.endswith(_BINARY_SUFFIX):
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError("Invalid binary graph file: file is empty.")
+            # 映射在所有视图释放后随对象回收关闭
+            buf = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        return _graph_from_binary(buf)
+
     content: str
 
     if file_path.endswith(".graphmlz"):
@@ -517,7 +1063,7 @@ def load_from_file(file_path: str) -> DiGraph:
         with open(file_path, 'rb') as f:
             content = f.read().decode(encoding="utf-8")
     else:
-        raise ValueError("Unsupported file format. Please use .graphml or .graphmlz format.")
+        raise ValueError("Unsupported file format. Please use .qag, .graphml or .graphmlz format.")
 
     # 解析XML文件
     root = et.fromstring(content)
@@ -1,8 +1,18 @@
 # distutils: language=c++
 
-from .di_graph cimport CDiGraph
+from .di_graph cimport CCSRGraph, CDiGraph
 
 cdef extern from "cpp/pagerank.hpp":
+    cdef cppclass PageRankStats:
+        int num_iter
+        double diff
+        bint converged
+
+    cdef cppclass PushStats:
+        long long num_pushes
+        long long num_touched
+        double residual
+
     double *pagerank(
             CDiGraph *graph,
             double *init_score_vec,
@@ -10,5 +20,60 @@ cdef extern from "cpp/pagerank.hpp":
             double *dangling_weight_vec,
             double alpha,
             int max_iter,
-            double tol
-    )
\ No newline at end of file
+            double tol,
+            PageRankStats *stats,
+            int num_threads
+    ) except +
+
+    double *pagerank_csr(
+            const CCSRGraph *graph,
+            double *init_score_vec,
+            double *personalization_vec,
+            double *dangling_weight_vec,
+            double alpha,
+            int max_iter,
+            double tol,
+            PageRankStats *stats,
+            int num_threads
+    ) except + nogil
+
+    double *pagerank_csr_batch(
+            const CCSRGraph *graph,
+            long long num_vectors,
+            double *init_score_mat,
+            double *personalization_mat,
+            double *dangling_weight_mat,
+            double alpha,
+            int max_iter,
+            double tol,
+            PageRankStats *stats,
+            int num_threads
+    ) except + nogil
+
+    long long top_k_nodes(
+            const CCSRGraph *graph,
+            const double *score,
+            const long long *candidates,
+            long long num_candidates,
+            const unsigned char *mask,
+            long long top_k,
+            long long *out_idx
+    ) except + nogil
+
+    long long pagerank_push(
+            const CCSRGraph *graph,
+            long long num_seeds,
+            const long long *seed_idx,
+            const double *seed_weight,
+            double alpha,
+            double epsilon,
+            const long long *candidates,
+            long long num_candidates,
+            const unsigned char *mask,
+            long long top_k,
+            long long *out_idx,
+            double *out_score,
+            PushStats *stats
+    ) except + nogil
+
+    bint pagerank_openmp_enabled()
@@ -1,28 +1,173 @@
-from quick_algo.di_graph import DiGraph
+import numpy as np
+
+from quick_algo.di_graph import CSRGraph, DiGraph
+
+
+def openmp_enabled() -> bool:
+    """
+    Whether quick_algo was built with OpenMP, i.e. whether PageRank can use multiple threads.
+    """
+    ...
 
 
 def run_pagerank(
-    graph: DiGraph,
-    init_score: None | dict[str, float] = None,
-    personalization: None | dict[str, float] = None,
-    dangling_weight: None | dict[str, float] = None,
+    graph: DiGraph | CSRGraph,
+    init_score: None | dict[str, float] | np.ndarray = None,
+    personalization: None | dict[str, float] | np.ndarray = None,
+    dangling_weight: None | dict[str, float] | np.ndarray = None,
     alpha: float = 0.85,
     max_iter: int = 100,
     tol: float = 1e-6,
+    stats: None | dict = None,
+    num_threads: int = 0,
 ) -> dict[str, float]:
     """
     Run the PageRank algorithm on a directed graph.
 
     Args:
-        graph (DiGraph): The directed graph on which to run PageRank.
-        init_score (dict[str, float], optional): Initial scores for nodes. Defaults to None.
-        personalization (dict[str, float], optional): Personalization vector. Defaults to None.
-        dangling_weight (dict[str, float], optional): Weights for dangling nodes. Defaults to None.
+        graph (DiGraph | CSRGraph): The directed graph on which to run PageRank, or a
+            snapshot from graph.freeze(). A DiGraph reuses its cached snapshot while
+            unchanged, so repeated calls skip building the weight matrix.
+        init_score (dict[str, float] | np.ndarray, optional): Initial scores for nodes. Defaults to None.
+        personalization (dict[str, float] | np.ndarray, optional): Personalization vector. Defaults to None.
+        dangling_weight (dict[str, float] | np.ndarray, optional): Weights for dangling nodes. Defaults to None.
+        Each score argument is either a mapping from node name to score, or a contiguous
+        float64 array indexed by node index (length graph.node_array_size, see
+        graph.node_name2idx_map). Scores are normalized to sum to 1.
         alpha (float, optional): Damping factor. Defaults to 0.85.
         max_iter (int, optional): Maximum number of iterations. Defaults to 100.
         tol (float, optional): Tolerance for convergence. Defaults to 1e-6.
+        stats (dict, optional): If given, filled with iteration statistics: "iterations"
+            (number of iterations run), "diff" (L1 change of the last iteration) and
+            "converged" (whether tol was reached before max_iter). Defaults to None.
+        num_threads (int, optional): Number of threads for the PageRank kernel. Values <= 0
+            use the OpenMP default (OMP_NUM_THREADS or all cores). Ignored when quick_algo
+            was built without OpenMP (see openmp_enabled). Small graphs always run
+            single-threaded. Defaults to 0.
+
+    The iteration runs without holding the GIL, so queries on a shared CSRGraph can
+    overlap in a thread pool.
 
     Returns:
         dict[str, float]: A dictionary mapping node identifiers to their PageRank scores.
     """
-    ...
\ No newline at end of file
+    ...
+
+def run_pagerank_batch(
+    graph: DiGraph | CSRGraph,
+    personalizations: list[dict[str, float] | np.ndarray] | np.ndarray,
+    init_score: None | list[dict[str, float] | np.ndarray] | np.ndarray = None,
+    dangling_weight: None | list[dict[str, float] | np.ndarray] | np.ndarray = None,
+    alpha: float = 0.85,
+    max_iter: int = 100,
+    tol: float = 1e-6,
+    stats: None | list = None,
+    num_threads: int = 0,
+) -> list[memoryview]:
+    """
+    Run Personalized PageRank for B personalization vectors at once.
+
+    The vectors are iterated together as a sparse-matrix x dense-matrix product, so
+    each in-edge is read once per iteration for all vectors. Convergence is tracked per
+    vector and converged vectors drop out of later iterations. With a single thread
+    each result matches the corresponding run_pagerank call.
+
+    Args:
+        graph (DiGraph | CSRGraph): The directed graph, or a snapshot from graph.freeze().
+        personalizations (list | np.ndarray): A list of personalization vectors (each in
+            any format accepted by run_pagerank), or a C-contiguous float64 array of
+            shape (B, graph.node_array_size).
+        init_score (list | np.ndarray, optional): Initial scores per vector, in the same
+            format as personalizations. Defaults to the uniform distribution.
+        dangling_weight (list | np.ndarray, optional): Dangling node weights per vector,
+            in the same format as personalizations. Defaults to the personalization vectors.
+        alpha, max_iter, tol, num_threads: Same as in run_pagerank; tol applies to each
+            vector separately.
+        stats (list, optional): If given, replaced with one statistics dict per vector
+            (same keys as in run_pagerank). Defaults to None.
+
+    Returns:
+        list[memoryview]: One float64 array per vector, indexed by node index (length
+        graph.node_array_size, see graph.node_name2idx_map).
+    """
+    ...
+
+def run_pagerank_top_k(
+    graph: DiGraph | CSRGraph,
+    top_k: int,
+    candidates: None | np.ndarray = None,
+    mask: None | np.ndarray = None,
+    init_score: None | dict[str, float] | np.ndarray = None,
+    personalization: None | dict[str, float] | np.ndarray = None,
+    dangling_weight: None | dict[str, float] | np.ndarray = None,
+    alpha: float = 0.85,
+    max_iter: int = 100,
+    tol: float = 1e-6,
+    stats: None | dict = None,
+    num_threads: int = 0,
+) -> list[tuple[str, float]]:
+    """
+    Run the PageRank algorithm and return only the top_k highest-scoring candidate nodes.
+
+    The selection is done in C++ with a partial sort, so no per-node Python objects are
+    created for the nodes outside the result. Both the iteration and the selection run
+    without holding the GIL.
+
+    Args:
+        graph (DiGraph | CSRGraph): The directed graph on which to run PageRank, or a
+            snapshot from graph.freeze(). A DiGraph reuses its cached snapshot while
+            unchanged, so repeated calls skip building the weight matrix.
+        top_k (int): Number of nodes to return.
+        candidates (np.ndarray, optional): Contiguous int64 array of candidate node indices.
+            Invalid or removed indices are skipped. Defaults to None.
+        mask (np.ndarray, optional): Contiguous uint8 array of length graph.node_array_size;
+            nodes with a non-zero entry are candidates. Mutually exclusive with candidates.
+            When both are None, every node is a candidate. Defaults to None.
+        init_score, personalization, dangling_weight, alpha, max_iter, tol, stats, num_threads:
+            Same as in run_pagerank.
+
+    Returns:
+        list[tuple[str, float]]: (node name, score) pairs sorted by score in descending
+        order (ties broken by node index).
+    """
+    ...
+
+def run_pagerank_push(
+    graph: DiGraph | CSRGraph,
+    top_k: int,
+    personalization: dict[str, float] | np.ndarray,
+    candidates: None | np.ndarray = None,
+    mask: None | np.ndarray = None,
+    alpha: float = 0.85,
+    epsilon: float = 1e-6,
+    stats: None | dict = None,
+) -> list[tuple[str, float]]:
+    """
+    Approximate Personalized PageRank by forward push (Andersen-Chung-Lang), returning
+    only the top_k highest-scoring candidate nodes.
+
+    Residual mass starts at the seeds and is pushed along normalized out-edges until every
+    node's residual is below epsilon times its out-degree. The work depends on the touched
+    neighbourhood, not on the graph size. Dangling nodes send their mass back to the seeds,
+    matching run_pagerank with the default dangling_weight. Approximate scores never exceed
+    the exact ones, and the L1 error is bounded by the remaining residual.
+
+    Args:
+        graph (DiGraph | CSRGraph): The directed graph, or a snapshot from graph.freeze().
+        top_k (int): Number of nodes to return.
+        personalization (dict[str, float] | np.ndarray): Personalization vector, in the
+            same format as in run_pagerank.
+        candidates, mask: Same as in run_pagerank_top_k.
+        alpha (float, optional): Damping factor, in [0, 1). Defaults to 0.85.
+        epsilon (float, optional): Residual threshold. The cost grows roughly with
+            1 / epsilon. Defaults to 1e-6.
+        stats (dict, optional): If given, filled with "pushes" (number of pushes),
+            "touched" (number of nodes reached) and "residual" (remaining residual mass, an
+            upper bound of the L1 error). Defaults to None.
+
+    Returns:
+        list[tuple[str, float]]: (node name, approximate score) pairs sorted by score in
+        descending order. Nodes the push never scored are left out, so fewer than top_k
+        pairs may be returned.
+    """
+    ...
@@ -1,84 +1,568 @@
 # distutils: language=c++
 
 from libc.stdlib cimport free, malloc
+from libcpp.vector cimport vector
 
-from .di_graph cimport DiGraph
+from .di_graph cimport CCSRGraph, CSRGraph, DiGraph
 
-__all__ = ["run_pagerank"]
+__all__ = ["openmp_enabled", "run_pagerank", "run_pagerank_batch", "run_pagerank_push", "run_pagerank_top_k"]
+
+cdef CSRGraph _as_csr(object graph):
+    """
+    获取图的CSR快照（DiGraph会复用其未失效的快照）
+    """
+    if isinstance(graph, DiGraph):
+        return (<DiGraph> graph).freeze()
+    if isinstance(graph, CSRGraph):
+        return <CSRGraph> graph
+    raise TypeError(f"Expected DiGraph or CSRGraph, got {type(graph).__name__}.")
+
+cdef double *_alloc_array(Py_ssize_t size) except NULL:
+    """
+    分配长度为size的double数组（需由调用方释放）
+    分配失败时抛出MemoryError，而非返回NULL
+    """
+    cdef double *array = <double *> malloc((size if size > 0 else 1) * sizeof(double))
+    if array == NULL:
+        raise MemoryError(f"Failed to allocate an array of {size} doubles.")
+    return array
+
+cdef void _fill_vector(CSRGraph graph, object values, double *array, Py_ssize_t node_array_size) except *:
+    """
+    将节点分数写入数组（概率归一化）
+    :param graph: 图的CSR快照
+    :param values: 节点名到分数的映射，或以节点索引为下标的分数数组（长度为graph.node_array_size）
+    :param array: 输出数组
+    :param node_array_size: 节点数组大小
+    """
+    cdef const double[::1] view
+    cdef Py_ssize_t i
+    cdef double total = 0.0
+
+    if isinstance(values, dict):
+        total = sum(values.values())
+        if total <= 0:
+            raise ValueError("Sum of the score vector must be positive.")
+        for node_name, idx in graph.node_name2idx_map.items():
+            array[idx] = values.get(node_name, 0.0) / total
+        return
+
+    view = values
+    if view.shape[0] != node_array_size:
+        raise ValueError(
+            f"Length of the score array ({view.shape[0]}) does not match the node array size ({node_array_size})."
+        )
+    with nogil:
+        for i in range(node_array_size):
+            total += view[i]
+    if total <= 0:
+        raise ValueError("Sum of the score vector must be positive.")
+    with nogil:
+        for i in range(node_array_size):
+            array[i] = view[i] / total
+
+cdef double *_run_pagerank(
+        CSRGraph graph,
+        object init_score,
+        object personalization,
+        object dangling_weight,
+        double alpha,
+        int max_iter,
+        double tol,
+        object stats,
+        int num_threads
+) except NULL:
+    """
+    运行PageRank算法，返回以节点索引为下标的结果数组（需由调用方释放）
+    除个性化向量等参数的转换外，计算过程不持有GIL
+    """
+    cdef PageRankStats c_stats
+    cdef double *rank_result
+    cdef const CCSRGraph *c_csr = graph.csr
+    cdef Py_ssize_t node_array_size = c_csr.node_array_size
+    cdef double uniform = 1.0 / c_csr.num_nodes if c_csr.num_nodes > 0 else 0.0
+    cdef Py_ssize_t i
+
+    cdef double *init_score_array = NULL
+    cdef double *personalization_array = NULL
+    cdef double *dangling_weight_array = NULL
+
+    try:
+        init_score_array = _alloc_array(node_array_size)
+        personalization_array = _alloc_array(node_array_size)
+        dangling_weight_array = _alloc_array(node_array_size)
+
+        with nogil:
+            for i in range(node_array_size):
+                init_score_array[i] = 0
+                personalization_array[i] = 0
+                dangling_weight_array[i] = 0
+
+        if init_score is not None:
+            _fill_vector(graph, init_score, init_score_array, node_array_size)
+        else:
+            with nogil:
+                for i in range(node_array_size):
+                    if c_csr.valid[i]:
+                        init_score_array[i] = uniform
+
+        if personalization is not None:
+            _fill_vector(graph, personalization, personalization_array, node_array_size)
+        else:
+            with nogil:
+                for i in range(node_array_size):
+                    if c_csr.valid[i]:
+                        personalization_array[i] = uniform
+
+        if dangling_weight is not None:
+            _fill_vector(graph, dangling_weight, dangling_weight_array, node_array_size)
+        else:
+            with nogil:
+                for i in range(node_array_size):
+                    dangling_weight_array[i] = personalization_array[i]
+
+        with nogil:
+            rank_result = pagerank_csr(
+                c_csr,
+                init_score_array,
+                personalization_array,
+                dangling_weight_array,
+                alpha,
+                max_iter,
+                tol,
+                &c_stats,
+                num_threads
+            )
+        if stats is not None:
+            stats["iterations"] = c_stats.num_iter
+            stats["diff"] = c_stats.diff
+            stats["converged"] = c_stats.converged
+        return rank_result
+    finally:
+        free(init_score_array)
+        free(personalization_array)
+        free(dangling_weight_array)
+
+cdef list _as_rows(object values, Py_ssize_t num_vectors):
+    """
+    将批量参数拆分为各向量（列表中的每一项，或二维数组的每一行）
+    """
+    cdef const double[:, ::1] view
+    if isinstance(values, (list, tuple)):
+        rows = list(values)
+    else:
+        view = values
+        rows = [view[b] for b in range(view.shape[0])]
+    if num_vectors >= 0 and len(rows) != num_vectors:
+        raise ValueError(
+            f"Number of vectors ({len(rows)}) does not match the number of personalization vectors ({num_vectors})."
+        )
+    return rows
+
+cdef void _fill_matrix(CSRGraph graph, list rows, double *matrix, Py_ssize_t node_array_size) except *:
+    """
+    将各向量写入按节点行优先存储的矩阵（node_array_size x B，每列概率归一化）
+    :param graph: 图的CSR快照
+    :param rows: 各向量（格式同_fill_vector的values）
+    :param matrix: 输出矩阵
+    :param node_array_size: 节点数组大小
+    """
+    cdef Py_ssize_t num_vectors = len(rows)
+    cdef Py_ssize_t b, i
+    cdef double *vector_array = NULL
+    try:
+        vector_array = _alloc_array(node_array_size)
+        for b in range(num_vectors):
+            with nogil:
+                for i in range(node_array_size):
+                    vector_array[i] = 0
+            _fill_vector(graph, rows[b], vector_array, node_array_size)
+            with nogil:
+                for i in range(node_array_size):
+                    matrix[i * num_vectors + b] = vector_array[i]
+    finally:
+        free(vector_array)
+
+def openmp_enabled() -> bool:
+    """
+    quick_algo编译时是否启用了OpenMP（PageRank多线程计算）
+    :return: 是否启用
+    """
+    return pagerank_openmp_enabled()
 
 def run_pagerank(
-        graph: DiGraph,
-        init_score: None | dict[str, float] = None,
-        personalization: None | dict[str, float] = None,
-        dangling_weight: None | dict[str, float] = None,
+        graph,
+        init_score = None,
+        personalization = None,
+        dangling_weight = None,
         alpha: float = 0.85,
         max_iter: int = 100,
-        tol: float = 1e-6
+        tol: float = 1e-6,
+        stats: dict | None = None,
+        int num_threads = 0
 ):
     """
     运行PageRank算法
-    :param graph: 有向图
+    :param graph: 有向图（DiGraph，或其CSR快照CSRGraph）
     :param init_score: 初始分数
     :param personalization: 节点的个性化向量
     :param dangling_weight: 悬空节点的权重
+    以上三者可以是节点名到分数的映射，也可以是以节点索引为下标的float64连续数组（长度为graph.node_array_size）
     :param alpha: 阻尼系数
     :param max_iter: 最大迭代次数
     :param tol: 收敛阈值
+    :param stats: 传入dict时写入迭代统计信息（iterations：迭代次数，diff：最后一次迭代的残差，converged：是否收敛）
+    :param num_threads: 计算线程数（不大于0时使用OpenMP的默认线程数；未启用OpenMP时始终单线程）
     :return: PageRank值列表
     """
-    node_array_size = graph.graph.nodes.size()
-    num_nodes = graph.graph.num_nodes
+    cdef CSRGraph csr = _as_csr(graph)
+    cdef double *rank_result = _run_pagerank(
+        csr, init_score, personalization, dangling_weight, alpha, max_iter, tol, stats, num_threads
+    )
 
-    cdef double *init_score_array = <double *> malloc(node_array_size * sizeof(double))
-    cdef double *personalization_array = <double *> malloc(node_array_size * sizeof(double))
-    cdef double *dangling_weight_array = <double *> malloc(node_array_size * sizeof(double))
+    result = dict()
+    try:
+        for node_name, idx in csr.node_name2idx_map.items():
+            result[node_name] = rank_result[idx]
+    finally:
+        free(rank_result)
 
-    for i in range(node_array_size):
-        init_score_array[i] = 0
-        personalization_array[i] = 0
-        dangling_weight_array[i] = 0
+    return result
 
-    if init_score is not None:
-        sum_init_score = sum(init_score.values())
-    if personalization is not None:
-        sum_personalization = sum(personalization.values())
-    if dangling_weight is not None:
-        sum_dangling_weight = sum(dangling_weight.values())
+def run_pagerank_batch(
+        graph,
+        personalizations,
+        init_score = None,
+        dangling_weight = None,
+        alpha: float = 0.85,
+        max_iter: int = 100,
+        tol: float = 1e-6,
+        stats: list | None = None,
+        int num_threads = 0
+):
+    """
+    批量运行个性化PageRank算法：B个个性化向量在同一次迭代中计算（稀疏矩阵 x 稠密矩阵），
+    每条入边只读取一次即可更新所有向量，各向量独立判断收敛
+    :param graph: 有向图（DiGraph，或其CSR快照CSRGraph）
+    :param personalizations: 个性化向量列表（每项格式同run_pagerank的personalization），
+                             或形状为(B, graph.node_array_size)的float64 C连续二维数组
+    :param init_score: 各向量的初始分数（格式同personalizations），为None时使用均匀分布
+    :param dangling_weight: 各向量的悬空节点权重（格式同personalizations），为None时与个性化向量相同
+    :param alpha: 阻尼系数
+    :param max_iter: 最大迭代次数
+    :param tol: 收敛阈值（对各向量分别判断）
+    :param stats: 传入list时写入各向量的迭代统计信息（每项格式同run_pagerank的stats）
+    :param num_threads: 计算线程数（不大于0时使用OpenMP的默认线程数；未启用OpenMP时始终单线程）
+    :return: 各向量的PageRank值，每项为以节点索引为下标的float64数组（长度为graph.node_array_size）
+    """
+    cdef CSRGraph csr = _as_csr(graph)
+    cdef const CCSRGraph *c_csr = csr.csr
+    cdef Py_ssize_t node_array_size = c_csr.node_array_size
+    cdef double uniform = 1.0 / c_csr.num_nodes if c_csr.num_nodes > 0 else 0.0
+    cdef list personalization_rows = _as_rows(personalizations, -1)
+    cdef Py_ssize_t num_vectors = len(personalization_rows)
+    cdef list init_score_rows = None if init_score is None else _as_rows(init_score, num_vectors)
+    cdef list dangling_weight_rows = None if dangling_weight is None else _as_rows(dangling_weight, num_vectors)
+    cdef Py_ssize_t size = node_array_size * num_vectors
+    cdef Py_ssize_t b, i
+    cdef vector[PageRankStats] c_stats
+    cdef double *rank_result = NULL
+    cdef double[::1] out
+    cdef double c_alpha = alpha
+    cdef int c_max_iter = max_iter
+    cdef double c_tol = tol
 
-    for node_name, idx in graph.node_name2idx_map.items():
-        if init_score is not None:
-            init_score_array[idx] = init_score.get(node_name, 0.0) / sum_init_score
-        else:
-            init_score_array[idx] = 1.0 / num_nodes
+    if num_vectors == 0:
+        if stats is not None:
+            stats.clear()
+        return []
 
-        if personalization is not None:
-            personalization_array[idx] = personalization.get(node_name, 0.0) / sum_personalization
+    cdef double *init_score_mat = NULL
+    cdef double *personalization_mat = NULL
+    cdef double *dangling_weight_mat = NULL
+
+    try:
+        init_score_mat = _alloc_array(size)
+        personalization_mat = _alloc_array(size)
+        dangling_weight_mat = _alloc_array(size)
+
+        _fill_matrix(csr, personalization_rows, personalization_mat, node_array_size)
+
+        if init_score_rows is not None:
+            _fill_matrix(csr, init_score_rows, init_score_mat, node_array_size)
         else:
-            personalization_array[idx] = 1.0 / num_nodes
+            with nogil:
+                for i in range(node_array_size):
+                    for b in range(num_vectors):
+                        init_score_mat[i * num_vectors + b] = uniform if c_csr.valid[i] else 0.0
 
-        if dangling_weight is not None:
-            dangling_weight_array[idx] = dangling_weight.get(node_name, 0.0) / sum_dangling_weight
+        if dangling_weight_rows is not None:
+            _fill_matrix(csr, dangling_weight_rows, dangling_weight_mat, node_array_size)
         else:
-            dangling_weight_array[idx] = personalization_array[idx]
-
-    cdef double *rank_result = pagerank(
-        graph.graph,
-        init_score_array,
-        personalization_array,
-        dangling_weight_array,
-        alpha,
-        max_iter,
-        tol
+            with nogil:
+                for i in range(size):
+                    dangling_weight_mat[i] = personalization_mat[i]
+
+        c_stats.resize(num_vectors)
+        with nogil:
+            rank_result = pagerank_csr_batch(
+                c_csr,
+                num_vectors,
+                init_score_mat,
+                personalization_mat,
+                dangling_weight_mat,
+                c_alpha,
+                c_max_iter,
+                c_tol,
+                c_stats.data(),
+                num_threads
+            )
+
+        # 按向量拆分结果
+        result = []
+        for b in range(num_vectors):
+            out = memoryview(bytearray(node_array_size * sizeof(double))).cast("d")
+            with nogil:
+                for i in range(node_array_size):
+                    out[i] = rank_result[i * num_vectors + b]
+            result.append(out)
+    finally:
+        free(init_score_mat)
+        free(personalization_mat)
+        free(dangling_weight_mat)
+        free(rank_result)
+
+    if stats is not None:
+        stats.clear()
+        stats.extend(
+            {
+                "iterations": c_stats[b].num_iter,
+                "diff": c_stats[b].diff,
+                "converged": c_stats[b].converged,
+            }
+            for b in range(num_vectors)
+        )
+    return result
+
+def run_pagerank_top_k(
+        graph,
+        int top_k,
+        candidates = None,
+        mask = None,
+        init_score = None,
+        personalization = None,
+        dangling_weight = None,
+        alpha: float = 0.85,
+        max_iter: int = 100,
+        tol: float = 1e-6,
+        stats: dict | None = None,
+        int num_threads = 0
+):
+    """
+    运行PageRank算法，仅返回候选节点中分数最高的top_k个节点（在C++中完成部分排序）
+    :param graph: 有向图（DiGraph，或其CSR快照CSRGraph）
+    :param top_k: 返回的节点数
+    :param candidates: 候选节点的索引（int64连续数组），为None时由mask确定
+    :param mask: 以节点索引为下标的uint8连续数组（长度为graph.node_array_size），非0表示候选节点；
+                 candidates与mask均为None时，所有节点均为候选节点
+    :param init_score: 初始分数
+    :param personalization: 节点的个性化向量
+    :param dangling_weight: 悬空节点的权重
+    以上三者的格式同run_pagerank
+    :param alpha: 阻尼系数
+    :param max_iter: 最大迭代次数
+    :param tol: 收敛阈值
+    :param stats: 传入dict时写入迭代统计信息（iterations：迭代次数，diff：最后一次迭代的残差，converged：是否收敛）
+    :param num_threads: 计算线程数（不大于0时使用OpenMP的默认线程数；未启用OpenMP时始终单线程）
+    :return: 按分数降序排列的(节点名, 分数)列表
+    """
+    cdef CSRGraph csr = _as_csr(graph)
+    cdef const CCSRGraph *c_csr = csr.csr
+    cdef Py_ssize_t node_array_size = c_csr.node_array_size
+    cdef const long long[::1] candidate_view
+    cdef const unsigned char[::1] mask_view
+    cdef const long long *candidate_ptr = NULL
+    cdef long long num_candidates = 0
+    cdef const unsigned char *mask_ptr = NULL
+
+    if candidates is not None and mask is not None:
+        raise ValueError("Only one of candidates and mask can be specified.")
+    if top_k < 0:
+        raise ValueError("top_k must be non-negative.")
+    if candidates is not None:
+        candidate_view = candidates
+        num_candidates = candidate_view.shape[0]
+        if num_candidates > 0:
+            candidate_ptr = &candidate_view[0]
+    elif mask is not None:
+        mask_view = mask
+        if mask_view.shape[0] != node_array_size:
+            raise ValueError(
+                f"Length of the mask ({mask_view.shape[0]}) does not match the node array size ({node_array_size})."
+            )
+        if node_array_size > 0:
+            mask_ptr = &mask_view[0]
+
+    cdef double *rank_result = _run_pagerank(
+        csr, init_score, personalization, dangling_weight, alpha, max_iter, tol, stats, num_threads
     )
 
-    free(init_score_array)
-    free(personalization_array)
-    free(dangling_weight_array)
-    
-    result = dict()
-    for node_name, idx in graph.node_name2idx_map.items():
-        result[node_name] = rank_result[idx]
+    cdef vector[long long] top_idx
+    cdef long long num_top
+    try:
+        top_idx.resize(top_k)
+        with nogil:
+            num_top = top_k_nodes(
+                c_csr,
+                rank_result,
+                candidate_ptr,
+                num_candidates,
+                mask_ptr,
+                top_k,
+                top_idx.data()
+            )
+        node_idx2name = csr.node_idx2name
+        result = [
+            (node_idx2name[top_idx[i]], rank_result[top_idx[i]])
+            for i in range(num_top)
+        ]
+    finally:
+        free(rank_result)
+
+    return result
+
+def run_pagerank_push(
+        graph,
+        int top_k,
+        personalization,
+        candidates = None,
+        mask = None,
+        double alpha = 0.85,
+        double epsilon = 1e-6,
+        stats: dict | None = None
+):
+    """
+    基于前向推送（Andersen-Chung-Lang）的近似个性化PageRank，仅返回候选节点中近似分数最高的top_k个节点
+    从种子节点出发推送残差，直至所有节点的残差均小于epsilon * 出度，计算量只与推送所及的邻域有关，与图的规模无关
+    悬挂节点的分数按个性化向量分配（与run_pagerank中dangling_weight取默认值时一致）
+    :param graph: 有向图（DiGraph，或其CSR快照CSRGraph）
+    :param top_k: 返回的节点数
+    :param personalization: 节点的个性化向量（格式同run_pagerank），
+                            或稀疏形式的(种子节点索引, 种子权重)二元组（int64与float64连续数组），
+                            稀疏形式无需构建与遍历长度为graph.node_array_size的数组
+    :param candidates: 候选节点的索引（int64连续数组），为None时由mask确定
+                       （开销与候选节点数成正比，候选节点较多时应改用mask）
+    :param mask: 以节点索引为下标的uint8连续数组（长度为graph.node_array_size），非0表示候选节点；
+                 candidates与mask均为None时，所有节点均为候选节点
+    :param alpha: 阻尼系数
+    :param epsilon: 残差阈值（越小越精确，计算量约与1 / epsilon成正比）
+    :param stats: 传入dict时写入推送统计信息（pushes：推送次数，touched：访问到的节点数，
+                  residual：剩余残差之和，即近似分数与精确分数之差的L1范数上界）
+    :return: 按近似分数降序排列的(节点名, 分数)列表（仅包含近似分数大于0的节点）
+    """
+    cdef CSRGraph csr = _as_csr(graph)
+    cdef const CCSRGraph *c_csr = csr.csr
+    cdef Py_ssize_t node_array_size = c_csr.node_array_size
+    cdef const long long[::1] candidate_view
+    cdef const unsigned char[::1] mask_view
+    cdef const double[::1] personalization_view
+    cdef const long long[::1] seed_idx_view
+    cdef const double[::1] seed_weight_view
+    cdef const long long *candidate_ptr = NULL
+    cdef long long num_candidates = 0
+    cdef const unsigned char *mask_ptr = NULL
+    cdef vector[long long] seed_idx
+    cdef vector[double] seed_weight
+    cdef double total = 0.0
+    cdef Py_ssize_t i
+    cdef PushStats c_stats
+    cdef vector[long long] top_idx
+    cdef vector[double] top_score
+    cdef long long num_top
+
+    if candidates is not None and mask is not None:
+        raise ValueError("Only one of candidates and mask can be specified.")
+    if top_k < 0:
+        raise ValueError("top_k must be non-negative.")
+    if not 0 <= alpha < 1:
+        raise ValueError("alpha must be in [0, 1).")
+    if epsilon <= 0:
+        raise ValueError("epsilon must be positive.")
+    if candidates is not None:
+        candidate_view = candidates
+        num_candidates = candidate_view.shape[0]
+        if num_candidates > 0:
+            candidate_ptr = &candidate_view[0]
+    elif mask is not None:
+        mask_view = mask
+        if mask_view.shape[0] != node_array_size:
+            raise ValueError(
+                f"Length of the mask ({mask_view.shape[0]}) does not match the node array size ({node_array_size})."
+            )
+        if node_array_size > 0:
+            mask_ptr = &mask_view[0]
+
+    # 提取种子节点（概率归一化）
+    if isinstance(personalization, dict):
+        total = sum(personalization.values())
+        for node_name, weight in personalization.items():
+            idx = csr.node_name2idx_map.get(node_name)
+            if idx is not None and weight != 0:
+                seed_idx.push_back(idx)
+                seed_weight.push_back(weight)
+    elif isinstance(personalization, tuple):
+        seed_idx_view, seed_weight_view = personalization
+        if seed_idx_view.shape[0] != seed_weight_view.shape[0]:
+            raise ValueError(
+                f"Length of the seed indices ({seed_idx_view.shape[0]}) does not match the seed weights ({seed_weight_view.shape[0]})."
+            )
+        for i in range(seed_idx_view.shape[0]):
+            if not 0 <= seed_idx_view[i] < node_array_size:
+                raise ValueError(f"Seed index {seed_idx_view[i]} is out of range.")
+            if seed_weight_view[i] != 0:
+                total += seed_weight_view[i]
+                seed_idx.push_back(seed_idx_view[i])
+                seed_weight.push_back(seed_weight_view[i])
+    else:
+        personalization_view = personalization
+        if personalization_view.shape[0] != node_array_size:
+            raise ValueError(
+                f"Length of the score array ({personalization_view.shape[0]}) does not match the node array size ({node_array_size})."
+            )
+        with nogil:
+            for i in range(node_array_size):
+                if personalization_view[i] != 0:
+                    total += personalization_view[i]
+                    seed_idx.push_back(i)
+                    seed_weight.push_back(personalization_view[i])
+    if total <= 0:
+        raise ValueError("Sum of the personalization vector must be positive.")
+    for i in range(<Py_ssize_t> seed_weight.size()):
+        seed_weight[i] /= total
+
+    top_idx.resize(top_k)
+    top_score.resize(top_k)
+    with nogil:
+        num_top = pagerank_push(
+            c_csr,
+            seed_idx.size(),
+            seed_idx.data(),
+            seed_weight.data(),
+            alpha,
+            epsilon,
+            candidate_ptr,
+            num_candidates,
+            mask_ptr,
+            top_k,
+            top_idx.data(),
+            top_score.data(),
+            &c_stats
+        )
 
-    free(rank_result)
+    if stats is not None:
+        stats["pushes"] = c_stats.num_pushes
+        stats["touched"] = c_stats.num_touched
+        stats["residual"] = c_stats.residual
 
-    return result
\ No newline at end of file
+    node_idx2name = csr.node_idx2name
+    return [(node_idx2name[top_idx[i]], top_score[i]) for i in range(num_top)]
@@ -1,5 +1,5 @@
 # Unit tests for the DiGraph class in quick_algo
-from quick_algo.di_graph import DiGraph, DiNode, DiEdge, save_to_file, load_from_file
+from quick_algo.di_graph import CSRGraph, DiGraph, DiNode, DiEdge, save_to_file, load_from_file
 
 
 class TestDiGraph:
@@ -292,3 +292,235 @@ class TestDiGraph:
         assert graph["node1"]["content"] == "test content2"
         assert graph["node2"]["content"] == "test content2"
 
+    def test_upsert_edges(self):
+        print("\nRunning TestDiGraph - 6")
+
+        graph = DiGraph()
+        graph.add_edge(DiEdge("node1", "node2", {"weight": 1.0, "create_time": 100}))
+
+        # 批量插入/更新边（含新节点与批次内重复的边）
+        print("TestDiGraph - 6 - CP1")
+        is_new = graph.upsert_edges_from(
+            ["node1", "node2", "node3", "node2"],
+            ["node2", "node3", "node1", "node3"],
+            [2.0, 3.0, 4.0, 5.0],
+            attrs={"update_time": 200},
+            new_attrs={"create_time": 200},
+        )
+        assert is_new == [False, True, True, False]
+        assert "node3" in graph
+        assert len(graph.get_edge_list()) == 3
+        assert graph["node1", "node2"]["weight"] == 3.0
+        assert graph["node1", "node2"]["create_time"] == 100
+        assert graph["node1", "node2"]["update_time"] == 200
+        assert graph["node2", "node3"]["weight"] == 8.0
+        assert graph["node2", "node3"].attr == {
+            "weight": 8.0,
+            "create_time": 200,
+            "update_time": 200,
+        }
+
+        # 覆盖权重
+        print("TestDiGraph - 6 - CP2")
+        is_new = graph.upsert_edges_from(
+            ["node3"], ["node1"], [1.5], attrs=[{"tag": "x"}], accumulate=False
+        )
+        assert is_new == [False]
+        assert graph["node3", "node1"]["weight"] == 1.5
+        assert graph["node3", "node1"]["tag"] == "x"
+
+        # 与PageRank使用的C-graph权重保持一致
+        print("TestDiGraph - 6 - CP3")
+        from quick_algo.pagerank import run_pagerank
+
+        res = run_pagerank(graph, personalization={"node1": 1.0}, tol=1e-10)
+        ref = DiGraph()
+        ref.add_edges_from(
+            [
+                DiEdge(src, dst, {"weight": graph[src, dst]["weight"]})
+                for src, dst in graph.get_edge_list()
+            ]
+        )
+        ref_res = run_pagerank(ref, personalization={"node1": 1.0}, tol=1e-10)
+        for node in res:
+            assert abs(res[node] - ref_res[node]) < 1e-12
+
+        # 长度不一致
+        print("TestDiGraph - 6 - CP4")
+        try:
+            graph.upsert_edges_from(["node1"], ["node2", "node3"], [1.0])
+            assert False  # 如果没有抛出异常，则测试失败
+        except ValueError:
+            pass
+
+    def test_version(self):
+        print("\nRunning TestDiGraph - 7")
+
+        graph = DiGraph()
+        assert graph.version == 0
+
+        # 图结构变化时版本号递增
+        print("TestDiGraph - 7 - CP1")
+        versions = [graph.version]
+        graph.add_node(DiNode("node1"))
+        versions.append(graph.version)
+        graph.add_edge(DiEdge("node1", "node2", {"weight": 1.0}))
+        versions.append(graph.version)
+        graph.update_edge(DiEdge("node1", "node2", {"weight": 2.0}))
+        versions.append(graph.version)
+        graph.upsert_edges_from(["node2"], ["node1"], [1.0])
+        versions.append(graph.version)
+        graph.remove_edge(("node2", "node1"))
+        versions.append(graph.version)
+        graph.remove_node("node2")
+        versions.append(graph.version)
+        graph.compact_node_array()
+        versions.append(graph.version)
+        graph.clear()
+        versions.append(graph.version)
+        assert all(a < b for a, b in zip(versions, versions[1:]))
+
+        # 仅修改节点属性不影响版本号
+        print("TestDiGraph - 7 - CP2")
+        graph.add_node(DiNode("node1"))
+        version = graph.version
+        graph.update_node(DiNode("node1", {"tag": "x"}))
+        assert graph.version == version
+
+    def test_freeze(self):
+        print("\nRunning TestDiGraph - 8")
+
+        graph = DiGraph()
+        graph.add_edges_from(
+            [
+                DiEdge("node1", "node2", {"weight": 1.0}),
+                DiEdge("node1", "node3", {"weight": 3.0}),
+                DiEdge("node2", "node3", {"weight": 2.0}),
+                DiEdge("node3", "node1", {"weight": 1.0}),
+                DiEdge("node4", "node3", {"weight": 1.0}),
+            ]
+        )
+        graph.remove_node("node4")
+
+        # 快照内容：按目标节点组织的入边，权重按源节点出边权重和归一化
+        print("TestDiGraph - 8 - CP1")
+        csr = graph.freeze()
+        assert isinstance(csr, CSRGraph)
+        assert csr.node_array_size == graph.node_array_size
+        assert csr.num_nodes == 3
+        assert csr.num_edges == 4
+        indptr = list(csr.indptr)
+        indices = list(csr.indices)
+        weights = list(csr.weights)
+        assert len(indptr) == csr.node_array_size + 1
+        assert indptr[-1] == 4
+        in_edges = dict()
+        for dst_idx in range(csr.node_array_size):
+            for j in range(indptr[dst_idx], indptr[dst_idx + 1]):
+                in_edges[(csr.node_idx2name[indices[j]], csr.node_idx2name[dst_idx])] = weights[j]
+        assert in_edges == {
+            ("node1", "node2"): 0.25,
+            ("node1", "node3"): 0.75,
+            ("node2", "node3"): 1.0,
+            ("node3", "node1"): 1.0,
+        }
+
+        # 图未变化时复用快照，变化后重新构建，旧快照保持不变
+        print("TestDiGraph - 8 - CP2")
+        assert graph.freeze() is csr
+        graph.update_node(DiNode("node1", {"tag": "x"}))
+        assert graph.freeze() is csr
+        graph.add_edge(DiEdge("node2", "node1", {"weight": 2.0}))
+        new_csr = graph.freeze()
+        assert new_csr is not csr
+        assert new_csr.num_edges == 5
+        assert csr.num_edges == 4
+        assert list(csr.indptr) == indptr
+
+        # PageRank在快照与原图上的结果一致
+        print("TestDiGraph - 8 - CP3")
+        from quick_algo.pagerank import run_pagerank
+
+        res = run_pagerank(graph, personalization={"node1": 1.0}, tol=1e-10)
+        csr_res = run_pagerank(new_csr, personalization={"node1": 1.0}, tol=1e-10)
+        assert res == csr_res
+        old_res = run_pagerank(csr, personalization={"node1": 1.0}, tol=1e-10)
+        assert old_res != res
+
+    def test_save_load_binary(self):
+        print("\nRunning TestDiGraph - 9")
+        import os
+        from quick_algo.pagerank import run_pagerank
+
+        graph = DiGraph()
+        graph.add_nodes_from(
+            [
+                DiNode("节点1", {"content": "测试内容", "type": "ent", "create_time": 1.5}),
+                DiNode("node2", {"content": "test content", "count": 3, "flag": True}),
+                DiNode("node3"),
+                DiNode("node4", {"count": 1 << 70}),
+            ]
+        )
+        graph.upsert_edges_from(
+            ["节点1", "node2", "node2", "node3", "node5", "node3"],
+            ["node2", "node3", "节点1", "节点1", "node3", "node5"],
+            [1.0, 2.0, 0.5, 1.5, 3.0, 1.0],
+            attrs={"update_time": 100},
+            new_attrs=[{"create_time": 1.0}, None, {"tag": "x"}, None, None, {"flag": False}],
+        )
+        graph.remove_node("node4")
+
+        # 保存并加载二进制格式
+        print("TestDiGraph - 9 - CP1")
+        save_to_file(graph, "test_graph.qag")
+        loaded_graph = load_from_file("test_graph.qag")
+        assert sorted(loaded_graph.get_node_list()) == sorted(graph.get_node_list())
+        assert sorted(loaded_graph.get_edge_list()) == sorted(graph.get_edge_list())
+        for node_name in graph.get_node_list():
+            assert graph[node_name].attr == loaded_graph[node_name].attr
+            for key, value in graph[node_name].attr.items():
+                assert type(loaded_graph[node_name].attr[key]) is type(value)
+        for edge_key in graph.get_edge_list():
+            assert graph[edge_key].attr == loaded_graph[edge_key].attr
+        # 加载后的节点数组是压缩的，与压缩后的原图结构完全一致
+        graph.compact_node_array()
+        assert loaded_graph.node_idx2name == graph.node_idx2name
+        csr, loaded_csr = graph.freeze(), loaded_graph.freeze()
+        assert list(loaded_csr.indptr) == list(csr.indptr)
+        assert list(loaded_csr.indices) == list(csr.indices)
+        assert list(loaded_csr.weights) == list(csr.weights)
+        assert run_pagerank(loaded_graph, personalization={"节点1": 1.0}) == run_pagerank(
+            graph, personalization={"节点1": 1.0}
+        )
+
+        # 加载后的图可以继续修改，并可导出为GraphML
+        print("TestDiGraph - 9 - CP2")
+        loaded_graph.add_edge(DiEdge("node5", "节点1", {"weight": 1.0}))
+        loaded_graph.remove_edge(("node2", "node3"))
+        save_to_file(loaded_graph, "test_graph.graphml")
+        exported_graph = load_from_file("test_graph.graphml")
+        assert sorted(exported_graph.get_edge_list()) == sorted(loaded_graph.get_edge_list())
+
+        # 空图与无效文件
+        print("TestDiGraph - 9 - CP3")
+        save_to_file(DiGraph(), "test_graph.qag")
+        empty_graph = load_from_file("test_graph.qag")
+        assert empty_graph.get_node_list() == [] and empty_graph.get_edge_list() == []
+        with open("test_graph.qag", "wb") as f:
+            f.write(b"not a graph file")
+        try:
+            load_from_file("test_graph.qag")
+            assert False
+        except ValueError:
+            pass
+        try:
+            save_to_file(graph, "test_graph.qag", enable_zip=True)
+            assert False
+        except ValueError:
+            pass
+
+        # 清理（删除保存的文件）
+        print("TestDiGraph - 9 - CP4")
+        for file_path in ("test_graph.qag", "test_graph.graphml"):
+            if os.path.exists(file_path):
+                os.remove(file_path)
@@ -1,9 +1,18 @@
+from concurrent.futures import ThreadPoolExecutor
 import os
 import random
+import threading
 import time
 
 import networkx
-from quick_algo.pagerank import run_pagerank
+import numpy
+from quick_algo.pagerank import (
+    openmp_enabled,
+    run_pagerank,
+    run_pagerank_batch,
+    run_pagerank_push,
+    run_pagerank_top_k,
+)
 from quick_algo.di_graph import DiGraph, DiEdge
 
 
@@ -38,7 +47,7 @@ def generate_rand_data(node_num: int, edge_num: int):
     personalization = dict()
     for i in range(node_num // 10):
         while True:
-            j = random.randint(0, node_num)
+            j = random.randint(0, node_num - 1)
             if j not in personalization:
                 break
         personalization[str(j)] = random.random()
@@ -105,6 +114,385 @@ class TestPageRank:
             assert abs(result[node] - nx_result[node]) < 1e-6, f"Test failed for node {node}"
 
 
+    def test_pagerank_array_input(self):
+        print("Running TestPageRank - 3")
+        graph = DiGraph()
+
+        edge_list, personalization = generate_rand_data(100, 1000)
+        graph.add_edges_from(
+            [
+                DiEdge(str(src), str(dst), {"weight": weight})
+                for (src, dst), weight in edge_list.items()
+            ]
+        )
+        # 删除一个节点，使节点数组中出现空位
+        graph.remove_node("0")
+        personalization.pop("0", None)
+
+        # 以节点索引为下标的个性化向量，应与映射形式的结果一致
+        print("TestPageRank - 3 - CP1")
+        assert graph.node_array_size == 100
+        personalization_array = numpy.zeros(graph.node_array_size)
+        for node_name, weight in personalization.items():
+            if node_name in graph.node_name2idx_map:
+                personalization_array[graph.node_name2idx_map[node_name]] = weight
+        personalization = {
+            node_name: weight
+            for node_name, weight in personalization.items()
+            if node_name in graph.node_name2idx_map
+        }
+
+        result = run_pagerank(graph, personalization=personalization, tol=1e-10)
+        array_result = run_pagerank(
+            graph, personalization=personalization_array, tol=1e-10
+        )
+        for node in result:
+            assert abs(result[node] - array_result[node]) < 1e-12, f"Test failed for node {node}"
+
+        # 长度不一致的数组应被拒绝
+        print("TestPageRank - 3 - CP2")
+        try:
+            run_pagerank(graph, personalization=numpy.ones(graph.node_array_size - 1))
+            assert False, "Length mismatch should raise ValueError"
+        except ValueError:
+            pass
+
+        # 和为0的分数向量应被拒绝（而非除以0）
+        print("TestPageRank - 3 - CP3")
+        for zero_personalization in ({}, {"1": 0.0}, numpy.zeros(graph.node_array_size)):
+            try:
+                run_pagerank(graph, personalization=zero_personalization)
+                assert False, "Zero-sum personalization should raise ValueError"
+            except ValueError:
+                pass
+
+
+    def test_pagerank_top_k(self):
+        print("Running TestPageRank - 4")
+        graph = DiGraph()
+
+        edge_list, personalization = generate_rand_data(100, 1000)
+        graph.add_edges_from(
+            [
+                DiEdge(str(src), str(dst), {"weight": weight})
+                for (src, dst), weight in edge_list.items()
+            ]
+        )
+        removed_idx = graph.node_name2idx_map["0"]
+        graph.remove_node("0")
+        personalization = {
+            node_name: weight
+            for node_name, weight in personalization.items()
+            if node_name in graph.node_name2idx_map
+        }
+
+        result = run_pagerank(graph, personalization=personalization)
+
+        # 以偶数节点为候选节点（已删除的节点以无效索引-1表示），结果应与完整结果排序后的前top_k项一致
+        print("TestPageRank - 4 - CP1")
+        candidate_names = [str(i) for i in range(0, 100, 2)]
+        expected = sorted(
+            [(name, result[name]) for name in candidate_names if name in result],
+            key=lambda x: (-x[1], graph.node_name2idx_map[x[0]]),
+        )[:10]
+        candidates = numpy.array(
+            [graph.node_name2idx_map.get(name, -1) for name in candidate_names],
+            dtype=numpy.int64,
+        )
+        top_k_result = run_pagerank_top_k(
+            graph, 10, candidates=candidates, personalization=personalization
+        )
+        assert [name for name, _ in top_k_result] == [name for name, _ in expected]
+        for (_, score), (_, expected_score) in zip(top_k_result, expected):
+            assert abs(score - expected_score) < 1e-12
+
+        # 以掩码指定候选节点，结果应与候选索引一致
+        print("TestPageRank - 4 - CP2")
+        mask = numpy.zeros(graph.node_array_size, dtype=numpy.uint8)
+        mask[candidates[candidates >= 0]] = 1
+        mask_result = run_pagerank_top_k(
+            graph, 10, mask=mask, personalization=personalization
+        )
+        assert mask_result == top_k_result
+
+        # 不指定候选节点时，top_k不小于节点数则返回全部节点
+        print("TestPageRank - 4 - CP3")
+        all_result = run_pagerank_top_k(
+            graph, 1000, personalization=personalization
+        )
+        assert len(all_result) == len(result)
+        assert dict(all_result) == result
+
+        # 删除节点后索引被复用，结果中的节点名应随之更新
+        print("TestPageRank - 4 - CP4")
+        graph.add_edge(DiEdge("new", "1", {"weight": 1.0}))
+        assert graph.node_name2idx_map["new"] == removed_idx
+        assert graph.node_idx2name[removed_idx] == "new"
+        new_result = run_pagerank(graph, personalization=personalization)
+        assert dict(run_pagerank_top_k(graph, 1000, personalization=personalization)) == new_result
+
+
+    def test_pagerank_stats(self):
+        print("Running TestPageRank - 5")
+        graph = DiGraph()
+
+        edge_list, personalization = generate_rand_data(100, 1000)
+        graph.add_edges_from(
+            [
+                DiEdge(str(src), str(dst), {"weight": weight})
+                for (src, dst), weight in edge_list.items()
+            ]
+        )
+        personalization = {
+            node_name: weight
+            for node_name, weight in personalization.items()
+            if node_name in graph.node_name2idx_map
+        }
+
+        # 迭代统计信息
+        print("TestPageRank - 5 - CP1")
+        stats = dict()
+        result = run_pagerank(graph, personalization=personalization, tol=1e-8, stats=stats)
+        assert stats["converged"]
+        assert 0 < stats["iterations"] <= 100
+        assert stats["diff"] < graph.node_array_size * 1e-8
+
+        limited_stats = dict()
+        run_pagerank(
+            graph, personalization=personalization, max_iter=2, tol=1e-8, stats=limited_stats
+        )
+        assert limited_stats["iterations"] == 2
+        assert not limited_stats["converged"]
+
+        # 以收敛结果作为初始分数（热启动）时迭代次数减少，且结果一致
+        print("TestPageRank - 5 - CP2")
+        warm_stats = dict()
+        warm_result = run_pagerank(
+            graph,
+            init_score=result,
+            personalization=personalization,
+            tol=1e-8,
+            stats=warm_stats,
+        )
+        assert warm_stats["converged"]
+        assert warm_stats["iterations"] < stats["iterations"]
+        for node in result:
+            assert abs(result[node] - warm_result[node]) < 1e-6
+
+        top_k_stats = dict()
+        run_pagerank_top_k(
+            graph, 10, personalization=personalization, tol=1e-8, stats=top_k_stats
+        )
+        assert top_k_stats == stats
+
+    def test_pagerank_concurrent(self):
+        print("Running TestPageRank - 7")
+        graph = DiGraph()
+
+        edge_list, _ = generate_rand_data(2000, 20000)
+        graph.add_edges_from(
+            [
+                DiEdge(str(src), str(dst), {"weight": weight})
+                for (src, dst), weight in edge_list.items()
+            ]
+        )
+        node_list = graph.get_node_list()
+        queries = [
+            {node_name: random.random() for node_name in random.sample(node_list, 5)}
+            for _ in range(32)
+        ]
+
+        # 快照上的并发查询与串行查询结果一致
+        print("TestPageRank - 7 - CP1")
+        snapshot = graph.freeze()
+        expected = [
+            run_pagerank_top_k(snapshot, 50, personalization=query) for query in queries
+        ]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(
+                executor.map(
+                    lambda query: run_pagerank_top_k(snapshot, 50, personalization=query),
+                    queries,
+                )
+            )
+        assert results == expected
+
+        # 查询期间另一线程修改图：已有快照不受影响，修改串行化后图的状态正确
+        print("TestPageRank - 7 - CP2")
+        stop = threading.Event()
+
+        def mutate():
+            i = 0
+            while not stop.is_set():
+                graph.upsert_edges_from([f"new_{i}"], [node_list[i % len(node_list)]], [1.0])
+                i += 1
+            return i
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            writer = executor.submit(mutate)
+            results = list(
+                executor.map(
+                    lambda query: run_pagerank_top_k(snapshot, 50, personalization=query),
+                    queries,
+                )
+            )
+            # 直接在原图上查询（每次取当前版本的快照）
+            live_results = list(
+                executor.map(
+                    lambda query: run_pagerank_top_k(graph, 50, personalization=query),
+                    queries,
+                )
+            )
+            stop.set()
+            num_upserts = writer.result()
+        assert results == expected
+        assert all(len(result) == 50 for result in live_results)
+        assert len(graph.get_node_list()) == len(node_list) + num_upserts
+        assert len(graph.get_edge_list()) == len(edge_list) + num_upserts
+        assert graph.freeze().num_edges == len(edge_list) + num_upserts
+
+
+    def test_pagerank_batch(self):
+        print("Running TestPageRank - 8")
+        graph = DiGraph()
+
+        edge_list, _ = generate_rand_data(1000, 10000)
+        graph.add_edges_from(
+            [
+                DiEdge(str(src), str(dst), {"weight": weight})
+                for (src, dst), weight in edge_list.items()
+            ]
+        )
+        graph.remove_node(graph.get_node_list()[0])
+        node_list = graph.get_node_list()
+        queries = [
+            {node_name: random.random() for node_name in random.sample(node_list, 5)}
+            for _ in range(8)
+        ]
+
+        # 批量结果与逐个计算的结果一致，且各向量的迭代统计信息独立
+        print("TestPageRank - 8 - CP1")
+        batch_stats = []
+        batch_result = run_pagerank_batch(graph, queries, tol=1e-8, stats=batch_stats)
+        assert len(batch_result) == len(queries)
+        for query, result, stats in zip(queries, batch_result, batch_stats):
+            single_stats = dict()
+            single_result = run_pagerank(graph, personalization=query, tol=1e-8, stats=single_stats)
+            assert stats == single_stats
+            assert len(result) == graph.node_array_size
+            for node_name, idx in graph.node_name2idx_map.items():
+                assert abs(result[idx] - single_result[node_name]) < 1e-12
+
+        # 二维数组输入，以及初始分数与悬挂节点权重
+        print("TestPageRank - 8 - CP2")
+        personalization_mat = numpy.zeros((len(queries), graph.node_array_size))
+        for b, query in enumerate(queries):
+            for node_name, weight in query.items():
+                personalization_mat[b, graph.node_name2idx_map[node_name]] = weight
+        init_score = [numpy.asarray(result) for result in batch_result]
+        array_stats = []
+        array_result = run_pagerank_batch(
+            graph,
+            personalization_mat,
+            init_score=init_score,
+            dangling_weight=personalization_mat,
+            tol=1e-8,
+            stats=array_stats,
+        )
+        for b in range(len(queries)):
+            assert array_stats[b]["iterations"] < batch_stats[b]["iterations"]
+            assert numpy.abs(numpy.asarray(array_result[b]) - init_score[b]).max() < 1e-6
+
+        # 参数检查
+        print("TestPageRank - 8 - CP3")
+        assert run_pagerank_batch(graph, []) == []
+        try:
+            run_pagerank_batch(graph, queries, init_score=init_score[:1])
+            assert False
+        except ValueError:
+            pass
+
+    def test_pagerank_push(self):
+        print("Running TestPageRank - 9")
+        graph = DiGraph()
+
+        edge_list, _ = generate_rand_data(2000, 10000)
+        graph.add_edges_from(
+            [
+                DiEdge(str(src), str(dst), {"weight": weight})
+                for (src, dst), weight in edge_list.items()
+            ]
+        )
+        # 悬挂节点
+        graph.add_edges_from([DiEdge("0", "dangling", {"weight": 1.0})])
+        node_list = graph.get_node_list()
+        personalization = {node_name: random.random() for node_name in random.sample(node_list, 5)}
+        personalization["dangling"] = 0.5
+        exact = run_pagerank(graph, personalization=personalization, tol=1e-12, max_iter=500)
+
+        # 近似分数不大于精确分数，误差的L1范数不超过剩余残差，且随epsilon减小而减小
+        print("TestPageRank - 9 - CP1")
+        last_error = None
+        for epsilon in (1e-4, 1e-6, 1e-8):
+            stats = dict()
+            approx = dict(
+                run_pagerank_push(graph, len(node_list), personalization, epsilon=epsilon, stats=stats)
+            )
+            assert 0 < stats["pushes"] and 0 < stats["touched"] <= len(node_list)
+            error = 0.0
+            for node_name, score in exact.items():
+                assert approx.get(node_name, 0.0) <= score + 1e-12
+                error += score - approx.get(node_name, 0.0)
+            assert error <= stats["residual"] + 1e-9
+            if last_error is not None:
+                assert error < last_error
+            last_error = error
+        assert last_error < 1e-3
+
+        # 与精确解的TopK一致
+        print("TestPageRank - 9 - CP2")
+        exact_top = run_pagerank_top_k(graph, 20, personalization=personalization, tol=1e-12, max_iter=500)
+        approx_top = run_pagerank_push(graph, 20, personalization, epsilon=1e-8)
+        assert len({node for node, _ in exact_top} & {node for node, _ in approx_top}) >= 19
+        for (_, exact_score), (_, approx_score) in zip(exact_top, approx_top):
+            assert abs(exact_score - approx_score) < 1e-4
+
+        # 候选节点、掩码与数组形式的个性化向量
+        print("TestPageRank - 9 - CP3")
+        candidates = numpy.array(
+            [graph.node_name2idx_map[node] for node in random.sample(node_list, 500)],
+            dtype=numpy.int64,
+        )
+        mask = numpy.zeros(graph.node_array_size, dtype=numpy.uint8)
+        mask[candidates] = 1
+        personalization_array = numpy.zeros(graph.node_array_size)
+        for node_name, weight in personalization.items():
+            personalization_array[graph.node_name2idx_map[node_name]] = weight
+        candidate_top = run_pagerank_push(graph, 10, personalization, candidates=candidates, epsilon=1e-8)
+        mask_top = run_pagerank_push(graph, 10, personalization, mask=mask, epsilon=1e-8)
+        array_top = run_pagerank_push(graph, 10, personalization_array, mask=mask, epsilon=1e-8)
+        seed_idx = numpy.flatnonzero(personalization_array)
+        sparse_top = run_pagerank_push(
+            graph, 10, (seed_idx, personalization_array[seed_idx]), mask=mask, epsilon=1e-8
+        )
+        assert len(candidate_top) == 10
+        assert candidate_top == mask_top
+        for (node, score), (array_node, array_score) in zip(candidate_top, array_top):
+            assert abs(score - array_score) < 1e-6
+        assert sparse_top == array_top
+        for node, _ in candidate_top:
+            assert mask[graph.node_name2idx_map[node]]
+        try:
+            run_pagerank_push(graph, 10, (numpy.array([-1], dtype=numpy.int64), numpy.ones(1)))
+            assert False
+        except ValueError:
+            pass
+        try:
+            run_pagerank_push(graph, 10, {})
+            assert False
+        except ValueError:
+            pass
+
     def test_pr_speed(self):
         print("Running TestPageRank - 2")
 
@@ -183,4 +571,49 @@ class TestPageRank:
         print("QuickAlgo PPR Time taken:")
         print(f"Avg: {sum(time_cost_qa) / len(time_cost_qa):.8f}s Min: {min(time_cost_qa):.8f}s Max: {max(time_cost_qa):.8f}s")
         print("NetworkX PPR Time taken:")
-        print(f"Avg: {sum(time_cost_nx) / len(time_cost_nx):.8f}s Min: {min(time_cost_nx):.8f}s Max: {max(time_cost_nx):.8f}s")
\ No newline at end of file
+        print(f"Avg: {sum(time_cost_nx) / len(time_cost_nx):.8f}s Min: {min(time_cost_nx):.8f}s Max: {max(time_cost_nx):.8f}s")
+
+    def test_pr_scaling(self):
+        print("Running TestPageRank - 6")
+
+        # 构造大规模随机图（20万节点，100万条边）
+        node_num = 200000
+        edge_num = 1000000
+        rng = numpy.random.default_rng(0)
+        src_list = rng.integers(0, node_num, edge_num).astype(str).tolist()
+        dst_list = rng.integers(0, node_num, edge_num).astype(str).tolist()
+        graph = DiGraph()
+        graph.upsert_edges_from(src_list, dst_list, rng.random(edge_num).tolist())
+        personalization = numpy.zeros(graph.node_array_size)
+        personalization[rng.integers(0, graph.node_array_size, 100)] = 1.0
+
+        timer = time.perf_counter()
+        graph.freeze()
+        print(f"Freeze Time taken: {time.perf_counter() - timer:.8f}s")
+
+        # 不同线程数下的耗时（结果应与单线程一致）
+        print(f"OpenMP enabled: {openmp_enabled()}")
+        thread_nums = sorted({1, 2, 4, os.cpu_count() or 1})
+        base_result = None
+        for num_threads in thread_nums:
+            time_cost = []
+            for i in range(5):
+                timer = time.perf_counter()
+                result = run_pagerank_top_k(
+                    graph,
+                    graph.node_array_size,
+                    personalization=personalization,
+                    tol=1e-8,
+                    num_threads=num_threads,
+                )
+                time_cost.append(time.perf_counter() - timer)
+            print(
+                f"Threads: {num_threads} "
+                f"Avg: {sum(time_cost) / len(time_cost):.8f}s Min: {min(time_cost):.8f}s Max: {max(time_cost):.8f}s"
+            )
+
+            if base_result is None:
+                base_result = dict(result)
+            else:
+                for node, score in result:
+                    assert abs(base_result[node] - score) < 1e-12, f"Test failed for node {node}"
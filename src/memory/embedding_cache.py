@@ -0,0 +1,341 @@
+from collections import OrderedDict, defaultdict
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.config import global_config
+from src.utils.global_logger import logger
+from .utils.hash import get_sha256
+
+
+class EmbeddingCache:
+    """跨agent共享的嵌入缓存
+
+    以(嵌入模型, 嵌入维度, 文本SHA256)为键，将嵌入向量（float32）存储于SQLite数据库中；
+    缓存总大小超过上限时，按最近访问时间淘汰最久未使用的项
+    """
+
+    def __init__(self, db_path: str, max_size_mb: float):
+        self.db_path = db_path
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+
+        # 命中/未命中计数
+        self.hits = 0
+        self.misses = 0
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir != "" and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embedding_cache ("
+            "model TEXT NOT NULL, "
+            "dimension INTEGER NOT NULL, "
+            "text_hash TEXT NOT NULL, "
+            "embedding BLOB NOT NULL, "
+            "last_access REAL NOT NULL, "
+            "PRIMARY KEY (model, dimension, text_hash))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_last_access ON embedding_cache (last_access)"
+        )
+        self._conn.commit()
+        self._size_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(embedding)), 0) FROM embedding_cache"
+        ).fetchone()[0]
+
+    def _select(
+        self, model: str, dimension: int, text_hashes: List[str]
+    ) -> Dict[str, bytes]:
+        """查询text_hashes中已缓存的项（需持有锁）"""
+        found = dict()
+        # 分块查询，避免超出SQLite的参数数量限制
+        for start in range(0, len(text_hashes), 500):
+            chunk = text_hashes[start : start + 500]
+            rows = self._conn.execute(
+                "SELECT text_hash, embedding FROM embedding_cache "
+                "WHERE model = ? AND dimension = ? AND text_hash IN ("
+                + ",".join("?" * len(chunk))
+                + ")",
+                [model, dimension, *chunk],
+            ).fetchall()
+            for text_hash, blob in rows:
+                found[text_hash] = blob
+        return found
+
+    def _touch(self, model: str, dimension: int, text_hashes: Iterable[str]) -> None:
+        """更新项的最近访问时间（需持有锁）"""
+        now = time.time()
+        self._conn.executemany(
+            "UPDATE embedding_cache SET last_access = ? "
+            "WHERE model = ? AND dimension = ? AND text_hash = ?",
+            [(now, model, dimension, text_hash) for text_hash in text_hashes],
+        )
+        self._conn.commit()
+
+    def get_many(
+        self, model: str, dimension: int, strs: List[str]
+    ) -> List[Optional[np.ndarray]]:
+        """批量查询缓存（计入命中/未命中计数，并更新命中项的最近访问时间）
+
+        Returns:
+            result: 与strs一一对应的嵌入向量（只读的float32数组）列表，未命中的项为None
+        """
+        text_hashes = [get_sha256(s) for s in strs]
+        with self._lock:
+            found = self._select(model, dimension, text_hashes)
+            if len(found) > 0:
+                self._touch(model, dimension, found.keys())
+            self.hits += len(found)
+            self.misses += len(text_hashes) - len(found)
+        return [
+            None if blob is None else np.frombuffer(blob, dtype=np.float32)
+            for blob in map(found.get, text_hashes)
+        ]
+
+    def peek(self, model: str, dimension: int, text: str) -> Optional[np.ndarray]:
+        """查询单个项（只读：不计入命中/未命中计数，不更新最近访问时间，不提交事务）
+
+        用于查询嵌入缓存等非导入场景，访问时间由调用方通过touch_many批量更新
+        """
+        text_hash = get_sha256(text)
+        with self._lock:
+            blob = self._select(model, dimension, [text_hash]).get(text_hash)
+        return None if blob is None else np.frombuffer(blob, dtype=np.float32)
+
+    def touch_many(self, model: str, dimension: int, strs: List[str]) -> None:
+        """批量更新项的最近访问时间（不计入命中/未命中计数）"""
+        with self._lock:
+            self._touch(model, dimension, [get_sha256(s) for s in strs])
+
+    def put_many(
+        self,
+        model: str,
+        dimension: int,
+        strs: List[str],
+        embeddings: List[List[float]],
+    ) -> None:
+        """批量写入缓存"""
+        now = time.time()
+        rows = [
+            (
+                model,
+                dimension,
+                get_sha256(s),
+                np.asarray(embedding, dtype=np.float32).tobytes(),
+                now,
+            )
+            for s, embedding in zip(strs, embeddings)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache "
+                "(model, dimension, text_hash, embedding, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            self._size_bytes += sum(len(row[3]) for row in rows)
+            if self._size_bytes > self.max_size_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """淘汰最久未访问的项，直到缓存大小降至上限的90%以下（需持有锁）"""
+        # INSERT OR REPLACE可能使计数偏大，淘汰前重新统计
+        self._size_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(embedding)), 0) FROM embedding_cache"
+        ).fetchone()[0]
+        target_bytes = int(self.max_size_bytes * 0.9)
+        while self._size_bytes > target_bytes:
+            rows = self._conn.execute(
+                "SELECT rowid, LENGTH(embedding) FROM embedding_cache "
+                "ORDER BY last_access LIMIT 1000"
+            ).fetchall()
+            if len(rows) == 0:
+                break
+            evict_rowids = []
+            for rowid, size in rows:
+                if self._size_bytes <= target_bytes:
+                    break
+                evict_rowids.append((rowid,))
+                self._size_bytes -= size
+            self._conn.executemany(
+                "DELETE FROM embedding_cache WHERE rowid = ?", evict_rowids
+            )
+        self._conn.commit()
+        logger.info(
+            f"嵌入缓存已淘汰至{self._size_bytes / 1024 / 1024:.2f}MB（上限{self.max_size_bytes / 1024 / 1024:.2f}MB）"
+        )
+
+    def stats(self) -> dict:
+        """缓存统计信息"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total > 0 else 0.0,
+            "size_mb": self._size_bytes / 1024 / 1024,
+        }
+
+
+_shared_embedding_cache = None
+_shared_embedding_cache_lock = threading.Lock()
+
+
+def get_shared_embedding_cache() -> EmbeddingCache | None:
+    """获取进程内共享的嵌入缓存（未启用时返回None）"""
+    global _shared_embedding_cache
+    if not global_config["embedding"]["cache"]["enabled"]:
+        return None
+    with _shared_embedding_cache_lock:
+        if _shared_embedding_cache is None:
+            _shared_embedding_cache = EmbeddingCache(
+                global_config["persistence"]["data_root_path"]
+                + global_config["persistence"]["embedding_cache_path"],
+                global_config["embedding"]["cache"]["max_size_mb"],
+            )
+        return _shared_embedding_cache
+
+
+class QueryEmbeddingCache:
+    """进程内共享的查询（问题）嵌入缓存
+
+    以(嵌入模型, 嵌入维度, 文本)为键，在内存中按LRU策略保留至多max_entries个嵌入向量（float32）；
+    可选地以共享嵌入缓存作为持久化的二级缓存，使重启后的重复查询同样无需请求服务商
+
+    内存未命中时才读取持久化缓存（只读，不计入其命中统计）；新获取的嵌入向量与持久化缓存命中项的
+    访问时间先在内存中暂存，累计flush_size项后批量写入，避免每次查询都提交一次事务
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        disk_cache: EmbeddingCache | None = None,
+        flush_size: int = 32,
+    ):
+        self.max_entries = max_entries
+        self.disk_cache = disk_cache
+        self.flush_size = flush_size
+
+        # 内存命中/持久化缓存命中/未命中计数
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        # 待写入持久化缓存的嵌入向量与待更新访问时间的项（键同_entries）
+        self._pending_puts: Dict[Tuple[str, int, str], np.ndarray] = dict()
+        self._pending_touches: Dict[Tuple[str, int, str], None] = dict()
+
+    def get(
+        self,
+        model: str,
+        dimension: int,
+        text: str,
+        embed_func: Callable[[str], List[float]],
+    ) -> np.ndarray:
+        """获取文本的嵌入向量，未命中缓存时调用embed_func获取并写入缓存
+
+        Returns:
+            embedding: 嵌入向量（只读的float32数组）
+        """
+        key = (model, dimension, text)
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                # 已被LRU淘汰但尚未写入持久化缓存的项
+                embedding = self._pending_puts.get(key)
+            if embedding is not None:
+                self._remember(key, embedding)
+                self.hits += 1
+                return embedding
+
+        embedding = None
+        if self.disk_cache is not None:
+            embedding = self.disk_cache.peek(model, dimension, text)
+        if embedding is not None:
+            with self._lock:
+                self.disk_hits += 1
+                self._pending_touches[key] = None
+                self._remember(key, embedding)
+        else:
+            embedding = np.asarray(embed_func(text), dtype=np.float32)
+            embedding.flags.writeable = False
+            with self._lock:
+                self.misses += 1
+                if self.disk_cache is not None:
+                    self._pending_puts[key] = embedding
+                self._remember(key, embedding)
+
+        if len(self._pending_puts) + len(self._pending_touches) >= self.flush_size:
+            self.flush()
+        return embedding
+
+    def _remember(self, key: Tuple[str, int, str], embedding: np.ndarray) -> None:
+        """将项存入（或移至）LRU的末尾，超出上限时淘汰最久未使用的项（需持有锁）"""
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def flush(self) -> None:
+        """将暂存的嵌入向量与访问时间批量写入持久化缓存"""
+        if self.disk_cache is None:
+            return
+        with self._lock:
+            pending_puts, self._pending_puts = self._pending_puts, dict()
+            pending_touches, self._pending_touches = self._pending_touches, dict()
+
+        # 按(模型, 维度)分组写入
+        put_groups = defaultdict(lambda: ([], []))
+        for (model, dimension, text), embedding in pending_puts.items():
+            put_groups[(model, dimension)][0].append(text)
+            put_groups[(model, dimension)][1].append(embedding)
+        for (model, dimension), (texts, embeddings) in put_groups.items():
+            self.disk_cache.put_many(model, dimension, texts, embeddings)
+        touch_groups = defaultdict(list)
+        for model, dimension, text in pending_touches:
+            touch_groups[(model, dimension)].append(text)
+        for (model, dimension), texts in touch_groups.items():
+            self.disk_cache.touch_many(model, dimension, texts)
+
+    def stats(self) -> dict:
+        """缓存统计信息"""
+        total = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / total if total > 0 else 0.0,
+            "entries": len(self._entries),
+        }
+
+
+_query_embedding_cache = None
+_query_embedding_cache_lock = threading.Lock()
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache | None:
+    """获取进程内共享的查询嵌入缓存（未启用时返回None）"""
+    global _query_embedding_cache
+    cache_params = global_config["embedding"]["query_cache"]
+    if not cache_params["enabled"]:
+        return None
+    with _query_embedding_cache_lock:
+        if _query_embedding_cache is None:
+            _query_embedding_cache = QueryEmbeddingCache(
+                cache_params["max_entries"],
+                get_shared_embedding_cache() if cache_params["persist"] else None,
+            )
+            # 退出时写入暂存的项
+            atexit.register(_query_embedding_cache.flush)
+        return _query_embedding_cache
@@ -0,0 +1,254 @@
+import hashlib
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .string_arena import StringArena
+
+# 支持的向量存储类型
+STORAGE_DTYPES = ("float32", "float16", "int8")
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """按行对称量化为int8：每行以最大绝对值/127为缩放系数
+
+    Returns:
+        codes: int8编码（n * dimension）
+        scales: 每行的缩放系数（float32）
+    """
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def dequantize_int8(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """int8编码反量化为float32"""
+    return codes.astype(np.float32) * scales[..., None]
+
+
+class PrefixChecksum:
+    """hash序列前缀的增量校验和
+
+    记录已计算的行数，推进至更多的行时仅计算新增部分（结果与一次性计算全部前缀相同）
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self._sha256 = hashlib.sha256()
+
+    def advance(self, hashes: np.ndarray, rows: int) -> str:
+        """推进至hashes的前rows行，返回其校验和（rows小于已计算的行数时重新计算）"""
+        if rows < self.rows:
+            self.rows = 0
+            self._sha256 = hashlib.sha256()
+        for item_hash in hashes[self.rows : rows]:
+            self._sha256.update(item_hash.encode("utf-8"))
+            self._sha256.update(b"\n")
+        self.rows = rows
+        return self._sha256.hexdigest()
+
+    def copy(self) -> "PrefixChecksum":
+        """复制当前的计算状态"""
+        checksum = PrefixChecksum()
+        checksum.rows = self.rows
+        checksum._sha256 = self._sha256.copy()
+        return checksum
+
+
+class EmbeddingMatrix:
+    """嵌入库的列式存储
+
+    所有向量保存在一个连续的矩阵中（存入时即完成L2归一化），
+    hash与原始字符串分别保存在与矩阵行对齐的数组中，并维护hash到行号的索引
+
+    向量按storage_dtype存储：float32原样存储；float16半精度存储；
+    int8按行对称量化存储（附加每行的缩放系数）。读取向量时透明地反量化为float32
+
+    字符串可转存至基于mmap的文本存储（arena），转存后的行不再在内存中保留字符串，读取时按需解码
+    """
+
+    def __init__(
+        self, dimension: int, capacity: int = 1024, storage_dtype: str = "float32"
+    ):
+        if storage_dtype not in STORAGE_DTYPES:
+            raise ValueError(
+                f"不支持的向量存储类型：{storage_dtype}（可选：{'/'.join(STORAGE_DTYPES)}）"
+            )
+        self.dimension = dimension
+        self.storage_dtype = storage_dtype
+        self._size = 0
+        self._codes = np.empty((capacity, dimension), dtype=storage_dtype)
+        # int8量化时每行的缩放系数
+        self._scales = (
+            np.empty(capacity, dtype=np.float32) if storage_dtype == "int8" else None
+        )
+        self._hashes = np.empty(capacity, dtype=object)
+        self._strs = np.empty(capacity, dtype=object)
+        # 文本存储（覆盖前len(arena)行）
+        self.arena: StringArena | None = None
+        # hash到行号的映射
+        self.hash2row: Dict[str, int] = dict()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, item_hash: str) -> bool:
+        return item_hash in self.hash2row
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """已存入的向量矩阵（float32存储时为视图，不复制；否则为反量化后的副本）"""
+        return self.get_vectors(slice(None))
+
+    @property
+    def codes(self) -> np.ndarray:
+        """已存入的向量按存储类型的原始编码（视图，不复制）"""
+        return self._codes[: self._size]
+
+    @property
+    def scales(self) -> np.ndarray | None:
+        """int8量化时每行的缩放系数（视图，不复制；其他存储类型为None）"""
+        return None if self._scales is None else self._scales[: self._size]
+
+    @property
+    def hashes(self) -> np.ndarray:
+        """已存入的hash数组（视图，不复制）"""
+        return self._hashes[: self._size]
+
+    def get_str(self, row: int) -> str:
+        """获取第row行的字符串（文本存储覆盖的行从文本存储中读取）"""
+        if self.arena is not None and row < len(self.arena):
+            return self.arena[row]
+        return self._strs[row]
+
+    def get_strs(self, start: int, end: int) -> List[str]:
+        """获取[start, end)行的字符串"""
+        arena_end = start
+        if self.arena is not None:
+            arena_end = max(start, min(end, len(self.arena)))
+        strs = self.arena.get_many(start, arena_end) if arena_end > start else []
+        return strs + self._strs[arena_end:end].tolist()
+
+    def attach_arena(self, arena: StringArena) -> None:
+        """关联文本存储，并释放其已覆盖的行在内存中的字符串"""
+        if len(arena) > self._size:
+            raise Exception(
+                f"文本存储的行数（{len(arena)}）超过矩阵行数（{self._size}）"
+            )
+        self.arena = arena
+        self._strs[: len(arena)] = None
+
+    @property
+    def nbytes(self) -> int:
+        """向量数据占用的内存（字节）"""
+        nbytes = self._codes.nbytes
+        if self._scales is not None:
+            nbytes += self._scales.nbytes
+        return nbytes
+
+    def get_vectors(self, rows: int | slice | List[int] | np.ndarray) -> np.ndarray:
+        """按行号（或切片）获取float32向量（需要时反量化）"""
+        codes = self.codes[rows]
+        if self.storage_dtype == "float32":
+            return codes
+        if self.storage_dtype == "float16":
+            return codes.astype(np.float32)
+        return dequantize_int8(codes, self.scales[rows])
+
+    def checksum(self, rows: int | None = None) -> str:
+        """计算前rows行hash序列的校验和（用于校验索引与存储是否一致）"""
+        return PrefixChecksum().advance(
+            self._hashes, self._size if rows is None else rows
+        )
+
+    def reserve(self, capacity: int) -> None:
+        """确保容量不小于capacity（按倍增策略扩容）"""
+        if capacity <= self._codes.shape[0]:
+            return
+        new_capacity = max(capacity, self._codes.shape[0] * 2)
+
+        codes = np.empty((new_capacity, self.dimension), dtype=self._codes.dtype)
+        codes[: self._size] = self._codes[: self._size]
+        self._codes = codes
+
+        if self._scales is not None:
+            scales = np.empty(new_capacity, dtype=np.float32)
+            scales[: self._size] = self._scales[: self._size]
+            self._scales = scales
+
+        hashes = np.empty(new_capacity, dtype=object)
+        hashes[: self._size] = self._hashes[: self._size]
+        self._hashes = hashes
+
+        strs = np.empty(new_capacity, dtype=object)
+        strs[: self._size] = self._strs[: self._size]
+        self._strs = strs
+
+    def _append_rows(
+        self,
+        item_hashes: List[str] | np.ndarray,
+        strs: List[str] | np.ndarray | None,
+    ) -> Tuple[int, int]:
+        """追加hash与字符串，返回新增行的范围[start, end)（向量由调用方写入）
+
+        strs为None表示字符串由文本存储提供，不在内存中保留
+        """
+        start = self._size
+        end = start + len(item_hashes)
+        self.reserve(end)
+        self._hashes[start:end] = item_hashes
+        self._strs[start:end] = strs
+        self.hash2row.update(zip(self._hashes[start:end], range(start, end)))
+        return start, end
+
+    def append(
+        self,
+        item_hashes: List[str] | np.ndarray,
+        strs: List[str] | np.ndarray | None,
+        embeddings: List[List[float]] | np.ndarray,
+        normalized: bool = False,
+    ) -> None:
+        """追加若干项（调用方需保证hash不重复）
+
+        Args:
+            item_hashes: hash列表
+            strs: 字符串列表（为None时由文本存储提供）
+            embeddings: 嵌入向量（列表或二维数组）
+            normalized: 向量是否已L2归一化（是则跳过归一化）
+        """
+        if len(item_hashes) == 0:
+            return
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2 or embeddings.shape[1] != self.dimension:
+            raise Exception(
+                f"嵌入维度不一致：期望{self.dimension}，实际{embeddings.shape[-1]}"
+            )
+        if not normalized:
+            # L2归一化
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            embeddings = embeddings / norms
+
+        start, end = self._append_rows(item_hashes, strs)
+        if self.storage_dtype == "int8":
+            self._codes[start:end], self._scales[start:end] = quantize_int8(embeddings)
+        else:
+            self._codes[start:end] = embeddings
+        self._size = end
+
+    def append_codes(
+        self,
+        item_hashes: List[str] | np.ndarray,
+        strs: List[str] | np.ndarray | None,
+        codes: np.ndarray,
+        scales: np.ndarray | None = None,
+    ) -> None:
+        """追加若干已按本矩阵存储类型编码的项（直接复制，不重新量化）"""
+        if len(item_hashes) == 0:
+            return
+        start, end = self._append_rows(item_hashes, strs)
+        self._codes[start:end] = codes
+        if self._scales is not None:
+            self._scales[start:end] = scales
+        self._size = end
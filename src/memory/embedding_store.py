@@ -1,25 +1,56 @@
+import ast
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 import json
 import os
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Tuple
 
 import numpy as np
-import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import tqdm
 import faiss
 import urllib
 
 from src.utils.llm_client import LLMClient
 from src.utils.config import ENT_NAMESPACE, PG_NAMESPACE, REL_NAMESPACE, global_config
+from .embedding_cache import get_shared_embedding_cache
+from .embedding_matrix import EmbeddingMatrix, PrefixChecksum, dequantize_int8
+from .string_arena import StringArena
+from .utils.batching import pack_embedding_batches
+from .utils.faiss_index import (
+    apply_search_params,
+    create_faiss_index,
+    expected_storage_dtype,
+    get_index_storage_dtype,
+    get_index_type,
+    resolve_index_type,
+)
 from .utils.hash import get_sha256
 from src.utils.global_logger import logger
 
+# 清单文件的格式版本
+MANIFEST_VERSION = 1
+# 嵌入数据文件（parquet）的格式版本（记录于schema元数据中）
+# 1: embedding列为float64变长列表（未归一化）
+# 2: embedding列为float32定长列表（FixedSizeList，已L2归一化）
+# 3: embedding列按storage_dtype（记录于schema元数据中）存储为float32/float16/int8定长列表，
+#    int8时附加每行缩放系数的scale列
+EMBEDDING_FILE_VERSION = 3
+# 增量分片数量上限，超出时合并为单个文件
+MAX_DELTA_PARTS = 16
+# 读取分片文件时每批的行数
+READ_BATCH_ROWS = 4096
+
 
 @dataclass
 class EmbeddingStoreItem:
     """嵌入库中的项"""
 
-    def __init__(self, item_hash: str, embedding: List[float], content: str):
+    def __init__(
+        self, item_hash: str, embedding: List[float] | np.ndarray, content: str
+    ):
         self.hash = item_hash
         self.embedding = embedding
         self.str = content
@@ -33,6 +64,32 @@ class EmbeddingStoreItem:
         }
 
 
+class EmbeddingStoreView(Mapping):
+    """EmbeddingMatrix的只读字典视图（hash -> EmbeddingStoreItem）
+
+    访问时按行构造EmbeddingStoreItem，其embedding为矩阵中对应行的float32向量（已L2归一化；
+    float32存储时为视图，量化存储时为反量化后的副本）
+    """
+
+    def __init__(self, matrix: EmbeddingMatrix):
+        self._matrix = matrix
+
+    def __getitem__(self, item_hash: str) -> EmbeddingStoreItem:
+        row = self._matrix.hash2row[item_hash]
+        return EmbeddingStoreItem(
+            item_hash, self._matrix.get_vectors(row), self._matrix.get_str(row)
+        )
+
+    def __contains__(self, item_hash) -> bool:
+        return item_hash in self._matrix.hash2row
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._matrix.hash2row)
+
+    def __len__(self) -> int:
+        return len(self._matrix)
+
+
 class EmbeddingStore:
     def __init__(self, llm_client: LLMClient, namespace: str, dir_path: str):
         self.namespace = namespace
@@ -41,72 +98,333 @@ class EmbeddingStore:
         self.embedding_file_path = dir_path + "/" + namespace + ".parquet"
         self.index_file_path = dir_path + "/" + namespace + ".index"
         self.idx2hash_file_path = dir_path + "/" + namespace + "_i2h.json"
-
-        self.store = dict()
+        self.manifest_file_path = dir_path + "/" + namespace + "_manifest.json"
+        # 文本存储（原始字符串的mmap存储）
+        self.strs_file_path = dir_path + "/" + namespace + ".strs"
+        self.strs_index_file_path = dir_path + "/" + namespace + ".strs.idx"
+
+        self.matrix = EmbeddingMatrix(
+            global_config["embedding"]["dimension"],
+            storage_dtype=global_config["embedding"]["storage_dtype"],
+        )
+        self.store = EmbeddingStoreView(self.matrix)
 
         self.faiss_index = None
-        self.idx2hash = None
 
-    def _get_embedding(self, s: str) -> List[float]:
-        return self.llm_client.send_embedding_request(
-            global_config["embedding"]["model"], s
+        # 持久化状态：已保存的数据分片（[{"file": 文件名, "rows": 行数}, ...]）
+        self._parts = []
+        # 已合并至基础文件、待写入清单文件后删除的增量分片文件名
+        self._stale_parts = []
+        # 已保存的行数（之后的行为待保存的增量）
+        self._saved_rows = 0
+        # 已保存的Faiss索引所覆盖的行数
+        self._saved_index_rows = 0
+        # 已保存的行与索引所覆盖的行的校验和（随保存增量计算，不重复计算全部行）
+        self._rows_checksum = PrefixChecksum()
+        self._index_checksum = PrefixChecksum()
+
+    def _get_embeddings(self, strs: List[str]) -> List[List[float]]:
+        return self.llm_client.send_batch_embedding_request(
+            global_config["embedding"]["model"], strs
         )
 
-    def batch_insert_strs(self, strs: List[str]) -> None:
-        """向库中存入字符串"""
-        # 逐项处理
-        for s in tqdm.tqdm(strs, desc="存入嵌入库", unit="items"):
-            # 计算hash去重
+    def _get_pending_items(self, strs: List[str]) -> Tuple[List[str], List[str]]:
+        """计算hash去重，返回尚未存入库中的(hash列表, 字符串列表)"""
+        pending = dict()
+        for s in strs:
             item_hash = self.namespace + "-" + get_sha256(s)
-            if item_hash in self.store:
+            if item_hash in self.store or item_hash in pending:
                 continue
+            pending[item_hash] = s
+        return list(pending.keys()), list(pending.values())
 
-            # 获取embedding
-            embedding = self._get_embedding(s)
+    def _insert_items(
+        self,
+        item_hashes: List[str],
+        strs: List[str],
+        embeddings: List[List[float]],
+    ) -> None:
+        """将已获取embedding的项存入库中"""
+        self.matrix.append(item_hashes, strs, embeddings)
 
-            # 存入
-            self.store[item_hash] = EmbeddingStoreItem(item_hash, embedding, s)
+    def batch_insert_strs(self, strs: List[str]) -> None:
+        """向库中存入字符串"""
+        concurrent_insert_strs([(self, strs)])
+
+    def _write_part(self, file_name: str, start: int, end: int) -> None:
+        """将[start, end)行按矩阵的存储类型写入parquet分片文件"""
+        columns = {
+            "hash": pa.array(self.matrix.hashes[start:end], type=pa.string()),
+            "embedding": pa.FixedSizeListArray.from_arrays(
+                pa.array(self.matrix.codes[start:end].reshape(-1)),
+                self.matrix.dimension,
+            ),
+            "str": pa.array(self.matrix.get_strs(start, end), type=pa.string()),
+        }
+        if self.matrix.scales is not None:
+            columns["scale"] = pa.array(self.matrix.scales[start:end])
+        columns.update(self._extra_columns(start, end))
+        table = pa.table(columns).replace_schema_metadata(
+            {
+                b"format_version": str(EMBEDDING_FILE_VERSION).encode(),
+                b"storage_dtype": self.matrix.storage_dtype.encode(),
+            }
+        )
+        pq.write_table(table, self.dir + "/" + file_name)
 
-    def save_to_file(self) -> None:
-        """保存到文件"""
-        data = []
+    def _read_part(self, file_name: str, with_strs: bool = True) -> int:
+        """读取parquet分片文件并追加至矩阵，返回读取的行数
+
+        按批读取（限制解码列表列时的内存峰值），embedding列直接从Arrow缓冲区转换为numpy数组，
+        不构造逐行的Python列表；文件的存储类型与矩阵一致时直接复制编码，
+        否则反量化后按矩阵的存储类型重新编码
+
+        Args:
+            file_name: 分片文件名
+            with_strs: 是否读取str列（字符串由文本存储提供时无需读取）
+        """
+        parquet_file = pq.ParquetFile(self.dir + "/" + file_name)
+        schema = parquet_file.schema_arrow
+        metadata = schema.metadata or {}
+        file_version = int(metadata.get(b"format_version", b"1"))
+        file_dtype = metadata.get(b"storage_dtype", b"float32").decode()
+        columns = [name for name in schema.names if with_strs or name != "str"]
+
+        rows = 0
+        for batch in parquet_file.iter_batches(
+            batch_size=READ_BATCH_ROWS, columns=columns
+        ):
+            # 版本2及以上为定长列表，展平即得到连续的缓冲区；
+            # 版本1为变长列表，各行长度相同，展平后整体reshape
+            codes = (
+                batch.column("embedding")
+                .flatten()
+                .to_numpy(zero_copy_only=False)
+                .reshape(len(batch), -1)
+            )
+            scales = batch.column("scale").to_numpy() if file_dtype == "int8" else None
+            item_hashes = batch.column("hash").to_numpy(zero_copy_only=False)
+            strs = (
+                batch.column("str").to_numpy(zero_copy_only=False)
+                if with_strs
+                else None
+            )
+
+            if file_version >= 2 and file_dtype == self.matrix.storage_dtype:
+                self.matrix.append_codes(item_hashes, strs, codes, scales)
+            else:
+                self.matrix.append(
+                    item_hashes,
+                    strs,
+                    dequantize_int8(codes, scales) if file_dtype == "int8" else codes,
+                    normalized=file_version >= 2,
+                )
+            self._read_extra_columns(batch)
+            rows += len(batch)
+        return rows
+
+    def _extra_columns(self, start: int, end: int) -> Dict[str, pa.Array]:
+        """[start, end)行的附加列（由子类扩展，随分片文件保存）"""
+        return {}
+
+    def _read_extra_columns(self, batch: pa.RecordBatch) -> None:
+        """读取分片文件中一批行的附加列（由子类扩展；在该批行追加至矩阵后调用）"""
+        pass
+
+    def _merge_parts(self) -> None:
+        """将全部行写入基础文件（先写临时文件再替换），被合并的增量分片文件在写入清单文件后删除"""
         logger.info(f"正在保存{self.namespace}嵌入库到文件{self.embedding_file_path}")
-        for item in self.store.values():
-            data.append(item.to_dict())
-        data_frame = pd.DataFrame(data)
+        base_file_name = os.path.basename(self.embedding_file_path)
+        self._write_part(base_file_name + ".tmp", 0, len(self.matrix))
+        os.replace(self.embedding_file_path + ".tmp", self.embedding_file_path)
+        self._stale_parts.extend(
+            part["file"] for part in self._parts if part["file"] != base_file_name
+        )
+        self._parts = [{"file": base_file_name, "rows": len(self.matrix)}]
+
+    def _write_manifest(self) -> None:
+        """写入清单文件（先写临时文件再替换，保证清单总是指向完整的分片）"""
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "parts": self._parts,
+            "rows": self._saved_rows,
+            "checksum": self._rows_checksum.advance(
+                self.matrix.hashes, self._saved_rows
+            ),
+            "index": {
+                "rows": self._saved_index_rows,
+                "checksum": self._index_checksum.advance(
+                    self.matrix.hashes, self._saved_index_rows
+                ),
+            },
+        }
+        if self.matrix.arena is not None:
+            manifest["strs"] = {"rows": len(self.matrix.arena)}
+        tmp_file_path = self.manifest_file_path + ".tmp"
+        with open(tmp_file_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(manifest, ensure_ascii=False, indent=4))
+        os.replace(tmp_file_path, self.manifest_file_path)
+
+        # 新的清单文件已不再引用被合并的增量分片，此时才可删除
+        for file_name in self._stale_parts:
+            part_file_path = self.dir + "/" + file_name
+            if os.path.exists(part_file_path):
+                os.remove(part_file_path)
+        self._stale_parts = []
+
+    def _open_arena(self) -> StringArena:
+        """打开（不存在时创建）文本存储"""
+        text_params = global_config["embedding"]["text"]
+        return StringArena(
+            self.strs_file_path,
+            self.strs_index_file_path,
+            text_params["compression"],
+            text_params["block_size"],
+        )
+
+    def _save_strs(self) -> None:
+        """将已保存行中尚未转存的字符串追加至文本存储，并释放其在内存中的副本"""
+        if not global_config["embedding"]["text"]["mmap"]:
+            return
+        arena = self.matrix.arena
+        if arena is None:
+            arena = self._open_arena()
+            arena.reset()
+        arena.append(self.matrix.get_strs(len(arena), self._saved_rows))
+        self.matrix.attach_arena(arena)
+
+    def save_to_file(self) -> None:
+        """保存到文件
 
+        仅将上次保存后新增的行写入新的分片文件；分片数超过上限时合并为单个文件
+        """
         if not os.path.exists(self.dir):
             os.makedirs(self.dir, exist_ok=True)
-        if not os.path.exists(self.embedding_file_path):
-            open(self.embedding_file_path, "w").close()
 
-        data_frame.to_parquet(self.embedding_file_path, engine="pyarrow", index=False)
-        logger.info(f"{self.namespace}嵌入库保存成功")
-
-        if self.faiss_index is not None and self.idx2hash is not None:
+        if len(self.matrix) > self._saved_rows or len(self._parts) == 0:
+            if len(self._parts) >= MAX_DELTA_PARTS or len(self._parts) == 0:
+                # 合并（或首次）保存：全部行写入基础文件
+                self._merge_parts()
+            else:
+                # 增量保存：仅写入新增行
+                part_file_name = f"{self.namespace}.part-{len(self._parts):04d}.parquet"
+                logger.info(
+                    f"正在保存{self.namespace}嵌入库的增量数据"
+                    f"（{len(self.matrix) - self._saved_rows}条）到文件{part_file_name}"
+                )
+                self._write_part(part_file_name, self._saved_rows, len(self.matrix))
+                self._parts.append(
+                    {
+                        "file": part_file_name,
+                        "rows": len(self.matrix) - self._saved_rows,
+                    }
+                )
+            self._saved_rows = len(self.matrix)
+            logger.info(f"{self.namespace}嵌入库保存成功")
+        self._save_strs()
+
+        if (
+            self.faiss_index is not None
+            and self.faiss_index.ntotal != self._saved_index_rows
+        ):
             logger.info(
                 f"正在保存{self.namespace}嵌入库的FaissIndex到文件{self.index_file_path}"
             )
             faiss.write_index(self.faiss_index, self.index_file_path)
+            self._saved_index_rows = self.faiss_index.ntotal
             logger.info(f"{self.namespace}嵌入库的FaissIndex保存成功")
-            logger.info(
-                f"正在保存{self.namespace}嵌入库的idx2hash映射到文件{self.idx2hash_file_path}"
-            )
-            with open(self.idx2hash_file_path, "w", encoding="utf-8") as f:
-                f.write(json.dumps(self.idx2hash, ensure_ascii=False, indent=4))
-            logger.info(f"{self.namespace}嵌入库的idx2hash映射保存成功")
+
+        self._write_manifest()
+
+    def _is_legacy_index_valid(self) -> bool:
+        """校验旧版本（无清单文件）的Faiss索引：比对idx2hash映射与存储的行顺序"""
+        if not os.path.exists(self.idx2hash_file_path):
+            return False
+        with open(self.idx2hash_file_path, "r", encoding="utf-8") as f:
+            idx2hash = json.load(f)
+        return len(idx2hash) == len(self.matrix) and all(
+            idx2hash.get(str(row)) == item_hash
+            for row, item_hash in enumerate(self.matrix.hashes)
+        )
 
     def load_from_file(self) -> None:
         """从文件中加载"""
-        if not os.path.exists(self.embedding_file_path):
+        manifest = None
+        if os.path.exists(self.manifest_file_path):
+            with open(self.manifest_file_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            self._parts = manifest["parts"]
+            base_file_name = os.path.basename(self.embedding_file_path)
+            if (
+                len(self._parts) > 1
+                and self._parts[0]["file"] == base_file_name
+                and pq.ParquetFile(self.embedding_file_path).metadata.num_rows
+                != self._parts[0].get("rows")
+            ):
+                # 合并保存在写入清单文件前中断：基础文件已包含全部行，清单中的增量分片均已并入
+                logger.warning(
+                    f"{self.namespace}嵌入库的增量分片已合并至基础文件，忽略清单中的增量分片"
+                )
+                self._stale_parts = [part["file"] for part in self._parts[1:]]
+                self._parts = self._parts[:1]
+        elif os.path.exists(self.embedding_file_path):
+            # 旧版本：仅有单个parquet文件
+            self._parts = [{"file": os.path.basename(self.embedding_file_path)}]
+        else:
             raise Exception(f"文件{self.embedding_file_path}不存在")
 
+        # 文本存储：清单文件记录的行数与嵌入库一致时，字符串按需从文本存储中读取，不读取str列
+        arena = None
+        if (
+            global_config["embedding"]["text"]["mmap"]
+            and manifest is not None
+            and "strs" in manifest
+            and not self._stale_parts
+        ):
+            arena = self._open_arena()
+            if (
+                manifest["strs"]["rows"] != manifest["rows"]
+                or len(arena) < manifest["rows"]
+            ):
+                logger.warning(f"{self.namespace}嵌入库的文本存储不完整，将重新生成")
+                arena = None
+            else:
+                # 丢弃保存过程中中断写入的部分
+                arena.truncate(manifest["rows"])
+
         logger.info(f"正在从文件{self.embedding_file_path}中加载{self.namespace}嵌入库")
-        data_frame = pd.read_parquet(self.embedding_file_path, engine="pyarrow")
-        for _, row in tqdm.tqdm(data_frame.iterrows(), total=len(data_frame)):
-            self.store[row["hash"]] = EmbeddingStoreItem(
-                row["hash"], row["embedding"], row["str"]
+        # 预先分配矩阵容量，避免加载过程中扩容
+        self.matrix.reserve(
+            sum(
+                pq.ParquetFile(self.dir + "/" + part["file"]).metadata.num_rows
+                for part in self._parts
             )
+        )
+        for part in self._parts:
+            part["rows"] = self._read_part(part["file"], with_strs=arena is None)
+        self._saved_rows = len(self.matrix)
+        # 加载时校验全部行（保存时仅增量计算校验和）
+        self._rows_checksum = PrefixChecksum()
+        self._index_checksum = PrefixChecksum()
+        rows_checksum = self._rows_checksum.advance(
+            self.matrix.hashes, self._saved_rows
+        )
+        if (
+            manifest is not None
+            and not self._stale_parts
+            and (
+                manifest["rows"] != self._saved_rows
+                or manifest["checksum"] != rows_checksum
+            )
+        ):
+            logger.warning(f"{self.namespace}嵌入库的数据与清单文件不一致")
+        strs_migrated = False
+        if arena is not None:
+            self.matrix.attach_arena(arena)
+        elif global_config["embedding"]["text"]["mmap"]:
+            # 旧版本数据或文本存储不完整：由str列生成文本存储
+            self._save_strs()
+            strs_migrated = True
         logger.info(f"{self.namespace}嵌入库加载成功")
 
         try:
@@ -115,18 +433,49 @@ class EmbeddingStore:
                     f"正在从文件{self.index_file_path}中加载{self.namespace}嵌入库的FaissIndex"
                 )
                 self.faiss_index = faiss.read_index(self.index_file_path)
-                logger.info(f"{self.namespace}嵌入库的FaissIndex加载成功")
             else:
                 raise Exception(f"文件{self.index_file_path}不存在")
-            if os.path.exists(self.idx2hash_file_path):
-                logger.info(
-                    f"正在从文件{self.idx2hash_file_path}中加载{self.namespace}嵌入库的idx2hash映射"
+
+            # 以行数与校验和校验索引与存储是否一致
+            index_rows = self.faiss_index.ntotal
+            if index_rows >= self._rows_checksum.rows:
+                # 索引通常覆盖全部行：沿用已计算的校验和，不再重新计算
+                self._index_checksum = self._rows_checksum.copy()
+            if manifest is not None:
+                if (
+                    index_rows != manifest["index"]["rows"]
+                    or index_rows > len(self.matrix)
+                    or self._index_checksum.advance(self.matrix.hashes, index_rows)
+                    != manifest["index"]["checksum"]
+                ):
+                    raise Exception("FaissIndex与嵌入库不一致")
+            elif not self._is_legacy_index_valid():
+                raise Exception("FaissIndex与嵌入库不一致")
+            if get_index_type(self.faiss_index) != self._resolve_index_type():
+                raise Exception(
+                    f"FaissIndex类型（{get_index_type(self.faiss_index)}）与配置不一致"
                 )
-                with open(self.idx2hash_file_path, "r") as f:
-                    self.idx2hash = json.load(f)
-                logger.info(f"{self.namespace}嵌入库的idx2hash映射加载成功")
-            else:
-                raise Exception(f"文件{self.idx2hash_file_path}不存在")
+            if (
+                get_index_storage_dtype(self.faiss_index)
+                != self._expected_index_dtype()
+            ):
+                raise Exception(
+                    f"FaissIndex的存储类型（{get_index_storage_dtype(self.faiss_index)}）与配置不一致"
+                )
+            apply_search_params(self.faiss_index, global_config["embedding"]["index"])
+            self._saved_index_rows = index_rows
+            logger.info(f"{self.namespace}嵌入库的FaissIndex加载成功")
+
+            if index_rows < len(self.matrix):
+                # 索引落后于存储（如保存索引前中断），仅补充缺失的行
+                logger.warning(
+                    f"{self.namespace}嵌入库的FaissIndex缺少{len(self.matrix) - index_rows}条数据，正在增量更新"
+                )
+                self.update_faiss_index()
+                self.save_to_file()
+            elif manifest is None or strs_migrated or self._stale_parts:
+                # 旧版本数据或中断的合并保存：补写清单文件
+                self._write_manifest()
         except Exception as e:
             logger.error(f"加载{self.namespace}嵌入库的FaissIndex时发生错误：{e}")
             logger.warning("正在重建Faiss索引")
@@ -134,22 +483,136 @@ class EmbeddingStore:
             logger.info(f"{self.namespace}嵌入库的FaissIndex重建成功")
             self.save_to_file()
 
+    def _resolve_index_type(self) -> str:
+        """按配置与当前数据量确定该嵌入库应使用的索引类型"""
+        index_params = global_config["embedding"]["index"]
+        return resolve_index_type(
+            index_params[self.namespace], len(self.matrix), index_params
+        )
+
+    def _expected_index_dtype(self) -> str | None:
+        """该嵌入库的Faiss索引应使用的向量存储类型"""
+        return expected_storage_dtype(
+            self._resolve_index_type(), self.matrix.storage_dtype
+        )
+
     def build_faiss_index(self) -> None:
         """重新构建Faiss索引，以余弦相似度为度量"""
-        # 获取所有的embedding
-        array = []
-        self.idx2hash = dict()
-        for key in self.store:
-            array.append(self.store[key].embedding)
-            self.idx2hash[str(len(array) - 1)] = key
-        embeddings = np.array(array, dtype=np.float32)
-        # L2归一化
-        faiss.normalize_L2(embeddings)
-        # 构建索引
-        self.faiss_index = faiss.IndexFlatIP(global_config["embedding"]["dimension"])
-        self.faiss_index.add(embeddings)
-
-    def search_top_k(self, query: List[float], k: int) -> List[Tuple[str, float]]:
+        # 构建索引（矩阵中的向量已L2归一化；float32存储时直接添加，无需复制）
+        index_type = self._resolve_index_type()
+        logger.info(f"正在构建{self.namespace}嵌入库的FaissIndex（{index_type}）")
+        vectors = self.matrix.vectors
+        self.faiss_index = create_faiss_index(
+            index_type,
+            global_config["embedding"]["dimension"],
+            vectors,
+            global_config["embedding"]["index"],
+            self.matrix.storage_dtype,
+        )
+        self.faiss_index.add(vectors)
+
+    def update_faiss_index(self) -> None:
+        """增量更新Faiss索引：仅添加索引中尚不存在的行
+
+        若数据量变化导致应使用的索引类型改变（如超过min_ann_size），或向量存储类型改变，则重建索引
+        """
+        if (
+            self.faiss_index is None
+            or get_index_type(self.faiss_index) != self._resolve_index_type()
+            or get_index_storage_dtype(self.faiss_index) != self._expected_index_dtype()
+        ):
+            self.build_faiss_index()
+            return
+        start = self.faiss_index.ntotal
+        if start == len(self.matrix):
+            return
+        self.faiss_index.add(self.matrix.get_vectors(slice(start, None)))
+
+    @property
+    def idx2hash(self) -> np.ndarray | None:
+        """Faiss索引下标到hash的映射（索引下标即矩阵行号，为hash数组的视图，不复制）"""
+        if self.faiss_index is None:
+            return None
+        return self.matrix.hashes[: self.faiss_index.ntotal]
+
+    @staticmethod
+    def _prepare_queries(queries: List[List[float]] | np.ndarray) -> np.ndarray:
+        """将查询整理为L2归一化的float32二维数组（复制一份，避免修改调用方的数据）"""
+        queries = np.array(queries, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries.reshape(1, -1)
+        faiss.normalize_L2(queries)
+        return queries
+
+    def search_top_k_batch(
+        self, queries: List[List[float]] | np.ndarray, k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """批量搜索每个查询最相似的k个项，以余弦相似度为度量（一次矩阵检索）
+        Args:
+            queries: 查询的embedding矩阵（n * dimension）
+            k: 每个查询返回的最相似的k个项
+        Returns:
+            hashes: n * k的hash数组（按相似度降序，结果不足k个时以None填充）
+            similarities: n * k的余弦相似度数组（float32，填充位置为-inf）
+        """
+        if self.faiss_index is None:
+            raise Exception("Faiss索引尚未构建")
+
+        distances, indices = self.faiss_index.search(self._prepare_queries(queries), k)
+        # 结果不足k个时Faiss以-1填充
+        valid = indices >= 0
+        hashes = np.full(indices.shape, None, dtype=object)
+        hashes[valid] = self.idx2hash[indices[valid]]
+        distances[~valid] = -np.inf
+        return hashes, distances
+
+    def range_search(
+        self, queries: List[List[float]] | np.ndarray, threshold: float
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """批量搜索与每个查询的余弦相似度不低于threshold的所有项（一次矩阵检索）
+        Args:
+            queries: 查询的embedding矩阵（n * dimension）
+            threshold: 相似度阈值
+        Returns:
+            lims: 长度为n+1的偏移数组，第i个查询的结果位于[lims[i], lims[i+1])
+            hashes: 所有查询结果的hash数组（每个查询内按相似度降序）
+            similarities: 对应的余弦相似度数组（float32）
+        """
+        if self.faiss_index is None:
+            raise Exception("Faiss索引尚未构建")
+
+        # 内积度量下Faiss返回相似度严格大于radius的项，略微放宽后再按阈值过滤
+        lims, distances, indices = self.faiss_index.range_search(
+            self._prepare_queries(queries),
+            float(np.nextafter(np.float32(threshold), np.float32(-np.inf))),
+        )
+        lims = lims.astype(np.int64)
+        query_ids = np.repeat(np.arange(len(lims) - 1), np.diff(lims))
+        keep = distances >= threshold
+        query_ids, distances, indices = query_ids[keep], distances[keep], indices[keep]
+        # Faiss不保证结果顺序：按(查询, 相似度降序)重排
+        order = np.lexsort((-distances, query_ids))
+        lims = np.searchsorted(query_ids[order], np.arange(len(lims)))
+        return lims, self.idx2hash[indices[order]], distances[order]
+
+    def search_top_k_array(
+        self, query: List[float] | np.ndarray, k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """搜索最相似的k个项，以余弦相似度为度量（以数组形式返回结果）
+        Args:
+            query: 查询的embedding
+            k: 返回的最相似的k个项
+        Returns:
+            hashes: 最相似的k个项的hash数组（按相似度降序）
+            similarities: 对应的余弦相似度数组（float32）
+        """
+        hashes, similarities = self.search_top_k_batch(query, k)
+        valid = np.isfinite(similarities[0])
+        return hashes[0][valid], similarities[0][valid]
+
+    def search_top_k(
+        self, query: List[float] | np.ndarray, k: int
+    ) -> List[Tuple[str, float]]:
         """搜索最相似的k个项，以余弦相似度为度量
         Args:
             query: 查询的embedding
@@ -157,25 +620,199 @@ class EmbeddingStore:
         Returns:
             result: 最相似的k个项的(hash, 余弦相似度)列表
         """
-        if self.faiss_index is None:
-            raise Exception("Faiss索引尚未构建")
-        if self.idx2hash is None:
-            raise Exception("idx2hash映射尚未构建")
+        hashes, similarities = self.search_top_k_array(query, k)
+        return list(zip(hashes.tolist(), similarities.tolist()))
+
 
-        # L2归一化
-        faiss.normalize_L2(np.array([query], dtype=np.float32))
-        # 搜索
-        distances, indices = self.faiss_index.search(np.array([query]), k)
-        # 整理结果
-        indices = list(indices.flatten())
-        distances = list(distances.flatten())
-        result = [
-            (self.idx2hash[str(int(idx))], float(sim))
-            for (idx, sim) in zip(indices, distances)
-            if idx in range(len(self.idx2hash))
-        ]
+class RelationEmbeddingStore(EmbeddingStore):
+    """关系嵌入库
 
-        return result
+    关系以str(三元组)的形式嵌入；同时按行保存三元组的主体、谓词、客体，
+    以及主体、客体对应的实体hash（随分片文件保存），检索时直接读取，无需解析字符串
+    """
+
+    # 附加列
+    TRIPLE_COLUMNS = ("subject", "predicate", "object", "subject_hash", "object_hash")
+
+    def __init__(self, llm_client: LLMClient, namespace: str, dir_path: str):
+        super().__init__(llm_client, namespace, dir_path)
+        # 与矩阵的行对齐的附加列
+        self._columns: Dict[str, List[str | None]] = {
+            name: [] for name in self.TRIPLE_COLUMNS
+        }
+        # 加载时是否由str列解析了三元组（旧版本数据）
+        self._triples_parsed = False
+
+    @staticmethod
+    def _parse_triple(relation: str) -> Tuple[str, str, str] | None:
+        """解析str(三元组)形式的关系字符串（解析失败时返回None）"""
+        try:
+            triple = ast.literal_eval(relation)
+        except (ValueError, SyntaxError):
+            return None
+        if not isinstance(triple, tuple) or len(triple) != 3:
+            return None
+        return tuple(str(item) for item in triple)
+
+    def _append_triples(self, triples: List[Tuple[str, str, str] | None]) -> None:
+        """按行追加三元组（同时计算主体、客体的实体hash）"""
+        for triple in triples:
+            if triple is None:
+                logger.error(f"{self.namespace}嵌入库中存在无法解析的三元组")
+                triple = (None, None, None)
+                ent_hashes = (None, None)
+            else:
+                ent_hashes = (
+                    ENT_NAMESPACE + "-" + get_sha256(triple[0]),
+                    ENT_NAMESPACE + "-" + get_sha256(triple[2]),
+                )
+            for name, value in zip(self.TRIPLE_COLUMNS, triple + ent_hashes):
+                self._columns[name].append(value)
+
+    def _insert_items(
+        self,
+        item_hashes: List[str],
+        strs: List[str],
+        embeddings: List[List[float]],
+    ) -> None:
+        super()._insert_items(item_hashes, strs, embeddings)
+        self._append_triples([self._parse_triple(s) for s in strs])
+
+    def _extra_columns(self, start: int, end: int) -> Dict[str, pa.Array]:
+        return {
+            name: pa.array(self._columns[name][start:end], type=pa.string())
+            for name in self.TRIPLE_COLUMNS
+        }
+
+    def _read_part(self, file_name: str, with_strs: bool = True) -> int:
+        schema = pq.read_schema(self.dir + "/" + file_name)
+        if not all(name in schema.names for name in self.TRIPLE_COLUMNS):
+            # 旧版本分片文件没有三元组列：读取str列解析
+            self._triples_parsed = True
+            with_strs = True
+        return super()._read_part(file_name, with_strs)
+
+    def _read_extra_columns(self, batch: pa.RecordBatch) -> None:
+        if all(name in batch.schema.names for name in self.TRIPLE_COLUMNS):
+            for name in self.TRIPLE_COLUMNS:
+                self._columns[name].extend(batch.column(name).to_pylist())
+        else:
+            self._append_triples(
+                [self._parse_triple(s) for s in batch.column("str").to_pylist()]
+            )
+
+    def load_from_file(self) -> None:
+        for name in self.TRIPLE_COLUMNS:
+            self._columns[name] = []
+        self._triples_parsed = False
+        super().load_from_file()
+        if self._triples_parsed:
+            # 旧版本数据：重写分片文件，补充三元组列
+            logger.info(f"正在为{self.namespace}嵌入库补充三元组列")
+            self._merge_parts()
+            self._write_manifest()
+
+    def get_triple(self, item_hash: str) -> Tuple[str, str, str] | None:
+        """获取关系的三元组（主体, 谓词, 客体）"""
+        row = self.matrix.hash2row[item_hash]
+        if self._columns["subject"][row] is None:
+            return None
+        return (
+            self._columns["subject"][row],
+            self._columns["predicate"][row],
+            self._columns["object"][row],
+        )
+
+    def get_entity_hashes(self, item_hash: str) -> Tuple[str, ...]:
+        """获取关系的主体、客体对应的实体hash（三元组无法解析时返回空元组）"""
+        row = self.matrix.hash2row[item_hash]
+        if self._columns["subject_hash"][row] is None:
+            return ()
+        return (
+            self._columns["subject_hash"][row],
+            self._columns["object_hash"][row],
+        )
+
+
+def concurrent_insert_strs(tasks: List[Tuple[EmbeddingStore, List[str]]]) -> None:
+    """并发地向多个嵌入库存入字符串
+
+    各嵌入库的待嵌入项按批次打包后提交至同一线程池，不同库的批次可以重叠执行；
+    同一服务商的在途请求数由LLMClient限制。结果统一在调用线程中按输入顺序写入嵌入库
+
+    Args:
+        tasks: (嵌入库, 待存入的字符串列表)的列表
+    """
+    model = global_config["embedding"]["model"]
+    dimension = global_config["embedding"]["dimension"]
+    embedding_cache = get_shared_embedding_cache()
+
+    # 各任务的待存入项（按输入顺序）：(hash列表, 字符串列表, embedding列表)
+    pending_items = []
+    jobs = []  # (任务下标, 批次内各项在待存入项中的下标, 字符串列表)
+    progress_bars = []
+    for task_idx, (store, strs) in enumerate(tasks):
+        item_hashes, pending_strs = store._get_pending_items(strs)
+        embeddings = [None] * len(pending_strs)
+        if embedding_cache is not None and len(pending_strs) > 0:
+            # 优先从共享缓存中获取embedding，仅对未命中的项发送请求
+            embeddings = embedding_cache.get_many(model, dimension, pending_strs)
+        pending_items.append((item_hashes, pending_strs, embeddings))
+        miss_idx = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        # 按批次大小与token预算打包
+        for batch in pack_embedding_batches(
+            [pending_strs[i] for i in miss_idx],
+            global_config["embedding"]["batch_size"],
+            global_config["embedding"]["batch_max_tokens"],
+        ):
+            batch_idx = [miss_idx[i] for i in batch]
+            jobs.append((task_idx, batch_idx, [pending_strs[i] for i in batch_idx]))
+        progress_bars.append(
+            tqdm.tqdm(
+                total=len(miss_idx),
+                desc=f"存入{store.namespace}嵌入库",
+                unit="items",
+                position=task_idx,
+            )
+        )
+
+    results = [None] * len(jobs)
+    try:
+        with ThreadPoolExecutor(
+            max_workers=global_config["embedding"]["max_workers"]
+        ) as executor:
+            futures = {
+                executor.submit(tasks[task_idx][0]._get_embeddings, batch_strs): job_idx
+                for job_idx, (task_idx, _, batch_strs) in enumerate(jobs)
+            }
+            for future in as_completed(futures):
+                job_idx = futures[future]
+                results[job_idx] = future.result()
+                progress_bars[jobs[job_idx][0]].update(len(jobs[job_idx][2]))
+    finally:
+        for progress_bar in progress_bars:
+            progress_bar.close()
+
+    for (task_idx, batch_idx, batch_strs), batch_embeddings in zip(jobs, results):
+        embeddings = pending_items[task_idx][2]
+        for i, embedding in zip(batch_idx, batch_embeddings):
+            embeddings[i] = embedding
+        if embedding_cache is not None:
+            embedding_cache.put_many(model, dimension, batch_strs, batch_embeddings)
+    del results
+
+    # 按输入顺序存入，保证库中各项的顺序（即索引id）与缓存命中情况及并发执行顺序无关
+    for (store, _), (item_hashes, pending_strs, embeddings) in zip(
+        tasks, pending_items
+    ):
+        store._insert_items(item_hashes, pending_strs, embeddings)
+
+    if embedding_cache is not None:
+        cache_stats = embedding_cache.stats()
+        logger.info(
+            f"嵌入缓存：命中{cache_stats['hits']}次，未命中{cache_stats['misses']}次，"
+            f"命中率{cache_stats['hit_rate'] * 100:.2f}%，缓存大小{cache_stats['size_mb']:.1f}MB"
+        )
 
 
 class EmbeddingManager:
@@ -197,37 +834,33 @@ class EmbeddingManager:
             ENT_NAMESPACE,
             store_dir,
         )
-        self.relation_embedding_store = EmbeddingStore(
+        self.relation_embedding_store = RelationEmbeddingStore(
             llm_client,
             REL_NAMESPACE,
             store_dir,
         )
         self.stored_pg_hashes = set()
 
-    def _store_pg_into_embedding(self, raw_paragraphs: Dict[str, str]):
-        """将段落编码存入Embedding库"""
-        self.paragraphs_embedding_store.batch_insert_strs(list(raw_paragraphs.values()))
-
-    def _store_ent_into_embedding(self, triple_list_data: Dict[str, List[List[str]]]):
-        """将实体编码存入Embedding库"""
+    @staticmethod
+    def _collect_entities(triple_list_data: Dict[str, List[List[str]]]) -> List[str]:
+        """从三元组中收集实体"""
         entities = set()
         for triple_list in triple_list_data.values():
             for triple in triple_list:
                 entities.add(triple[0])
                 entities.add(triple[2])
-        self.entities_embedding_store.batch_insert_strs(list(entities))
+        return list(entities)
 
-    def _store_rel_into_embedding(self, triple_list_data: Dict[str, List[List[str]]]):
-        """将关系编码存入Embedding库"""
+    @staticmethod
+    def _collect_relations(triple_list_data: Dict[str, List[List[str]]]) -> List[str]:
+        """从三元组中收集关系"""
         graph_triples = (
             []
         )  # a list of unique relation triple (in tuple) from all chunks
         for triples in triple_list_data.values():
             graph_triples.extend([tuple(t) for t in triples])
         graph_triples = list(set(graph_triples))
-        self.relation_embedding_store.batch_insert_strs(
-            [str(triple) for triple in graph_triples]
-        )
+        return [str(triple) for triple in graph_triples]
 
     def load_from_file(self):
         """从文件加载"""
@@ -242,10 +875,20 @@ class EmbeddingManager:
         raw_paragraphs: Dict[str, str],
         triple_list_data: Dict[str, List[List[str]]],
     ):
-        """存储新的数据集"""
-        self._store_pg_into_embedding(raw_paragraphs)
-        self._store_ent_into_embedding(triple_list_data)
-        self._store_rel_into_embedding(triple_list_data)
+        """存储新的数据集（段落、实体、关系三个嵌入库并发处理）"""
+        concurrent_insert_strs(
+            [
+                (self.paragraphs_embedding_store, list(raw_paragraphs.values())),
+                (
+                    self.entities_embedding_store,
+                    self._collect_entities(triple_list_data),
+                ),
+                (
+                    self.relation_embedding_store,
+                    self._collect_relations(triple_list_data),
+                ),
+            ]
+        )
         self.stored_pg_hashes.update(raw_paragraphs.keys())
 
     def save_to_file(self):
@@ -255,7 +898,13 @@ class EmbeddingManager:
         self.relation_embedding_store.save_to_file()
 
     def rebuild_faiss_index(self):
-        """重建Faiss索引（请在添加新数据后调用）"""
+        """重建Faiss索引"""
         self.paragraphs_embedding_store.build_faiss_index()
         self.entities_embedding_store.build_faiss_index()
         self.relation_embedding_store.build_faiss_index()
+
+    def update_faiss_index(self):
+        """增量更新Faiss索引（请在添加新数据后调用）"""
+        self.paragraphs_embedding_store.update_faiss_index()
+        self.entities_embedding_store.update_faiss_index()
+        self.relation_embedding_store.update_faiss_index()
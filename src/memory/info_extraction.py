@@ -88,6 +88,7 @@ def extract_triples(_agent_name: str):
         llm_client_list[key] = LLMClient(
             global_config["llm_providers"][key]["base_url"],
             global_config["llm_providers"][key]["api_key"],
+            global_config["llm_providers"][key]["max_concurrent_requests"],
         )
 
     logger.info("正在加载原始数据")
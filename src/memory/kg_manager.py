@@ -4,19 +4,22 @@ import time
 from typing import Dict, List, Tuple
 
 import numpy as np
-import pandas as pd
-import tqdm
+import pyarrow as pa
+import pyarrow.parquet as pq
 from quick_algo import di_graph, pagerank
 import urllib
 
-from .utils.hash import get_sha256
 from .embedding_store import EmbeddingManager, EmbeddingStoreItem
+from .ppr_cache import PPRCache
+from .symbol_table import SymbolTable
+from .synonym_linker import link_synonyms
 from src.utils.config import (
     ENT_NAMESPACE,
     PG_NAMESPACE,
     RAG_ENT_CNT_NAMESPACE,
     RAG_GRAPH_NAMESPACE,
     RAG_PG_HASH_NAMESPACE,
+    RAG_SYMBOL_NAMESPACE,
     global_config,
 )
 
@@ -29,10 +32,20 @@ class KGManager:
         # 会被保存的字段
         # 存储段落的hash值，用于去重
         self.stored_paragraph_hashes = set()
-        # 实体出现次数
-        self.ent_appear_cnt = dict()
+        # 实体出现次数（以节点id为下标）
+        self.ent_appear_cnt = np.zeros(0, dtype=np.float64)
         # KG
         self.graph = di_graph.DiGraph()
+        # 节点符号表（节点key与整数id的映射）
+        self.symbols = SymbolTable()
+        # 图中文段节点的索引与掩码（缓存，图结构变化后失效）
+        self._pg_node_idx = None
+        self._pg_node_mask = None
+        # PPR结果缓存
+        self.ppr_cache = PPRCache(
+            global_config["qa"]["params"]["ppr_cache_size"],
+            global_config["qa"]["params"]["ppr_cache_quantization"],
+        )
 
         # 持久化相关
         self.dir_path = (
@@ -41,11 +54,16 @@ class KGManager:
             + urllib.parse.quote(self._agent_name)
             + global_config["persistence"]["rag_data_dir"]
         )
-        self.graph_data_path = self.dir_path + "/" + RAG_GRAPH_NAMESPACE + ".graphml"
+        self.graph_data_path = self.dir_path + "/" + RAG_GRAPH_NAMESPACE + ".qag"
+        # 旧版本数据的GraphML格式图文件（仅用于加载）
+        self.legacy_graph_data_path = (
+            self.dir_path + "/" + RAG_GRAPH_NAMESPACE + ".graphml"
+        )
         self.ent_cnt_data_path = (
             self.dir_path + "/" + RAG_ENT_CNT_NAMESPACE + ".parquet"
         )
         self.pg_hash_file_path = self.dir_path + "/" + RAG_PG_HASH_NAMESPACE + ".json"
+        self.symbol_data_path = self.dir_path + "/" + RAG_SYMBOL_NAMESPACE + ".parquet"
 
     def save_to_file(self):
         """将KG数据保存到文件"""
@@ -56,17 +74,34 @@ class KGManager:
         # 保存KG
         di_graph.save_to_file(self.graph, self.graph_data_path)
 
+        # 保存符号表
+        self.symbols.save_to_file(self.symbol_data_path)
+
         # 保存实体计数到文件
-        ent_cnt_df = pd.DataFrame(
-            [{"hash_key": k, "appear_cnt": v} for k, v in self.ent_appear_cnt.items()]
+        ent_ids = np.flatnonzero(self.ent_appear_cnt)
+        ent_cnt_table = pa.table(
+            {
+                "hash_key": pa.array(self.symbols.keys(ent_ids), type=pa.string()),
+                "appear_cnt": pa.array(self.ent_appear_cnt[ent_ids]),
+            }
         )
-        ent_cnt_df.to_parquet(self.ent_cnt_data_path, engine="pyarrow", index=False)
+        pq.write_table(ent_cnt_table, self.ent_cnt_data_path)
 
         # 保存段落hash到文件
         with open(self.pg_hash_file_path, "w", encoding="utf-8") as f:
             data = {"stored_paragraph_hashes": list(self.stored_paragraph_hashes)}
             f.write(json.dumps(data, ensure_ascii=False, indent=4))
 
+    def export_graph(self, file_path: str):
+        """导出KG图（GraphML格式，文件扩展名为.graphml或.graphmlz）
+
+        Args:
+            file_path: 导出文件路径
+        """
+        di_graph.save_to_file(
+            self.graph, file_path, enable_zip=file_path.endswith(".graphmlz")
+        )
+
     def load_from_file(self):
         """从文件加载KG数据"""
         # 确保文件存在
@@ -74,29 +109,65 @@ class KGManager:
             raise Exception(f"KG段落hash文件{self.pg_hash_file_path}不存在")
         if not os.path.exists(self.ent_cnt_data_path):
             raise Exception(f"KG实体计数文件{self.ent_cnt_data_path}不存在")
-        if not os.path.exists(self.graph_data_path):
-            raise Exception(f"KG图文件{self.graph_data_path}不存在")
+        graph_data_path = self.graph_data_path
+        if not os.path.exists(graph_data_path):
+            if not os.path.exists(self.legacy_graph_data_path):
+                raise Exception(f"KG图文件{self.graph_data_path}不存在")
+            # 旧版本数据：加载GraphML格式的图文件，下次保存时转换为二进制格式
+            logger.info("KG图文件为旧版GraphML格式，将在下次保存时转换为二进制格式")
+            graph_data_path = self.legacy_graph_data_path
 
         # 加载段落hash
         with open(self.pg_hash_file_path, "r", encoding="utf-8") as f:
             data = json.load(f)
             self.stored_paragraph_hashes = set(data["stored_paragraph_hashes"])
 
+        # 加载KG
+        self.graph = di_graph.load_from_file(graph_data_path)
+        self._pg_node_idx = None
+        self._pg_node_mask = None
+        self.ppr_cache.clear()
+
+        # 加载符号表（key与图中的节点名共用字符串对象）
+        node_list = self.graph.get_node_list()
+        if os.path.exists(self.symbol_data_path):
+            self.symbols.load_from_file(self.symbol_data_path, node_list)
+        else:
+            # 旧版本数据没有符号表：按图中的节点顺序分配id
+            logger.info("KG符号表文件不存在，将根据图中的节点重建")
+            self.symbols.clear()
+            for node_key in node_list:
+                self.symbols.intern(node_key)
+
         # 加载实体计数
-        ent_cnt_df = pd.read_parquet(self.ent_cnt_data_path, engine="pyarrow")
-        self.ent_appear_cnt = dict(
-            {row["hash_key"]: row["appear_cnt"] for _, row in ent_cnt_df.iterrows()}
+        # 按列读取为数组后整体写入，不逐行遍历
+        ent_cnt_table = pq.read_table(self.ent_cnt_data_path)
+        ent_ids = [
+            self.symbols.intern(hash_key)
+            for hash_key in ent_cnt_table.column("hash_key").to_pylist()
+        ]
+        self.ent_appear_cnt = np.zeros(len(self.symbols), dtype=np.float64)
+        self.ent_appear_cnt[ent_ids] = (
+            ent_cnt_table.column("appear_cnt").to_numpy().astype(np.float64)
         )
 
-        # 加载KG
-        self.graph = di_graph.load_from_file(self.graph_data_path)
+    def _grow_ent_appear_cnt(self):
+        """将实体计数数组扩展至符号表大小（新增的id计数为0）"""
+        if len(self.ent_appear_cnt) < len(self.symbols):
+            self.ent_appear_cnt = np.concatenate(
+                [
+                    self.ent_appear_cnt,
+                    np.zeros(len(self.symbols) - len(self.ent_appear_cnt)),
+                ]
+            )
 
     def _build_edges_between_ent(
         self,
-        node_to_node: Dict[Tuple[str, str], float],
+        node_to_node: Dict[Tuple[int, int], float],
         triple_list_data: Dict[str, List[List[str]]],
     ):
         """构建实体节点之间的关系，同时统计实体出现次数"""
+        appeared_ent_ids = []
         for triple_list in triple_list_data.values():
             entity_set = set()
             for triple in triple_list:
@@ -104,142 +175,125 @@ class KGManager:
                     # 避免自连接
                     continue
                 # 一个triple就是一条边（同时构建双向联系）
-                hash_key1 = ENT_NAMESPACE + "-" + get_sha256(triple[0])
-                hash_key2 = ENT_NAMESPACE + "-" + get_sha256(triple[2])
-                node_to_node[(hash_key1, hash_key2)] = (
-                    node_to_node.get((hash_key1, hash_key2), 0) + 1.0
+                ent_id1 = self.symbols.entity_id(triple[0])
+                ent_id2 = self.symbols.entity_id(triple[2])
+                node_to_node[(ent_id1, ent_id2)] = (
+                    node_to_node.get((ent_id1, ent_id2), 0) + 1.0
                 )
-                node_to_node[(hash_key2, hash_key1)] = (
-                    node_to_node.get((hash_key2, hash_key1), 0) + 1.0
+                node_to_node[(ent_id2, ent_id1)] = (
+                    node_to_node.get((ent_id2, ent_id1), 0) + 1.0
                 )
-                entity_set.add(hash_key1)
-                entity_set.add(hash_key2)
+                entity_set.add(ent_id1)
+                entity_set.add(ent_id2)
 
-            # 实体出现次数统计
-            for hash_key in entity_set:
-                self.ent_appear_cnt[hash_key] = (
-                    self.ent_appear_cnt.get(hash_key, 0) + 1.0
-                )
+            appeared_ent_ids.extend(entity_set)
+
+        # 实体出现次数统计（每个段落中出现的实体计数加1）
+        self._grow_ent_appear_cnt()
+        np.add.at(
+            self.ent_appear_cnt, np.asarray(appeared_ent_ids, dtype=np.int64), 1.0
+        )
 
-    @staticmethod
     def _build_edges_between_ent_pg(
-        node_to_node: Dict[Tuple[str, str], float],
+        self,
+        node_to_node: Dict[Tuple[int, int], float],
         triple_list_data: Dict[str, List[List[str]]],
     ):
         """构建实体节点与文段节点之间的关系"""
         for idx in triple_list_data:
+            pg_id = self.symbols.paragraph_id(str(idx))
             for triple in triple_list_data[idx]:
-                ent_hash_key = ENT_NAMESPACE + "-" + get_sha256(triple[0])
-                pg_hash_key = PG_NAMESPACE + "-" + str(idx)
-                node_to_node[(ent_hash_key, pg_hash_key)] = (
-                    node_to_node.get((ent_hash_key, pg_hash_key), 0) + 1.0
+                ent_id = self.symbols.entity_id(triple[0])
+                node_to_node[(ent_id, pg_id)] = (
+                    node_to_node.get((ent_id, pg_id), 0) + 1.0
                 )
 
-    @staticmethod
     def _synonym_connect(
-        node_to_node: Dict[Tuple[str, str], float],
+        self,
+        node_to_node: Dict[Tuple[int, int], float],
         triple_list_data: Dict[str, List[List[str]]],
         embedding_manager: EmbeddingManager,
     ) -> int:
         """同义词连接"""
-        new_edge_cnt = 0
-        # 获取所有实体节点的hash值
-        ent_hash_list = set()
+        # 获取所有实体节点的id（按首次出现的顺序）
+        ent_ids = dict()
         for triple_list in triple_list_data.values():
             for triple in triple_list:
-                ent_hash_list.add(ENT_NAMESPACE + "-" + get_sha256(triple[0]))
-                ent_hash_list.add(ENT_NAMESPACE + "-" + get_sha256(triple[2]))
-        ent_hash_list = list(ent_hash_list)
-
-        synonym_hash_set = set()
-
-        synonym_result = dict()
-
-        # 对每个实体节点，查找其相似的实体节点，建立扩展连接
-        for ent_hash in tqdm.tqdm(ent_hash_list):
-            if ent_hash in synonym_hash_set:
-                # 避免同一批次内重复添加
-                continue
-            ent = embedding_manager.entities_embedding_store.store.get(ent_hash)
-            assert isinstance(ent, EmbeddingStoreItem)
-            if ent is None:
-                continue
-            # 查询相似实体
-            similar_ents = embedding_manager.entities_embedding_store.search_top_k(
-                ent.embedding, global_config["rag"]["params"]["synonym_search_top_k"]
+                ent_ids[self.symbols.entity_id(triple[0])] = None
+                ent_ids[self.symbols.entity_id(triple[2])] = None
+
+        ent_store = embedding_manager.entities_embedding_store
+        ent_ids = [
+            ent_id for ent_id in ent_ids if self.symbols.key(ent_id) in ent_store.matrix
+        ]
+        rag_params = global_config["rag"]["params"]
+        return link_synonyms(
+            node_to_node,
+            ent_ids,
+            self.symbols,
+            ent_store,
+            rag_params["synonym_threshold"],
+            rag_params["synonym_search_top_k"],
+            batch_size=rag_params["synonym_batch_size"],
+            max_workers=rag_params["synonym_max_workers"],
+            verbose=rag_params["synonym_verbose"],
+        )
+
+    def _get_pg_node_idx(self) -> np.ndarray:
+        """获取图中所有文段节点的索引（按需构建并缓存）"""
+        if self._pg_node_idx is None:
+            self._pg_node_idx = np.fromiter(
+                (
+                    idx
+                    for node_key, idx in self.graph.node_name2idx_map.items()
+                    if node_key.startswith(PG_NAMESPACE)
+                ),
+                dtype=np.int64,
             )
-            res_ent = []  # Debug
-            for res_ent_hash, similarity in similar_ents:
-                if res_ent_hash == ent_hash:
-                    # 避免自连接
-                    continue
-                if similarity < global_config["rag"]["params"]["synonym_threshold"]:
-                    # 相似度阈值
-                    continue
-                node_to_node[(res_ent_hash, ent_hash)] = similarity
-                node_to_node[(ent_hash, res_ent_hash)] = similarity
-                synonym_hash_set.add(res_ent_hash)
-                new_edge_cnt += 1
-                res_ent.append(
-                    (
-                        embedding_manager.entities_embedding_store.store[
-                            res_ent_hash
-                        ].str,
-                        similarity,
-                    )
-                )  # Debug
-                synonym_result[ent.str] = res_ent
-
-        for k, v in synonym_result.items():
-            print(f'"{k}"的相似实体为：{v}')
-        return new_edge_cnt
+        return self._pg_node_idx
+
+    def _get_pg_node_mask(self) -> np.ndarray:
+        """获取以节点索引为下标的文段节点掩码（按需构建并缓存）"""
+        if self._pg_node_mask is None:
+            self._pg_node_mask = np.zeros(self.graph.node_array_size, dtype=np.uint8)
+            self._pg_node_mask[self._get_pg_node_idx()] = 1
+        return self._pg_node_mask
 
     def _update_graph(
         self,
-        node_to_node: Dict[Tuple[str, str], float],
+        node_to_node: Dict[Tuple[int, int], float],
         embedding_manager: EmbeddingManager,
     ):
         """更新KG图结构
 
         流程：
-        1. 更新图结构：遍历所有待添加的新边
+        1. 更新图结构：批量插入/更新所有待添加的边
             - 若是新边，则添加到图中
-            - 若是已存在的边，则更新边的权重
+            - 若是已存在的边，则累加边的权重
         2. 更新新节点的属性
         """
-        existed_nodes = self.graph.get_node_list()
-        existed_edges = [str((edge[0], edge[1])) for edge in self.graph.get_edge_list()]
+        existed_nodes = set(self.graph.get_node_list())
+        self._pg_node_idx = None
+        self._pg_node_mask = None
 
         now_time = time.time()
 
         # 更新图结构
-        for src_tgt, weight in node_to_node.items():
-            key = str(src_tgt)
-            # 检查边是否已存在
-            if key not in existed_edges:
-                # 新边
-                self.graph.add_edge(
-                    di_graph.DiEdge(
-                        src_tgt[0],
-                        src_tgt[1],
-                        {
-                            "weight": weight,
-                            "create_time": now_time,
-                            "update_time": now_time,
-                        },
-                    )
-                )
-            else:
-                # 已存在的边
-                edge_item = self.graph[src_tgt[0], src_tgt[1]]
-                edge_item["weight"] += weight
-                edge_item["update_time"] = now_time
-                self.graph.update_edge(edge_item)
+        src_list = self.symbols.keys(src_tgt[0] for src_tgt in node_to_node)
+        tgt_list = self.symbols.keys(src_tgt[1] for src_tgt in node_to_node)
+        self.graph.upsert_edges_from(
+            src_list,
+            tgt_list,
+            list(node_to_node.values()),
+            attrs={"update_time": now_time},
+            new_attrs={"create_time": now_time},
+        )
 
         # 更新新节点属性
         for src_tgt in node_to_node.keys():
-            for node_hash in src_tgt:
+            for node_hash in self.symbols.keys(src_tgt):
                 if node_hash not in existed_nodes:
+                    existed_nodes.add(node_hash)
                     if node_hash.startswith(ENT_NAMESPACE):
                         # 新增实体节点
                         node = embedding_manager.entities_embedding_store.store[
@@ -298,6 +352,8 @@ class KGManager:
 
         # 构建图
         self._update_graph(node_to_node, embedding_manager)
+        # 保证图中所有节点的id都在实体计数数组的范围内
+        self._grow_ent_appear_cnt()
 
         # 记录已处理（存储）的段落hash
         for idx in triple_list_data:
@@ -316,128 +372,172 @@ class KGManager:
             paragraph_search_result: ParagraphEmbedding的搜索结果（paragraph_hash, similarity）
             embed_manager: EmbeddingManager对象
         """
-        # 图中存在的节点总集
-        existed_nodes = self.graph.get_node_list()
+        # 节点名到节点索引的映射（种子节点均通过该映射定位，无需遍历节点列表）
+        node_name2idx_map = self.graph.node_name2idx_map
 
-        # 准备PPR使用的数据
-        # 节点权重：实体
-        ent_weights = {}
-        # 节点权重：文段
-        pg_weights = {}
-
-        # 以下部分处理实体权重ent_weights
+        # 以下部分处理实体权重
 
         # 针对每个关系，提取出其中的主宾短语作为两个实体，并记录对应的三元组的相似度作为权重依据
-        ent_sim_scores = {}
+        seed_ent_ids = []  # 实体id（可重复）
+        seed_ent_sims = []  # 对应的相似度
+        rel_store = embed_manager.relation_embedding_store
         for relation_hash, similarity, _ in relation_search_result:
-            # 提取主宾短语
-            relation = embed_manager.relation_embedding_store.store.get(
-                relation_hash
-            ).str
-            assert relation is not None  # 断言：relation不为空
-            # 关系三元组
-            triple = relation[2:-2].split("', '")
-            for ent in [(triple[0]), (triple[2])]:
-                ent_hash = ENT_NAMESPACE + "-" + get_sha256(ent)
-                if ent_hash in existed_nodes:  # 该实体需在KG中存在
-                    if ent_hash not in ent_sim_scores:  # 尚未记录的实体
-                        ent_sim_scores[ent_hash] = []
-                    ent_sim_scores[ent_hash].append(similarity)
-
-        ent_mean_scores = {}  # 记录实体的平均相似度
-        for ent_hash, scores in ent_sim_scores.items():
-            # 先对相似度进行累加，然后与实体计数相除获取最终权重
-            ent_weights[ent_hash] = (
-                float(np.sum(scores)) / self.ent_appear_cnt[ent_hash]
-            )
-            # 记录实体的平均相似度，用于后续的top_k筛选
-            ent_mean_scores[ent_hash] = float(np.mean(scores))
-        del ent_sim_scores
-
-        ent_weights_max = max(ent_weights.values())
-        ent_weights_min = min(ent_weights.values())
-        if ent_weights_max == ent_weights_min:
-            # 只有一个相似度，则全赋值为1
-            for ent_hash in ent_weights.keys():
-                ent_weights[ent_hash] = 1.0
-        else:
-            down_edge = global_config["qa"]["params"]["paragraph_node_weight"]
-            # 缩放取值区间至[down_edge, 1]
-            for ent_hash, score in ent_weights.items():
-                # 缩放相似度
-                ent_weights[ent_hash] = (
-                    (score - ent_weights_min)
-                    * (1 - down_edge)
-                    / (ent_weights_max - ent_weights_min)
+            # 主宾短语对应的实体hash（存入关系库时已计算）
+            for ent_hash in rel_store.get_entity_hashes(relation_hash):
+                if ent_hash in node_name2idx_map:  # 该实体需在KG中存在
+                    # 图中的节点均已在符号表中，只读查询，不分配新id
+                    seed_ent_ids.append(self.symbols.get_id(ent_hash))
+                    seed_ent_sims.append(similarity)
+
+        # 按实体聚合相似度（实体按首次出现的顺序排列）
+        ent_ids, first_pos, inverse = np.unique(
+            np.asarray(seed_ent_ids, dtype=np.int64),
+            return_index=True,
+            return_inverse=True,
+        )
+        order = np.argsort(first_pos, kind="stable")
+        ent_ids = ent_ids[order]
+        inverse = np.argsort(order)[inverse]
+        ent_sim_sums = np.bincount(
+            inverse, weights=np.asarray(seed_ent_sims, dtype=np.float64)
+        )
+        # 实体的平均相似度，用于后续的top_k筛选
+        ent_mean_scores = ent_sim_sums / np.bincount(inverse)
+        # 相似度之和与实体计数相除获取实体权重（仅出现在自环三元组中的实体没有计数，按1计）
+        ent_weights = ent_sim_sums / np.maximum(self.ent_appear_cnt[ent_ids], 1.0)
+        del seed_ent_ids, seed_ent_sims, first_pos, inverse, order, ent_sim_sums
+
+        if len(ent_weights) > 0:
+            ent_weights_max = ent_weights.max()
+            ent_weights_min = ent_weights.min()
+            if ent_weights_max == ent_weights_min:
+                # 只有一个相似度，则全赋值为1
+                ent_weights[:] = 1.0
+            else:
+                down_edge = global_config["qa"]["params"]["paragraph_node_weight"]
+                # 缩放取值区间至[down_edge, 1]
+                ent_weights = (ent_weights - ent_weights_min) * (1 - down_edge) / (
+                    ent_weights_max - ent_weights_min
                 ) + down_edge
 
         # 取平均相似度的top_k实体
         top_k = global_config["qa"]["params"]["ent_filter_top_k"]
         if len(ent_mean_scores) > top_k:
-            # 从大到小排序，取后len - k个
-            ent_mean_scores = {
-                k: v
-                for k, v in sorted(
-                    ent_mean_scores.items(), key=lambda item: item[1], reverse=True
-                )
-            }
-            for ent_hash, _ in ent_mean_scores.items():
-                # 删除被淘汰的实体节点权重设置
-                del ent_weights[ent_hash]
+            # 按平均相似度从大到小排序（相同时保持出现顺序），淘汰第top_k名之后的实体
+            keep = np.argsort(-ent_mean_scores, kind="stable")[:top_k]
+            keep.sort()
+            ent_ids, ent_weights = ent_ids[keep], ent_weights[keep]
         del top_k, ent_mean_scores
 
-        # 以下部分处理文段权重pg_weights
+        # 以下部分处理文段权重
 
         # 将搜索结果中文段的相似度归一化作为权重
-        pg_sim_scores = {}
-        pg_sim_score_max = 0.0
-        pg_sim_score_min = 1.0
-        for pg_hash, similarity in paragraph_search_result:
-            # 查找最大和最小值
-            pg_sim_score_max = max(pg_sim_score_max, similarity)
-            pg_sim_score_min = min(pg_sim_score_min, similarity)
-            pg_sim_scores[pg_hash] = similarity
-
-        # 归一化
-        for pg_hash, similarity in pg_sim_scores.items():
+        pg_sims = np.asarray(
+            [similarity for _, similarity in paragraph_search_result], dtype=np.float64
+        )
+        pg_sim_score_max = max(pg_sims.max(initial=0.0), 0.0)
+        pg_sim_score_min = min(pg_sims.min(initial=1.0), 1.0)
+        # 仅保留KG中存在的文段
+        pg_keys = []
+        pg_idx = []
+        pg_keep = []
+        for i, (pg_hash, _) in enumerate(paragraph_search_result):
+            idx = node_name2idx_map.get(pg_hash)
+            if idx is not None:
+                pg_keys.append(pg_hash)
+                pg_idx.append(idx)
+                pg_keep.append(i)
+        pg_idx = np.asarray(pg_idx, dtype=np.int64)
+        if pg_sim_score_max == pg_sim_score_min:
+            # 只有一个相似度，则全赋值为1
+            pg_weights = np.ones(len(pg_keep), dtype=np.float64)
+        else:
             # 归一化相似度
-            pg_sim_scores[pg_hash] = (similarity - pg_sim_score_min) / (
+            pg_weights = (pg_sims[pg_keep] - pg_sim_score_min) / (
                 pg_sim_score_max - pg_sim_score_min
             )
-        del pg_sim_score_max, pg_sim_score_min
-
-        for pg_hash, score in pg_sim_scores.items():
-            pg_weights[pg_hash] = (
-                score * global_config["qa"]["params"]["paragraph_node_weight"]
-            )  # 文段权重 = 归一化相似度 * 文段节点权重参数
-        del pg_sim_scores
-
-        # 最终权重数据 = 实体权重 + 文段权重
-        ppr_node_weights = {
-            k: v for d in [ent_weights, pg_weights] for k, v in d.items()
-        }
-        del ent_weights, pg_weights
-
-        # PersonalizedPageRank
-        ppr_res = pagerank.run_pagerank(
-            self.graph,
-            personalization=ppr_node_weights,
-            max_iter=100,
-            alpha=global_config["qa"]["params"]["ppr_damping"],
+        # 文段权重 = 归一化相似度 * 文段节点权重参数
+        pg_weights *= global_config["qa"]["params"]["paragraph_node_weight"]
+        del pg_sims, pg_keep, pg_sim_score_max, pg_sim_score_min
+
+        # 最终权重数据 = 实体权重 + 文段权重（以节点索引为下标的个性化向量）
+        ent_keys = self.symbols.keys(ent_ids)
+        ent_idx = np.fromiter(
+            (node_name2idx_map[ent_key] for ent_key in ent_keys),
+            dtype=np.int64,
+            count=len(ent_keys),
         )
+        # 个性化向量以稀疏形式（种子节点索引与权重）传递，仅幂迭代时构建稠密向量
+        seed_idx = np.concatenate([ent_idx, pg_idx])
+        seed_weight = np.concatenate([ent_weights, pg_weights])
+        # 种子节点的权重（随结果一同返回）
+        ppr_node_weights = dict(
+            zip(ent_keys + pg_keys, ent_weights.tolist() + pg_weights.tolist())
+        )
+        if seed_weight.sum() <= 0:
+            # 没有权重为正的种子节点（如仅命中KG中相似度最低的文段），无法运行PPR
+            logger.warning("PPR种子节点的权重之和为0，将直接使用文段检索结果")
+            return paragraph_search_result, ppr_node_weights
 
-        # 获取最终结果
-        # 从搜索结果中提取文段节点的结果
-        passage_node_res = [
-            (node_key, score)
-            for node_key, score in ppr_res.items()
-            if node_key.startswith(PG_NAMESPACE)
-        ]
-        del ppr_res
-
-        # 排序：按照分数从大到小
-        passage_node_res = sorted(
-            passage_node_res, key=lambda item: item[1], reverse=True
+        # PersonalizedPageRank
+        ppr_top_k = global_config["qa"]["params"]["ppr_top_k"]
+        ppr_damping = global_config["qa"]["params"]["ppr_damping"]
+        ppr_num_threads = global_config["qa"]["params"]["ppr_num_threads"]
+        ppr_method = global_config["qa"]["params"]["ppr_method"]
+        ppr_push_epsilon = global_config["qa"]["params"]["ppr_push_epsilon"]
+        if ppr_method not in ("power", "push"):
+            raise ValueError(f"未知的PPR算法：{ppr_method}")
+        cache_key = self.ppr_cache.signature(
+            seed_idx, seed_weight, ppr_damping, ppr_top_k, ppr_method, ppr_push_epsilon
         )
+        passage_node_res = self.ppr_cache.get(self.graph, cache_key)
+        if passage_node_res is not None:
+            logger.info(f"PPR结果缓存命中：{self.ppr_cache.summary()}")
+        elif ppr_method == "push":
+            # 未命中：前向推送近似PPR（仅访问种子节点附近的邻域，以掩码筛选其中的文段节点）
+            ppr_stats = dict()
+            passage_node_res = pagerank.run_pagerank_push(
+                self.graph,
+                ppr_top_k,
+                (seed_idx, seed_weight),
+                mask=self._get_pg_node_mask(),
+                alpha=ppr_damping,
+                epsilon=ppr_push_epsilon,
+                stats=ppr_stats,
+            )
+            self.ppr_cache.put(self.graph, cache_key, passage_node_res, ppr_stats)
+            logger.info(
+                f"PPR前向推送{ppr_stats['pushes']}次"
+                f"（访问{ppr_stats['touched']}个节点，"
+                f"剩余残差{ppr_stats['residual']:.3e}）：{self.ppr_cache.summary()}"
+            )
+        else:
+            # 未命中：以全局PageRank先验作为初始分数（热启动）
+            init_score = (
+                self.ppr_cache.get_prior(self.graph, ppr_damping, ppr_num_threads)
+                if global_config["qa"]["params"]["ppr_warm_start"]
+                else None
+            )
+            personalization = np.zeros(self.graph.node_array_size, dtype=np.float64)
+            personalization[seed_idx] = seed_weight
+            ppr_stats = dict()
+            # 仅取回得分最高的ppr_top_k个文段节点（候选筛选与排序均在quick_algo中完成）
+            passage_node_res = pagerank.run_pagerank_top_k(
+                self.graph,
+                ppr_top_k,
+                candidates=self._get_pg_node_idx(),
+                init_score=init_score,
+                personalization=personalization,
+                max_iter=100,
+                alpha=ppr_damping,
+                stats=ppr_stats,
+                num_threads=ppr_num_threads,
+            )
+            self.ppr_cache.put(self.graph, cache_key, passage_node_res, ppr_stats)
+            logger.info(
+                f"PPR迭代{ppr_stats['iterations']}次"
+                f"（{'已收敛' if ppr_stats['converged'] else '未收敛'}，"
+                f"残差{ppr_stats['diff']:.3e}）：{self.ppr_cache.summary()}"
+            )
 
         return passage_node_res, ppr_node_weights
@@ -27,6 +27,7 @@ class MemoryManager:
             llm_client_list[key] = LLMClient(
                 global_config["llm_providers"][key]["base_url"],
                 global_config["llm_providers"][key]["api_key"],
+                global_config["llm_providers"][key]["max_concurrent_requests"],
             )
             print(llm_client_list[key])
 
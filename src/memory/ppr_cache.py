@@ -0,0 +1,160 @@
+from collections import OrderedDict
+import threading
+from typing import Hashable, List, Tuple
+
+import numpy as np
+from quick_algo import di_graph, pagerank
+
+
+class PPRCache:
+    """个性化PageRank结果缓存
+
+    - 以量化后的个性化向量（种子节点索引与归一化权重）作为签名，种子相同、权重相近的查询复用同一结果
+    - 缓存与图结构版本绑定，图发生变化后全部失效
+    - 同时提供全局PageRank先验（非个性化的PageRank结果），作为未命中时PPR迭代的初始分数（热启动）
+    """
+
+    def __init__(self, max_size: int, quantization: float):
+        """
+        Args:
+            max_size: 最多缓存的结果数（为0时不缓存）
+            quantization: 个性化权重的量化步长（权重差异小于该值的查询视为相同）
+        """
+        self.max_size = max_size
+        self.quantization = quantization
+
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        # 缓存对应的图结构版本
+        self._graph_version = None
+        # 全局PageRank先验：阻尼系数 -> 以节点索引为下标的分数数组
+        self._priors = dict()
+
+        # 统计信息
+        self.hits = 0
+        self.misses = 0
+        self.total_iterations = 0
+        self.unconverged = 0
+        # 前向推送（近似PPR）的统计信息
+        self.push_runs = 0
+        self.total_pushes = 0
+
+    def _check_version(self, graph: di_graph.DiGraph) -> None:
+        """图结构变化后清空缓存与先验（须持有锁）"""
+        if self._graph_version != graph.version:
+            self._cache.clear()
+            self._priors.clear()
+            self._graph_version = graph.version
+
+    def signature(
+        self, seed_idx: np.ndarray, seed_weight: np.ndarray, *params: Hashable
+    ) -> Hashable:
+        """计算个性化向量的签名
+
+        Args:
+            seed_idx: 种子节点索引（个性化向量的稀疏形式，索引不重复）
+            seed_weight: 对应的个性化权重
+            params: 其他影响结果的参数（如阻尼系数、返回的节点数）
+        """
+        order = np.argsort(seed_idx, kind="stable")
+        nonzero = seed_weight[order] != 0
+        seed_idx = seed_idx[order][nonzero]
+        weights = seed_weight[order][nonzero]
+        quantized = np.rint(weights / (weights.sum() * self.quantization)).astype(
+            np.int64
+        )
+        return seed_idx.tobytes(), quantized.tobytes(), params
+
+    def get(
+        self, graph: di_graph.DiGraph, key: Hashable
+    ) -> List[Tuple[str, float]] | None:
+        """查询缓存（未命中时返回None）"""
+        with self._lock:
+            self._check_version(graph)
+            result = self._cache.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(
+        self,
+        graph: di_graph.DiGraph,
+        key: Hashable,
+        result: List[Tuple[str, float]],
+        stats: dict,
+    ) -> None:
+        """写入缓存，并记录本次PPR的统计信息
+
+        Args:
+            graph: 计算结果时使用的图
+            key: 签名
+            result: PPR结果
+            stats: quick_algo返回的统计信息（幂迭代的迭代统计信息，或前向推送的推送统计信息）
+        """
+        with self._lock:
+            if "pushes" in stats:
+                self.push_runs += 1
+                self.total_pushes += stats["pushes"]
+            else:
+                self.total_iterations += stats["iterations"]
+                if not stats["converged"]:
+                    self.unconverged += 1
+            if self.max_size <= 0 or self._graph_version != graph.version:
+                # 计算期间图已发生变化，结果不再有效
+                return
+            self._cache[key] = result
+            if len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def get_prior(
+        self, graph: di_graph.DiGraph, alpha: float, num_threads: int = 0
+    ) -> np.ndarray:
+        """获取全局PageRank先验（按需计算，图结构变化后重新计算）
+
+        Args:
+            graph: 图
+            alpha: 阻尼系数
+            num_threads: PageRank计算线程数（为0时使用OpenMP默认值）
+        """
+        with self._lock:
+            self._check_version(graph)
+            prior = self._priors.get(alpha)
+            if prior is not None:
+                return prior
+            version = graph.version
+        pr_res = pagerank.run_pagerank(
+            graph, alpha=alpha, max_iter=100, num_threads=num_threads
+        )
+        prior = np.zeros(graph.node_array_size, dtype=np.float64)
+        prior[
+            np.fromiter(
+                graph.node_name2idx_map.values(), dtype=np.int64, count=len(pr_res)
+            )
+        ] = np.fromiter(pr_res.values(), dtype=np.float64, count=len(pr_res))
+        with self._lock:
+            if self._graph_version == version:
+                self._priors[alpha] = prior
+        return prior
+
+    def summary(self) -> str:
+        """统计信息摘要"""
+        total = self.hits + self.misses
+        power_runs = self.misses - self.push_runs
+        avg_iterations = self.total_iterations / power_runs if power_runs > 0 else 0.0
+        summary = (
+            f"缓存命中{self.hits}/{total}次，"
+            f"PPR平均迭代{avg_iterations:.1f}次（未收敛{self.unconverged}次）"
+        )
+        if self.push_runs:
+            summary += f"，前向推送平均{self.total_pushes / self.push_runs:.0f}次"
+        return summary
+
+    def clear(self) -> None:
+        """清空缓存（不重置统计信息）"""
+        with self._lock:
+            self._cache.clear()
+            self._priors.clear()
+            self._graph_version = None
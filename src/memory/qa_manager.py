@@ -1,8 +1,11 @@
 import time
 from typing import Tuple, List, Dict
 
+import numpy as np
+
 from src.utils.global_logger import logger
 from src.utils import prompt_template
+from .embedding_cache import get_query_embedding_cache
 from .embedding_store import EmbeddingManager
 from src.utils.llm_client import LLMClient
 from .kg_manager import KGManager
@@ -27,6 +30,29 @@ class QAManager:
             "qa": llm_client_qa,
         }
 
+    def _get_question_embedding(self, question: str) -> List[float] | np.ndarray:
+        """获取问题的Embedding（优先使用进程内共享的查询嵌入缓存）"""
+        model = global_config["embedding"]["model"]
+        query_cache = get_query_embedding_cache()
+        if query_cache is None:
+            return self.llm_client_list["embedding"].send_embedding_request(
+                model, question
+            )
+        embedding = query_cache.get(
+            model,
+            global_config["embedding"]["dimension"],
+            question,
+            lambda text: self.llm_client_list["embedding"].send_embedding_request(
+                model, text
+            ),
+        )
+        cache_stats = query_cache.stats()
+        logger.debug(
+            f"查询嵌入缓存：命中{cache_stats['hits']}次，持久化缓存命中{cache_stats['disk_hits']}次，"
+            f"未命中{cache_stats['misses']}次，命中率{cache_stats['hit_rate'] * 100:.2f}%"
+        )
+        return embedding
+
     def process_query(
         self, question: str
     ) -> Tuple[List[Tuple[str, float, float]], Dict[str, float] | None]:
@@ -34,9 +60,7 @@ class QAManager:
 
         # 生成问题的Embedding
         part_start_time = time.perf_counter()
-        question_embedding = self.llm_client_list["embedding"].send_embedding_request(
-            global_config["embedding"]["model"], question
-        )
+        question_embedding = self._get_question_embedding(question)
         part_end_time = time.perf_counter()
         logger.debug(f"Embedding用时：{part_end_time - part_start_time:.5f}s")
 
@@ -62,15 +86,13 @@ class QAManager:
         relations = []  # 用于存储提取的三元组
 
         for res in relation_search_res:
-            rel_str = self.embed_manager.relation_embedding_store.store.get(res[0]).str
-            logger.info(f"找到相关关系，相似度：{(res[1] * 100):.2f}%  -  {rel_str}")
-            # 提取三元组（假设格式始终为形如 ('主体', '关系', '客体') 的字符串）
-            try:
-                triple = eval(rel_str)
-                if isinstance(triple, tuple) and len(triple) == 3:
-                    relations.append(triple)
-            except Exception as e:
-                logger.error(f"⚠️ 三元组解析失败：{rel_str}，错误：{e}")
+            # 三元组（主体, 关系, 客体）由关系库按列保存，无需解析字符串
+            triple = self.embed_manager.relation_embedding_store.get_triple(res[0])
+            if triple is None:
+                logger.error(f"⚠️ 三元组解析失败：{res[0]}")
+                continue
+            logger.info(f"找到相关关系，相似度：{(res[1] * 100):.2f}%  -  {triple}")
+            relations.append(triple)
 
         # 根据问题Embedding查询Paragraph Embedding库
         part_start_time = time.perf_counter()
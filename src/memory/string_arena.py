@@ -0,0 +1,198 @@
+from collections import OrderedDict
+import os
+import threading
+from typing import List
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from src.utils.global_logger import logger
+
+# 支持的压缩方式
+COMPRESSIONS = ("none", "zstd")
+
+# 块的编码方式
+_CODEC_RAW = 0
+_CODEC_ZSTD = 1
+
+# 索引文件中每行字符串对应的记录
+_RECORD_DTYPE = np.dtype(
+    [
+        ("block_offset", "<u8"),  # 所在块在数据文件中的偏移
+        ("block_size", "<u4"),  # 所在块（压缩后）的字节数
+        ("offset", "<u4"),  # 字符串在（解压后的）块内的偏移
+        ("length", "<u4"),  # 字符串的UTF-8字节数
+        ("codec", "u1"),  # 块的编码方式
+    ]
+)
+
+# 解压后的块的缓存数量
+_BLOCK_CACHE_SIZE = 64
+
+
+class StringArena:
+    """基于mmap的只追加字符串存储
+
+    字符串以UTF-8编码依次写入数据文件，索引文件记录每行字符串所在的位置；
+    读取时通过mmap按需解码，不将全部文本载入内存。
+    启用zstd压缩时，每block_size个字符串压缩为一个块，读取时解压整个块（并缓存最近使用的块）；
+    未压缩时每个字符串单独成块，直接从数据文件中切片读取
+    """
+
+    def __init__(
+        self,
+        data_file_path: str,
+        index_file_path: str,
+        compression: str = "none",
+        block_size: int = 64,
+    ):
+        if compression not in COMPRESSIONS:
+            raise ValueError(
+                f"不支持的压缩方式：{compression}（可选：{'/'.join(COMPRESSIONS)}）"
+            )
+        if compression == "zstd" and zstandard is None:
+            logger.warning("未安装zstandard库，文本存储将不进行压缩")
+            compression = "none"
+        self.data_file_path = data_file_path
+        self.index_file_path = index_file_path
+        self.compression = compression
+        self.block_size = block_size
+
+        self._lock = threading.Lock()
+        self._block_cache = OrderedDict()
+        self._data = None
+        self._records = np.empty(0, dtype=_RECORD_DTYPE)
+
+        for file_path in (data_file_path, index_file_path):
+            if not os.path.exists(file_path):
+                open(file_path, "wb").close()
+        self._remap()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __getitem__(self, row: int) -> str:
+        record = self._records[row]
+        block_offset = int(record["block_offset"])
+        if record["codec"] == _CODEC_RAW:
+            start = block_offset + int(record["offset"])
+            return (
+                self._data[start : start + int(record["length"])]
+                .tobytes()
+                .decode("utf-8")
+            )
+        block = self._get_block(block_offset, int(record["block_size"]))
+        start = int(record["offset"])
+        return block[start : start + int(record["length"])].decode("utf-8")
+
+    def get_many(self, start: int, end: int) -> List[str]:
+        """读取[start, end)行的字符串"""
+        return [self[row] for row in range(start, end)]
+
+    def _remap(self) -> None:
+        """重新映射文件（文件内容变化后调用）"""
+        data_size = os.path.getsize(self.data_file_path)
+        index_size = os.path.getsize(self.index_file_path)
+        # 空文件无法映射
+        self._data = (
+            np.memmap(self.data_file_path, dtype=np.uint8, mode="r")
+            if data_size > 0
+            else np.empty(0, dtype=np.uint8)
+        )
+        self._records = (
+            np.memmap(
+                self.index_file_path,
+                dtype=_RECORD_DTYPE,
+                mode="r",
+                shape=(index_size // _RECORD_DTYPE.itemsize,),
+            )
+            if index_size >= _RECORD_DTYPE.itemsize
+            else np.empty(0, dtype=_RECORD_DTYPE)
+        )
+
+    def _get_block(self, block_offset: int, block_size: int) -> bytes:
+        """获取解压后的块（带LRU缓存）"""
+        if zstandard is None:
+            raise ImportError(
+                f"文本存储{self.data_file_path}中存在zstd压缩的数据，读取需要安装zstandard库"
+            )
+        with self._lock:
+            block = self._block_cache.get(block_offset)
+            if block is not None:
+                self._block_cache.move_to_end(block_offset)
+                return block
+        block = zstandard.ZstdDecompressor().decompress(
+            self._data[block_offset : block_offset + block_size].tobytes()
+        )
+        with self._lock:
+            self._block_cache[block_offset] = block
+            if len(self._block_cache) > _BLOCK_CACHE_SIZE:
+                self._block_cache.popitem(last=False)
+        return block
+
+    def truncate(self, rows: int) -> None:
+        """截断至前rows行（丢弃未被清单文件记录的数据，如保存过程中中断写入的部分）"""
+        if rows > len(self):
+            raise Exception(f"文本存储仅有{len(self)}行，无法截断至{rows}行")
+        # 即使行数一致也执行截断：清除中断写入的不完整记录与多余数据
+        data_size = 0
+        if rows > 0:
+            last = self._records[rows - 1]
+            data_size = int(last["block_offset"]) + int(last["block_size"])
+        with self._lock:
+            self._data = None
+            self._records = None
+            self._block_cache.clear()
+            os.truncate(self.index_file_path, rows * _RECORD_DTYPE.itemsize)
+            os.truncate(self.data_file_path, data_size)
+            self._remap()
+
+    def append(self, strs: List[str]) -> None:
+        """追加字符串"""
+        if len(strs) == 0:
+            return
+        data_offset = os.path.getsize(self.data_file_path)
+        records = np.zeros(len(strs), dtype=_RECORD_DTYPE)
+        chunks = []
+        if self.compression == "zstd":
+            compressor = zstandard.ZstdCompressor()
+            for block_start in range(0, len(strs), self.block_size):
+                encoded = [
+                    s.encode("utf-8")
+                    for s in strs[block_start : block_start + self.block_size]
+                ]
+                block = compressor.compress(b"".join(encoded))
+                offset = 0
+                for i, data in enumerate(encoded, start=block_start):
+                    records[i] = (
+                        data_offset,
+                        len(block),
+                        offset,
+                        len(data),
+                        _CODEC_ZSTD,
+                    )
+                    offset += len(data)
+                chunks.append(block)
+                data_offset += len(block)
+        else:
+            for i, s in enumerate(strs):
+                data = s.encode("utf-8")
+                records[i] = (data_offset, len(data), 0, len(data), _CODEC_RAW)
+                chunks.append(data)
+                data_offset += len(data)
+
+        with self._lock:
+            # 先写数据再写索引，中断时索引不会指向不完整的数据
+            with open(self.data_file_path, "ab") as f:
+                f.write(b"".join(chunks))
+            with open(self.index_file_path, "ab") as f:
+                f.write(records.tobytes())
+            self._remap()
+
+    def reset(self) -> None:
+        """清空存储"""
+        self.truncate(0)
@@ -0,0 +1,111 @@
+import threading
+from typing import Dict, Iterable, List
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .utils.hash import get_sha256
+from src.utils.config import ENT_NAMESPACE, PG_NAMESPACE
+
+
+class SymbolTable:
+    """KG节点的符号表：为每个节点key（如entity-<sha256>）分配稳定的整数id
+
+    - id按加入顺序分配且不会复用，随KG一同持久化
+    - 实体文本到id的映射会被缓存，同一实体只计算一次SHA256
+    - 每个key在表中只保存一个字符串对象，图与计数表通过id取用同一对象，不重复占用内存
+    """
+
+    def __init__(self):
+        self._keys: List[str] = []
+        # 实体节点对应的文本（其他节点为None）
+        self._texts: List[str | None] = []
+        self._key2id: Dict[str, int] = dict()
+        self._text2id: Dict[str, int] = dict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._key2id
+
+    def intern(self, key: str, text: str | None = None) -> int:
+        """获取key对应的id（不存在时分配新id）"""
+        symbol_id = self._key2id.get(key)
+        if symbol_id is None:
+            with self._lock:
+                symbol_id = self._key2id.get(key)
+                if symbol_id is None:
+                    symbol_id = len(self._keys)
+                    self._keys.append(key)
+                    self._texts.append(text)
+                    self._key2id[key] = symbol_id
+        if text is not None and self._texts[symbol_id] is None:
+            self._texts[symbol_id] = text
+            self._text2id[text] = symbol_id
+        return symbol_id
+
+    def entity_id(self, text: str) -> int:
+        """获取实体文本对应的id"""
+        symbol_id = self._text2id.get(text)
+        if symbol_id is None:
+            symbol_id = self.intern(ENT_NAMESPACE + "-" + get_sha256(text), text)
+        return symbol_id
+
+    def paragraph_id(self, pg_hash: str) -> int:
+        """获取段落hash对应的id"""
+        return self.intern(PG_NAMESPACE + "-" + pg_hash)
+
+    def get_id(self, key: str) -> int | None:
+        """获取key对应的id（不存在时返回None）"""
+        return self._key2id.get(key)
+
+    def key(self, symbol_id: int) -> str:
+        """获取id对应的key"""
+        return self._keys[symbol_id]
+
+    def keys(self, symbol_ids: Iterable[int]) -> List[str]:
+        """批量获取id对应的key"""
+        return [self._keys[symbol_id] for symbol_id in symbol_ids]
+
+    def save_to_file(self, file_path: str) -> None:
+        """保存符号表（第i行对应id为i的节点）"""
+        table = pa.table(
+            {
+                "key": pa.array(self._keys, type=pa.string()),
+                "text": pa.array(self._texts, type=pa.string()),
+            }
+        )
+        pq.write_table(table, file_path)
+
+    def load_from_file(
+        self, file_path: str, canonical_keys: Iterable[str] | None = None
+    ) -> None:
+        """加载符号表
+
+        Args:
+            file_path: 符号表文件路径
+            canonical_keys: 已在内存中的key字符串（如图的节点列表），表中相等的key改为引用这些对象
+        """
+        table = pq.read_table(file_path)
+        keys = table.column("key").to_pylist()
+        if canonical_keys is not None:
+            canonical = {key: key for key in canonical_keys}
+            keys = [canonical.get(key, key) for key in keys]
+        self.clear()
+        self._keys = keys
+        self._texts = table.column("text").to_pylist()
+        self._key2id = {key: symbol_id for symbol_id, key in enumerate(keys)}
+        self._text2id = {
+            text: symbol_id
+            for symbol_id, text in enumerate(self._texts)
+            if text is not None
+        }
+
+    def clear(self) -> None:
+        """清空符号表"""
+        self._keys = []
+        self._texts = []
+        self._key2id = dict()
+        self._text2id = dict()
@@ -0,0 +1,133 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+import time
+from typing import Dict, List, Tuple
+
+import faiss
+import numpy as np
+
+from .embedding_store import EmbeddingStore
+from .symbol_table import SymbolTable
+from src.utils.global_logger import logger
+
+
+def _search_chunk(
+    ent_store: EmbeddingStore,
+    ent_hashes: List[str],
+    threshold: float,
+    top_k: int,
+    omp_threads: int,
+) -> List[List[Tuple[str, float]]]:
+    """对一批实体执行范围检索，返回每个实体的同义实体列表（按相似度降序）"""
+    # omp_set_num_threads仅作用于调用线程，避免各工作线程的Faiss并行区叠加后超额占用CPU
+    faiss.omp_set_num_threads(omp_threads)
+    matrix = ent_store.matrix
+    rows = [matrix.hash2row[ent_hash] for ent_hash in ent_hashes]
+    lims, res_hashes, similarities = ent_store.range_search(
+        matrix.get_vectors(rows), threshold
+    )
+    res_hashes = res_hashes.tolist()
+    similarities = similarities.tolist()
+
+    results = []
+    for i, ent_hash in enumerate(ent_hashes):
+        # 与TopK检索的语义保持一致：仅考虑相似度最高的top_k项（包含实体自身）
+        start = int(lims[i])
+        end = min(int(lims[i + 1]), start + top_k)
+        results.append(
+            [
+                (res_hashes[j], similarities[j])
+                for j in range(start, end)
+                if res_hashes[j] != ent_hash  # 避免自连接
+            ]
+        )
+    return results
+
+
+def link_synonyms(
+    node_to_node: Dict[Tuple[int, int], float],
+    ent_ids: List[int],
+    symbols: SymbolTable,
+    ent_store: EmbeddingStore,
+    threshold: float,
+    top_k: int,
+    batch_size: int = 1024,
+    max_workers: int = 4,
+    verbose: bool = False,
+) -> int:
+    """为实体建立同义词连接
+
+    仅以给定的（新增）实体为查询，在完整的实体索引上执行范围检索（相似度不低于threshold），
+    查询按batch_size分批提交至线程池并行执行；检索结果按实体顺序依次合并，
+    已作为其他实体的同义词被连接的实体不再扩展，因此结果与执行顺序无关
+
+    Args:
+        node_to_node: 边权重字典（以节点id为key，同义连接以双向边写入）
+        ent_ids: 待连接的实体id列表（须已存入实体嵌入库）
+        symbols: KG节点符号表
+        ent_store: 实体嵌入库
+        threshold: 同义词相似度阈值
+        top_k: 每个实体最多考虑的相似实体数（包含实体自身）
+        batch_size: 每批查询的实体数
+        max_workers: 并行检索的线程数
+        verbose: 是否逐个输出实体的同义实体（否则仅输出汇总信息）
+
+    Returns:
+        new_edge_cnt: 新增的同义连接数
+    """
+    if len(ent_ids) == 0:
+        return 0
+    start_time = time.perf_counter()
+
+    ent_hashes = symbols.keys(ent_ids)
+    chunks = [
+        ent_hashes[i : i + batch_size] for i in range(0, len(ent_hashes), batch_size)
+    ]
+    max_workers = max(1, min(max_workers, len(chunks)))
+    omp_threads = max(1, (os.cpu_count() or 1) // max_workers)
+    if max_workers == 1:
+        chunk_results = [
+            _search_chunk(ent_store, chunk, threshold, top_k, omp_threads)
+            for chunk in chunks
+        ]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            chunk_results = list(
+                executor.map(
+                    lambda chunk: _search_chunk(
+                        ent_store, chunk, threshold, top_k, omp_threads
+                    ),
+                    chunks,
+                )
+            )
+
+    # 按实体顺序合并检索结果
+    new_edge_cnt = 0
+    linked_ent_cnt = 0
+    synonym_id_set = set()
+    for ent_id, synonyms in zip(
+        ent_ids, (synonyms for results in chunk_results for synonyms in results)
+    ):
+        if ent_id in synonym_id_set or len(synonyms) == 0:
+            # 避免同一批次内重复添加
+            continue
+        for res_ent_hash, similarity in synonyms:
+            res_ent_id = symbols.intern(res_ent_hash)
+            node_to_node[(res_ent_id, ent_id)] = similarity
+            node_to_node[(ent_id, res_ent_id)] = similarity
+            synonym_id_set.add(res_ent_id)
+        new_edge_cnt += len(synonyms)
+        linked_ent_cnt += 1
+        if verbose:
+            res_ent = [
+                (ent_store.store[res_ent_hash].str, similarity)
+                for res_ent_hash, similarity in synonyms
+            ]
+            ent_str = ent_store.store[symbols.key(ent_id)].str
+            print(f'"{ent_str}"的相似实体为：{res_ent}')
+
+    logger.info(
+        f"近义词扩展链接：检索{len(ent_hashes)}个实体，其中{linked_ent_cnt}个实体"
+        f"新增{new_edge_cnt}条同义连接，耗时{time.perf_counter() - start_time:.2f}s"
+    )
+    return new_edge_cnt
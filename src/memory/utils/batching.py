@@ -0,0 +1,47 @@
+from typing import List
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估计文本的token数
+
+    不依赖具体的tokenizer：非ASCII字符（如中文）按每字1个token计，
+    ASCII字符按每4个字符1个token计
+    """
+    non_ascii_cnt = sum(1 for c in text if ord(c) > 127)
+    ascii_cnt = len(text) - non_ascii_cnt
+    return non_ascii_cnt + (ascii_cnt + 3) // 4
+
+
+def pack_embedding_batches(
+    texts: List[str], batch_size: int, max_batch_tokens: int
+) -> List[List[int]]:
+    """将待嵌入的文本打包为若干批次
+
+    每个批次的文本数不超过batch_size，估计token总数不超过max_batch_tokens
+    （单条文本超出预算时单独成批）
+
+    Args:
+        texts: 待嵌入的文本列表
+        batch_size: 每批次的最大文本数
+        max_batch_tokens: 每批次的最大token预算
+
+    Returns:
+        batches: 批次列表，每个批次为texts中的下标列表（保持原顺序）
+    """
+    batches = []
+    batch = []
+    batch_tokens = 0
+    for idx, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if len(batch) > 0 and (
+            len(batch) >= batch_size or batch_tokens + tokens > max_batch_tokens
+        ):
+            batches.append(batch)
+            batch = []
+            batch_tokens = 0
+        batch.append(idx)
+        batch_tokens += tokens
+    if len(batch) > 0:
+        batches.append(batch)
+
+    return batches
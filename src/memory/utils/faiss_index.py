@@ -0,0 +1,168 @@
+import math
+
+import faiss
+import numpy as np
+
+# 支持的索引类型
+INDEX_TYPES = ("flat", "hnsw", "ivf_flat", "ivf_pq")
+
+# 向量存储类型对应的Faiss标量量化类型（float32不量化）
+_SQ_TYPES = {
+    "float16": faiss.ScalarQuantizer.QT_fp16,
+    "int8": faiss.ScalarQuantizer.QT_8bit,
+}
+# int8量化时在训练数据的取值范围外预留的余量（相对于范围宽度），容纳增量添加的向量
+_SQ_RANGE_MARGIN = 0.05
+
+
+def resolve_index_type(index_type: str, num_vectors: int, params: dict) -> str:
+    """确定实际使用的索引类型：数据量低于阈值时回退至flat（精确检索）"""
+    if index_type not in INDEX_TYPES:
+        raise ValueError(
+            f"不支持的索引类型：{index_type}（可选：{'/'.join(INDEX_TYPES)}）"
+        )
+    if num_vectors < params["min_ann_size"]:
+        return "flat"
+    return index_type
+
+
+def get_index_type(index: faiss.Index) -> str:
+    """获取索引对象对应的索引类型"""
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivf_pq"
+    if isinstance(index, (faiss.IndexIVFFlat, faiss.IndexIVFScalarQuantizer)):
+        return "ivf_flat"
+    if isinstance(index, (faiss.IndexFlat, faiss.IndexScalarQuantizer)):
+        return "flat"
+    raise ValueError(f"未知的索引类型：{type(index).__name__}")
+
+
+def get_index_storage_dtype(index: faiss.Index) -> str | None:
+    """获取索引中向量的存储类型（float32/float16/int8；PQ编码的索引返回None）"""
+    if isinstance(index, faiss.IndexIVFPQ):
+        return None
+    if isinstance(index, faiss.IndexHNSW):
+        index = faiss.downcast_index(index.storage)
+    if isinstance(index, (faiss.IndexScalarQuantizer, faiss.IndexIVFScalarQuantizer)):
+        for storage_dtype, qtype in _SQ_TYPES.items():
+            if index.sq.qtype == qtype:
+                return storage_dtype
+        raise ValueError(f"未知的标量量化类型：{index.sq.qtype}")
+    return "float32"
+
+
+def expected_storage_dtype(index_type: str, storage_dtype: str) -> str | None:
+    """索引类型与向量存储类型对应的索引存储类型（ivf_pq自带PQ编码，不受存储类型影响）"""
+    return None if index_type == "ivf_pq" else storage_dtype
+
+
+def _get_nlist(num_vectors: int, params: dict) -> int:
+    """IVF聚类中心数：未指定时取约4*sqrt(N)，并保证每个中心至少有39个训练样本"""
+    nlist = params["ivf_nlist"]
+    if nlist <= 0:
+        nlist = int(4 * math.sqrt(num_vectors))
+    return max(1, min(nlist, num_vectors // 39))
+
+
+def create_faiss_index(
+    index_type: str,
+    dimension: int,
+    train_vectors: np.ndarray,
+    params: dict,
+    storage_dtype: str = "float32",
+) -> faiss.Index:
+    """创建以内积（对归一化向量即余弦相似度）为度量的Faiss索引，必要时完成训练
+
+    Args:
+        index_type: 索引类型（应已经过resolve_index_type处理）
+        dimension: 向量维度
+        train_vectors: 训练数据（已L2归一化）
+        params: 索引参数（[embedding.index]配置）
+        storage_dtype: 索引中向量的存储类型（float16/int8时使用标量量化，ivf_pq不受影响）
+
+    Returns:
+        index: 尚未添加数据的索引
+    """
+    sq_type = _SQ_TYPES.get(storage_dtype)
+    if index_type == "flat":
+        if sq_type is None:
+            index = faiss.IndexFlatIP(dimension)
+        else:
+            index = faiss.IndexScalarQuantizer(
+                dimension, sq_type, faiss.METRIC_INNER_PRODUCT
+            )
+    elif index_type == "hnsw":
+        if sq_type is None:
+            index = faiss.IndexHNSWFlat(
+                dimension, params["hnsw_m"], faiss.METRIC_INNER_PRODUCT
+            )
+        else:
+            index = faiss.IndexHNSWSQ(
+                dimension, sq_type, params["hnsw_m"], faiss.METRIC_INNER_PRODUCT
+            )
+        index.hnsw.efConstruction = params["hnsw_ef_construction"]
+    elif index_type == "ivf_flat":
+        quantizer = faiss.IndexFlatIP(dimension)
+        if sq_type is None:
+            index = faiss.IndexIVFFlat(
+                quantizer,
+                dimension,
+                _get_nlist(len(train_vectors), params),
+                faiss.METRIC_INNER_PRODUCT,
+            )
+        else:
+            index = faiss.IndexIVFScalarQuantizer(
+                quantizer,
+                dimension,
+                _get_nlist(len(train_vectors), params),
+                sq_type,
+                faiss.METRIC_INNER_PRODUCT,
+            )
+    elif index_type == "ivf_pq":
+        if dimension % params["pq_m"] != 0:
+            raise ValueError(f"pq_m（{params['pq_m']}）须整除嵌入维度（{dimension}）")
+        quantizer = faiss.IndexFlatIP(dimension)
+        index = faiss.IndexIVFPQ(
+            quantizer,
+            dimension,
+            _get_nlist(len(train_vectors), params),
+            params["pq_m"],
+            params["pq_nbits"],
+            faiss.METRIC_INNER_PRODUCT,
+        )
+    else:
+        raise ValueError(f"不支持的索引类型：{index_type}")
+
+    if not index.is_trained:
+        _train_index(index, dimension, train_vectors)
+    apply_search_params(index, params)
+    return index
+
+
+def _train_index(index: faiss.Index, dimension: int, train_vectors: np.ndarray) -> None:
+    """训练索引（IVF聚类中心与int8量化的取值范围）"""
+    if isinstance(index, faiss.IndexHNSW):
+        sq = faiss.downcast_index(index.storage).sq
+    elif isinstance(index, (faiss.IndexScalarQuantizer, faiss.IndexIVFScalarQuantizer)):
+        sq = index.sq
+    else:
+        sq = None
+    if sq is not None:
+        sq.rangestat_arg = _SQ_RANGE_MARGIN
+    if len(train_vectors) == 0:
+        # 无训练数据（空库）：以单位向量各分量的取值范围[-1, 1]训练
+        train_vectors = np.vstack(
+            [-np.ones((1, dimension), np.float32), np.ones((1, dimension), np.float32)]
+        )
+    index.train(train_vectors)
+
+
+def apply_search_params(index: faiss.Index, params: dict) -> None:
+    """设置检索参数（nprobe/efSearch不影响索引内容，加载索引后需重新设置）"""
+    index_type = get_index_type(index)
+    if index_type == "hnsw":
+        index.hnsw.efSearch = params["hnsw_ef_search"]
+    elif index_type in ("ivf_flat", "ivf_pq"):
+        index.nprobe = params["ivf_nprobe"]
@@ -0,0 +1,96 @@
+"""向量存储类型（float32/float16/int8）的内存、检索延迟与召回率对比
+
+用法：python -m src.memory.utils.quant_bench [--num 50000] [--dim 1024] [--queries 200] [--k 10]
+         [--parquet 嵌入库parquet文件]（指定时使用真实数据，否则使用随机生成的聚簇数据）
+"""
+
+import argparse
+import time
+
+import faiss
+import numpy as np
+import pyarrow.parquet as pq
+
+from ..embedding_matrix import STORAGE_DTYPES, EmbeddingMatrix
+from .faiss_index import create_faiss_index
+
+_FLAT_PARAMS = {"min_ann_size": 0}
+
+
+def _load_vectors(args) -> np.ndarray:
+    """加载测试向量（已L2归一化）"""
+    if args.parquet is not None:
+        table = pq.read_table(args.parquet, columns=["embedding"])
+        vectors = (
+            table.column("embedding")
+            .combine_chunks()
+            .flatten()
+            .to_numpy(zero_copy_only=False)
+            .reshape(len(table), -1)
+            .astype(np.float32)
+        )
+    else:
+        rng = np.random.default_rng(0)
+        centers = rng.standard_normal((args.num // 50 + 1, args.dim))
+        vectors = centers[rng.integers(0, len(centers), args.num)]
+        vectors = (vectors + 0.5 * rng.standard_normal(vectors.shape)).astype(
+            np.float32
+        )
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--num", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--parquet", type=str, default=None)
+    args = parser.parse_args()
+
+    vectors = _load_vectors(args)
+    num, dim = vectors.shape
+    queries = vectors[np.linspace(0, num - 1, args.queries, dtype=np.int64)]
+    item_hashes = np.arange(num).astype(str)
+
+    truth_idx = None
+    print(f"数据量：{num}，维度：{dim}，查询数：{len(queries)}，k={args.k}")
+    print("存储类型   矩阵(MB)  索引(MB)  单次检索(ms)  Recall@k  相似度最大误差")
+    for storage_dtype in STORAGE_DTYPES:
+        matrix = EmbeddingMatrix(dim, num, storage_dtype)
+        matrix.append(item_hashes, item_hashes, vectors, normalized=True)
+        index = create_faiss_index(
+            "flat", dim, matrix.vectors, _FLAT_PARAMS, storage_dtype
+        )
+        index.add(matrix.vectors)
+
+        start = time.perf_counter()
+        for query in queries:
+            sim, idx = index.search(query.reshape(1, -1), args.k)
+        latency = (time.perf_counter() - start) / len(queries) * 1000
+        sim, idx = index.search(queries, args.k)
+        if truth_idx is None:
+            # float32（精确检索）的结果作为基准
+            truth_idx = idx
+
+        recall = np.mean(
+            [
+                len(set(a) & set(b)) / args.k
+                for a, b in zip(idx.tolist(), truth_idx.tolist())
+            ]
+        )
+        # 以精确向量计算的相似度为基准，衡量索引返回的相似度误差
+        exact_sim = np.einsum("qd,qkd->qk", queries, vectors[idx])
+        print(
+            f"{storage_dtype:<9}"
+            f"{matrix.nbytes / 1024 / 1024:>10.1f}"
+            f"{len(faiss.serialize_index(index)) / 1024 / 1024:>10.1f}"
+            f"{latency:>14.3f}"
+            f"{recall:>10.4f}"
+            f"{np.abs(sim - exact_sim).max():>16.5f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ REL_NAMESPACE = "relation"
 RAG_GRAPH_NAMESPACE = "rag-graph"
 RAG_ENT_CNT_NAMESPACE = "rag-ent-cnt"
 RAG_PG_HASH_NAMESPACE = "rag-pg-hash"
+RAG_SYMBOL_NAMESPACE = "rag-symbol"
 
 # 无效实体
 INVALID_ENTITY = [
@@ -25,6 +26,15 @@ INVALID_ENTITY = [
 ]
 
 
+def _merge_config(config, file_config):
+    """将配置文件中的配置项递归地合并至config（仅覆盖文件中存在的项）"""
+    for key, value in file_config.items():
+        if isinstance(value, dict) and isinstance(config.get(key), dict):
+            _merge_config(config[key], value)
+        else:
+            config[key] = value
+
+
 def _load_config(config, config_file_path):
     """读取TOML格式的配置文件"""
     if not os.path.exists(config_file_path):
@@ -38,27 +48,22 @@ def _load_config(config, config_file_path):
                 config["llm_providers"][provider["name"]] = dict()
             config["llm_providers"][provider["name"]]["base_url"] = provider["base_url"]
             config["llm_providers"][provider["name"]]["api_key"] = provider["api_key"]
-
-    if "entity_extract" in file_config:
-        config["entity_extract"] = file_config["entity_extract"]
-
-    if "rdf_build" in file_config:
-        config["rdf_build"] = file_config["rdf_build"]
-
-    if "embedding" in file_config:
-        config["embedding"] = file_config["embedding"]
-
-    if "rag" in file_config:
-        config["rag"] = file_config["rag"]
-
-    if "qa" in file_config:
-        config["qa"] = file_config["qa"]
-
-    if "director" in file_config:
-        config["director"] = file_config["director"]
-        
-    if "persistence" in file_config:
-        config["persistence"] = file_config["persistence"]
+            config["llm_providers"][provider["name"]]["max_concurrent_requests"] = (
+                provider.get("max_concurrent_requests", 4)
+            )
+
+    # 其余配置项合并至默认配置：配置文件中缺少的项（如旧版本配置文件中没有的新配置项）保持默认值
+    for section in (
+        "entity_extract",
+        "rdf_build",
+        "embedding",
+        "rag",
+        "qa",
+        "director",
+        "persistence",
+    ):
+        if section in file_config:
+            _merge_config(config[section], file_config[section])
 
     print("Configurations loaded from file: ", config_file_path)
     print(config)
@@ -78,6 +83,7 @@ global_config = dict(
             "localhost": {
                 "base_url": "http://localhost:8000",
                 "api_key": "",
+                "max_concurrent_requests": 4,
             }
         },
         "entity_extract": {
@@ -96,11 +102,45 @@ global_config = dict(
             "provider": "localhost",
             "model": "embed",
             "dimension": 1024,
+            "batch_size": 32,
+            "batch_max_tokens": 8192,
+            "max_workers": 8,
+            "storage_dtype": "float32",
+            "cache": {
+                "enabled": True,
+                "max_size_mb": 2048,
+            },
+            "query_cache": {
+                "enabled": True,
+                "max_entries": 1024,
+                "persist": True,
+            },
+            "text": {
+                "mmap": True,
+                "compression": "none",
+                "block_size": 64,
+            },
+            "index": {
+                "paragraph": "flat",
+                "entity": "flat",
+                "relation": "flat",
+                "min_ann_size": 10000,
+                "hnsw_m": 32,
+                "hnsw_ef_construction": 80,
+                "hnsw_ef_search": 128,
+                "ivf_nlist": 0,
+                "ivf_nprobe": 16,
+                "pq_m": 64,
+                "pq_nbits": 8,
+            },
         },
         "rag": {
             "params": {
                 "synonym_search_top_k": 10,
                 "synonym_threshold": 0.75,
+                "synonym_batch_size": 1024,
+                "synonym_max_workers": 4,
+                "synonym_verbose": False,
             }
         },
         "qa": {
@@ -111,6 +151,13 @@ global_config = dict(
                 "paragraph_node_weight": 0.05,
                 "ent_filter_top_k": 10,
                 "ppr_damping": 0.8,
+                "ppr_top_k": 1000,
+                "ppr_cache_size": 128,
+                "ppr_cache_quantization": 1e-3,
+                "ppr_warm_start": True,
+                "ppr_num_threads": 0,
+                "ppr_method": "power",
+                "ppr_push_epsilon": 1e-6,
                 "res_top_k": 10,
             },
             "llm": {
@@ -139,8 +186,10 @@ global_config = dict(
             "openie_data_path": "data/openie.json",
             "embedding_data_dir": "data/embedding",
             "rag_data_dir": "data/rag",
+            "embedding_cache_path": "/.cache/embedding_cache.db",
         },
     }
 )
 
-_load_config(global_config, parser.parse_args().config_path)
+# 忽略其他程序（如pytest、streamlit）的命令行参数
+_load_config(global_config, parser.parse_known_args()[0].config_path)
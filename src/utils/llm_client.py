@@ -1,5 +1,12 @@
+import threading
+from typing import Dict, Tuple
+
 from openai import OpenAI
 
+# 各服务商（base_url与模型）的请求信号量，在进程内的所有LLMClient实例间共享
+_request_semaphores: Dict[Tuple[str, str], threading.BoundedSemaphore] = dict()
+_request_semaphores_lock = threading.Lock()
+
 
 class LLMMessage:
     def __init__(self, role, content):
@@ -13,17 +20,34 @@ class LLMMessage:
 class LLMClient:
     """LLM客户端，对应一个API服务商"""
 
-    def __init__(self, url, api_key):
+    def __init__(self, url, api_key, max_concurrent_requests=4):
         self.client = OpenAI(
             base_url=url,
             api_key=api_key,
         )
+        self.url = url
+        self.max_concurrent_requests = max_concurrent_requests
+
+    def _request_semaphore(self, model) -> threading.BoundedSemaphore:
+        """获取限制同一服务商同时在途请求数的信号量
+
+        信号量按(base_url, 模型)在进程内共享：多个agent各自创建的客户端共同受max_concurrent_requests限制
+        （同一服务商以首个创建信号量的客户端的设置为准）
+        """
+        key = (self.url, model)
+        with _request_semaphores_lock:
+            semaphore = _request_semaphores.get(key)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_concurrent_requests)
+                _request_semaphores[key] = semaphore
+        return semaphore
 
     def send_chat_request(self, model, messages):
         """发送对话请求，等待返回结果"""
-        response = self.client.chat.completions.create(
-            model=model, messages=messages, stream=False
-        )
+        with self._request_semaphore(model):
+            response = self.client.chat.completions.create(
+                model=model, messages=messages, stream=False
+            )
         if hasattr(response.choices[0].message, "reasoning_content"):
             # 有单独的推理内容块
             reasoning_content = response.choices[0].message.reasoning_content
@@ -48,6 +72,21 @@ class LLMClient:
     def send_embedding_request(self, model, text):
         """发送嵌入请求，等待返回结果"""
         text = text.replace("\n", " ")
-        return (
-            self.client.embeddings.create(input=[text], model=model).data[0].embedding
-        )
+        with self._request_semaphore(model):
+            response = self.client.embeddings.create(input=[text], model=model)
+        return response.data[0].embedding
+
+    def send_batch_embedding_request(self, model, texts):
+        """发送批量嵌入请求，等待返回结果（结果顺序与输入顺序一致）"""
+        texts = [text.replace("\n", " ") for text in texts]
+        with self._request_semaphore(model):
+            response = self.client.embeddings.create(input=texts, model=model)
+        if len(response.data) != len(texts):
+            raise Exception(
+                f"嵌入结果数量（{len(response.data)}）与请求数量（{len(texts)}）不一致"
+            )
+        # 服务商返回的结果不一定按输入顺序排列，需按index重新对齐
+        embeddings = [None] * len(texts)
+        for item in response.data:
+            embeddings[item.index] = item.embedding
+        return embeddings
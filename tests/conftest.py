@@ -0,0 +1,58 @@
+import hashlib
+import threading
+
+import numpy as np
+import pytest
+
+from src.utils.config import global_config
+
+# 测试使用的嵌入维度
+DIMENSION = 8
+
+
+def fake_embedding(text: str) -> list:
+    """由文本确定的伪嵌入向量（同一文本总是得到相同的向量）"""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    return np.random.default_rng(seed).standard_normal(DIMENSION).tolist()
+
+
+class FakeEmbeddingClient:
+    """LLMClient的替身：返回伪嵌入向量，并记录每次请求的文本"""
+
+    def __init__(self):
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def send_embedding_request(self, model, text):
+        with self._lock:
+            self.requests.append([text])
+        return fake_embedding(text)
+
+    def send_batch_embedding_request(self, model, texts):
+        with self._lock:
+            self.requests.append(list(texts))
+        return [fake_embedding(text) for text in texts]
+
+    @property
+    def embedded_texts(self) -> list:
+        return [text for batch in self.requests for text in batch]
+
+
+@pytest.fixture
+def embedding_config(monkeypatch, tmp_path):
+    """将嵌入相关配置改为测试用的值（小维度、临时数据目录、不启用共享缓存）"""
+    embedding = global_config["embedding"]
+    monkeypatch.setitem(embedding, "dimension", DIMENSION)
+    monkeypatch.setitem(embedding, "storage_dtype", "float32")
+    monkeypatch.setitem(embedding["cache"], "enabled", False)
+    monkeypatch.setitem(embedding["text"], "mmap", True)
+    monkeypatch.setitem(embedding["text"], "compression", "none")
+    for namespace in ("paragraph", "entity", "relation"):
+        monkeypatch.setitem(embedding["index"], namespace, "flat")
+    monkeypatch.setitem(global_config["persistence"], "data_root_path", str(tmp_path))
+    return global_config
+
+
+@pytest.fixture
+def fake_client():
+    return FakeEmbeddingClient()
@@ -0,0 +1,40 @@
+from src.memory.utils.batching import estimate_tokens, pack_embedding_batches
+
+
+class TestBatching:
+    def test_estimate_tokens(self):
+        # 非ASCII字符每字1个token，ASCII字符每4个字符1个token（向上取整）
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("abcd") == 1
+        assert estimate_tokens("abcde") == 2
+        assert estimate_tokens("你好") == 2
+        assert estimate_tokens("你好abc") == 3
+
+    def test_batch_size(self):
+        texts = [str(i) for i in range(10)]
+        batches = pack_embedding_batches(texts, 4, 10000)
+        assert batches == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+    def test_token_budget(self):
+        # 每条文本3个token，预算7个token时每批最多2条
+        texts = ["一二三"] * 5
+        batches = pack_embedding_batches(texts, 100, 7)
+        assert batches == [[0, 1], [2, 3], [4]]
+        for batch in batches:
+            assert sum(estimate_tokens(texts[i]) for i in batch) <= 7
+
+    def test_oversized_text(self):
+        # 单条文本超出预算时单独成批，不被丢弃
+        texts = ["短", "长" * 100, "短"]
+        batches = pack_embedding_batches(texts, 100, 10)
+        assert batches == [[0], [1], [2]]
+
+    def test_order_and_coverage(self):
+        texts = ["a" * (i % 7 * 10) + "中" * (i % 5) for i in range(100)]
+        batches = pack_embedding_batches(texts, 8, 30)
+        # 保持原顺序，且每条文本恰好出现一次
+        assert [i for batch in batches for i in batch] == list(range(100))
+        assert all(0 < len(batch) <= 8 for batch in batches)
+
+    def test_empty(self):
+        assert pack_embedding_batches([], 4, 100) == []
@@ -0,0 +1,143 @@
+import itertools
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.memory import embedding_cache
+from src.memory.embedding_cache import EmbeddingCache, QueryEmbeddingCache
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """以递增的计数代替time.time，使最近访问时间严格有序"""
+    counter = itertools.count(1)
+    monkeypatch.setattr(
+        embedding_cache, "time", SimpleNamespace(time=lambda: float(next(counter)))
+    )
+
+
+def vector(value: float, dimension: int = 4) -> np.ndarray:
+    return np.full(dimension, value, dtype=np.float32)
+
+
+class TestEmbeddingCache:
+    def test_get_put_and_keying(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path / "cache.db"), 1)
+        cache.put_many("m", 4, ["a", "b"], [vector(1), vector(2).tolist()])
+
+        result = cache.get_many("m", 4, ["b", "c", "a"])
+        assert result[1] is None
+        # 返回float32数组（不经Python列表中转）
+        assert all(isinstance(item, np.ndarray) for item in (result[0], result[2]))
+        assert result[0].dtype == np.float32
+        assert np.array_equal(result[0], vector(2))
+        assert np.array_equal(result[2], vector(1))
+        # 模型与维度均属于键的一部分
+        assert cache.get_many("other", 4, ["a"]) == [None]
+        assert cache.get_many("m", 8, ["a"]) == [None]
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (2, 3)
+
+    def test_persistence(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path / "cache.db"), 1)
+        cache.put_many("m", 4, ["a"], [vector(3)])
+        reopened = EmbeddingCache(str(tmp_path / "cache.db"), 1)
+        assert np.array_equal(reopened.get_many("m", 4, ["a"])[0], vector(3))
+
+    def test_lru_eviction(self, tmp_path, fake_clock):
+        # 每项16字节，上限为10项
+        cache = EmbeddingCache(str(tmp_path / "cache.db"), 160 / 1024 / 1024)
+        texts = [str(i) for i in range(10)]
+        cache.put_many("m", 4, texts, [vector(i) for i in range(10)])
+        # 访问最早写入的两项，使其成为最近使用的项
+        cache.get_many("m", 4, ["0", "1"])
+
+        cache.put_many("m", 4, ["new"], [vector(10)])
+        # 淘汰至上限的90%以下（不超过9项）：最久未使用的"2"、"3"被淘汰
+        result = cache.get_many("m", 4, texts + ["new"])
+        kept = [text for text, item in zip(texts + ["new"], result) if item is not None]
+        assert kept == ["0", "1"] + texts[4:] + ["new"]
+        assert cache.stats()["size_mb"] * 1024 * 1024 <= 160 * 0.9
+
+    def test_peek_is_stats_neutral(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path / "cache.db"), 1)
+        cache.put_many("m", 4, ["a"], [vector(1)])
+        assert np.array_equal(cache.peek("m", 4, "a"), vector(1))
+        assert cache.peek("m", 4, "b") is None
+        cache.touch_many("m", 4, ["a", "b"])
+        assert (cache.hits, cache.misses) == (0, 0)
+
+
+class CountingEmbed:
+    """记录调用的嵌入函数"""
+
+    def __init__(self):
+        self.texts = []
+
+    def __call__(self, text):
+        self.texts.append(text)
+        return [float(len(self.texts))] * 4
+
+
+class TestQueryEmbeddingCache:
+    def test_lru_and_keying(self):
+        cache = QueryEmbeddingCache(2)
+        embed = CountingEmbed()
+        first = cache.get("m", 4, "a", embed)
+        assert first.dtype == np.float32 and not first.flags.writeable
+        assert cache.get("m", 4, "a", embed) is first
+        # 维度属于键的一部分
+        cache.get("m", 8, "a", embed)
+        assert embed.texts == ["a", "a"]
+
+        cache.get("m", 4, "b", embed)
+        # 容量为2："m/4/a"已被淘汰
+        cache.get("m", 4, "a", embed)
+        assert embed.texts == ["a", "a", "b", "a"]
+        assert cache.stats()["entries"] == 2
+        assert (cache.hits, cache.misses) == (1, 4)
+
+    def test_disk_cache(self, tmp_path):
+        disk_cache = EmbeddingCache(str(tmp_path / "cache.db"), 1)
+        disk_cache.put_many("m", 4, ["stored"], [vector(7)])
+        cache = QueryEmbeddingCache(1, disk_cache, flush_size=3)
+        embed = CountingEmbed()
+
+        assert np.array_equal(cache.get("m", 4, "stored", embed), vector(7))
+        cache.get("m", 4, "new", embed)
+        # 查询不影响共享缓存的命中统计，且写入在累计flush_size项前暂存
+        assert (disk_cache.hits, disk_cache.misses) == (0, 0)
+        assert disk_cache.peek("m", 4, "new") is None
+        # 已被LRU淘汰但尚未写入的项仍可命中
+        assert np.array_equal(cache.get("m", 4, "new", embed), vector(1))
+        assert embed.texts == ["new"]
+        assert (cache.hits, cache.disk_hits, cache.misses) == (1, 1, 1)
+
+        cache.get("m", 4, "other", embed)
+        assert np.array_equal(disk_cache.peek("m", 4, "new"), vector(1))
+        assert np.array_equal(disk_cache.peek("m", 4, "other"), vector(2))
+        assert (disk_cache.hits, disk_cache.misses) == (0, 0)
+
+    def test_flush_groups_writes(self, tmp_path, monkeypatch):
+        disk_cache = EmbeddingCache(str(tmp_path / "cache.db"), 1)
+        calls = []
+        put_many = disk_cache.put_many
+        monkeypatch.setattr(
+            disk_cache,
+            "put_many",
+            lambda model, dimension, texts, embeddings: (
+                calls.append((model, dimension, list(texts))),
+                put_many(model, dimension, texts, embeddings),
+            ),
+        )
+        cache = QueryEmbeddingCache(10, disk_cache, flush_size=100)
+        embed = CountingEmbed()
+        for key in [("m", 4, "a"), ("m", 4, "b"), ("n", 4, "a")]:
+            cache.get(*key, embed)
+        assert calls == []
+        cache.flush()
+        assert sorted(calls) == [("m", 4, ["a", "b"]), ("n", 4, ["a"])]
+        cache.flush()
+        assert len(calls) == 2
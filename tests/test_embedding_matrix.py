@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from src.memory.embedding_matrix import (
+    EmbeddingMatrix,
+    dequantize_int8,
+    quantize_int8,
+)
+
+
+def random_vectors(n: int, dimension: int = 8, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((n, dimension))
+
+
+class TestEmbeddingMatrix:
+    def test_append_and_growth(self):
+        matrix = EmbeddingMatrix(8, capacity=2)
+        vectors = random_vectors(5)
+        matrix.append(["h0", "h1"], ["s0", "s1"], vectors[:2])
+        matrix.append(["h2", "h3", "h4"], ["s2", "s3", "s4"], vectors[2:])
+
+        assert len(matrix) == 5
+        assert matrix.hashes.tolist() == ["h0", "h1", "h2", "h3", "h4"]
+        assert matrix.get_strs(1, 4) == ["s1", "s2", "s3"]
+        assert matrix.hash2row == {f"h{i}": i for i in range(5)}
+        assert "h3" in matrix and "h5" not in matrix
+        # 存入时完成L2归一化，扩容不丢失已有数据
+        expected = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        assert matrix.vectors.dtype == np.float32
+        assert np.allclose(matrix.vectors, expected, atol=1e-6)
+
+    def test_reserve_doubles_capacity(self):
+        matrix = EmbeddingMatrix(8, capacity=4)
+        matrix.reserve(5)
+        assert matrix._codes.shape[0] == 8
+        matrix.reserve(20)
+        assert matrix._codes.shape[0] == 20
+        assert len(matrix) == 0
+
+    def test_normalized_input_and_zero_vector(self):
+        matrix = EmbeddingMatrix(8)
+        vectors = np.zeros((2, 8), dtype=np.float32)
+        vectors[1, 0] = 2.0
+        matrix.append(["a", "b"], ["a", "b"], vectors, normalized=True)
+        assert np.array_equal(matrix.vectors, vectors)
+
+        matrix.append(["c"], ["c"], np.zeros((1, 8)))
+        assert np.array_equal(matrix.get_vectors(2), np.zeros(8, dtype=np.float32))
+
+    def test_dimension_mismatch(self):
+        matrix = EmbeddingMatrix(8)
+        with pytest.raises(Exception):
+            matrix.append(["a"], ["a"], np.ones((1, 4)))
+
+    def test_checksum_tracks_hash_prefix(self):
+        matrix = EmbeddingMatrix(8)
+        matrix.append(["a", "b"], ["a", "b"], random_vectors(2))
+        other = EmbeddingMatrix(8)
+        other.append(["a", "b", "c"], ["a", "b", "c"], random_vectors(3))
+        assert matrix.checksum() == other.checksum(2)
+        assert matrix.checksum() != other.checksum()
+
+
+class TestQuantizedStorage:
+    def test_int8_round_trip(self):
+        vectors = random_vectors(50).astype(np.float32)
+        codes, scales = quantize_int8(vectors)
+        assert codes.dtype == np.int8 and scales.dtype == np.float32
+        # 每行的最大绝对值映射至±127，误差不超过半个量化步长
+        assert (np.abs(codes).max(axis=1) == 127).all()
+        restored = dequantize_int8(codes, scales)
+        assert (np.abs(restored - vectors) <= scales[:, None] / 2 + 1e-7).all()
+
+        zero_codes, zero_scales = quantize_int8(np.zeros((1, 8), dtype=np.float32))
+        assert not zero_codes.any() and zero_scales.tolist() == [1.0]
+
+    @pytest.mark.parametrize("storage_dtype, atol", [("float16", 1e-3), ("int8", 1e-2)])
+    def test_quantized_matrix(self, storage_dtype, atol):
+        vectors = random_vectors(10)
+        reference = EmbeddingMatrix(8)
+        reference.append([str(i) for i in range(10)], None, vectors)
+        matrix = EmbeddingMatrix(8, capacity=2, storage_dtype=storage_dtype)
+        matrix.append([str(i) for i in range(10)], None, vectors)
+
+        assert matrix.codes.dtype == np.dtype(storage_dtype)
+        assert (matrix.scales is None) == (storage_dtype != "int8")
+        assert matrix.vectors.dtype == np.float32
+        assert np.allclose(matrix.vectors, reference.vectors, atol=atol)
+        assert np.allclose(
+            matrix.get_vectors([3, 1]), reference.vectors[[3, 1]], atol=atol
+        )
+        assert matrix.nbytes < reference.nbytes
+
+        # 直接复制编码，不重新量化
+        copy = EmbeddingMatrix(8, storage_dtype=storage_dtype)
+        copy.append_codes(matrix.hashes, None, matrix.codes, matrix.scales)
+        assert np.array_equal(copy.vectors, matrix.vectors)
+
+    def test_invalid_storage_dtype(self):
+        with pytest.raises(ValueError):
+            EmbeddingMatrix(8, storage_dtype="bfloat16")
@@ -0,0 +1,371 @@
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.memory import embedding_cache
+from src.memory import embedding_store
+from src.memory.embedding_matrix import PrefixChecksum
+from src.memory.embedding_store import (
+    EmbeddingStore,
+    RelationEmbeddingStore,
+    concurrent_insert_strs,
+)
+from src.memory.utils.hash import get_sha256
+from src.utils.config import global_config
+from .conftest import FakeEmbeddingClient, fake_embedding
+
+
+def make_store(client, tmp_path, namespace="entity", name="store"):
+    return EmbeddingStore(client, namespace, str(tmp_path / name))
+
+
+class TestBatchInsert:
+    def test_batches_and_dedup(self, embedding_config, fake_client, tmp_path, monkeypatch):
+        monkeypatch.setitem(global_config["embedding"], "batch_size", 3)
+        store = make_store(fake_client, tmp_path)
+        texts = [f"text-{i}" for i in range(7)]
+
+        store.batch_insert_strs(texts + texts[:2])
+        # 重复文本只嵌入一次，每次请求不超过batch_size条
+        assert sorted(fake_client.embedded_texts) == sorted(texts)
+        assert all(len(batch) <= 3 for batch in fake_client.requests)
+        assert len(fake_client.requests) == 3
+
+        # 已存入的文本不再请求
+        store.batch_insert_strs(texts[:3] + ["text-new"])
+        assert fake_client.requests[-1] == ["text-new"]
+        assert len(store.matrix) == 8
+
+    def test_vectors_are_normalized(self, embedding_config, fake_client, tmp_path):
+        store = make_store(fake_client, tmp_path)
+        store.batch_insert_strs(["a", "b"])
+        for text in ("a", "b"):
+            item = store.store["entity-" + get_sha256(text)]
+            expected = np.asarray(fake_embedding(text), dtype=np.float32)
+            expected /= np.linalg.norm(expected)
+            assert item.str == text
+            assert np.allclose(item.embedding, expected, atol=1e-6)
+
+
+class TestConcurrentInsert:
+    def test_rows_follow_input_order(self, embedding_config, tmp_path, monkeypatch):
+        monkeypatch.setitem(global_config["embedding"], "batch_size", 2)
+        monkeypatch.setitem(global_config["embedding"], "max_workers", 4)
+
+        class SlowFirstClient(FakeEmbeddingClient):
+            """越早提交的批次越晚返回"""
+
+            def send_batch_embedding_request(self, model, texts):
+                time.sleep(0.02 * (10 - int(texts[0].split("-")[1]) % 10))
+                return super().send_batch_embedding_request(model, texts)
+
+        client = SlowFirstClient()
+        pg_store = make_store(client, tmp_path, "paragraph")
+        ent_store = make_store(client, tmp_path, "entity")
+        pg_texts = [f"pg-{i}" for i in range(9)]
+        ent_texts = [f"ent-{i}" for i in range(5)]
+
+        concurrent_insert_strs([(pg_store, pg_texts), (ent_store, ent_texts)])
+        assert pg_store.matrix.get_strs(0, len(pg_store.matrix)) == pg_texts
+        assert ent_store.matrix.get_strs(0, len(ent_store.matrix)) == ent_texts
+        assert sorted(client.embedded_texts) == sorted(pg_texts + ent_texts)
+
+    def test_rows_independent_of_cache_state(
+        self, embedding_config, tmp_path, monkeypatch
+    ):
+        monkeypatch.setitem(global_config["embedding"]["cache"], "enabled", True)
+        monkeypatch.setattr(embedding_cache, "_shared_embedding_cache", None)
+        texts = [f"text-{i}" for i in range(10)]
+
+        # 预热共享缓存中的部分文本
+        warm_client = FakeEmbeddingClient()
+        make_store(warm_client, tmp_path, name="warm").batch_insert_strs(texts[3:7])
+
+        client = FakeEmbeddingClient()
+        store = make_store(client, tmp_path, name="store")
+        store.batch_insert_strs(texts)
+        # 命中缓存的项不再请求，且各行仍按输入顺序排列
+        assert sorted(client.embedded_texts) == sorted(texts[:3] + texts[7:])
+        assert store.matrix.get_strs(0, len(store.matrix)) == texts
+
+        cold_store = make_store(FakeEmbeddingClient(), tmp_path, name="cold")
+        monkeypatch.setitem(global_config["embedding"]["cache"], "enabled", False)
+        cold_store.batch_insert_strs(texts)
+        assert np.array_equal(store.matrix.hashes, cold_store.matrix.hashes)
+        assert np.allclose(store.matrix.vectors, cold_store.matrix.vectors)
+
+
+def read_manifest(store):
+    with open(store.manifest_file_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def reload_store(store):
+    loaded = EmbeddingStore(store.llm_client, store.namespace, store.dir)
+    loaded.load_from_file()
+    return loaded
+
+
+class TestPersistence:
+    def test_incremental_parts_and_merge(
+        self, embedding_config, fake_client, tmp_path, monkeypatch
+    ):
+        monkeypatch.setattr(embedding_store, "MAX_DELTA_PARTS", 2)
+        store = make_store(fake_client, tmp_path)
+        texts = [f"text-{i}" for i in range(6)]
+
+        store.batch_insert_strs(texts[:2])
+        store.save_to_file()
+        store.batch_insert_strs(texts[2:4])
+        store.save_to_file()
+        # 首次保存写入基础文件，之后仅写入增量分片
+        manifest = read_manifest(store)
+        assert manifest["parts"] == [
+            {"file": "entity.parquet", "rows": 2},
+            {"file": "entity.part-0001.parquet", "rows": 2},
+        ]
+        assert manifest["rows"] == 4
+        assert manifest["checksum"] == store.matrix.checksum()
+        assert store.matrix.get_strs(0, 4) == reload_store(store).matrix.get_strs(0, 4)
+
+        # 分片数达到上限：合并为基础文件，并删除被合并的增量分片
+        store.batch_insert_strs(texts[4:])
+        store.save_to_file()
+        manifest = read_manifest(store)
+        assert manifest["parts"] == [{"file": "entity.parquet", "rows": 6}]
+        assert manifest["checksum"] == store.matrix.checksum()
+        assert not os.path.exists(store.dir + "/entity.part-0001.parquet")
+
+        loaded = reload_store(store)
+        assert loaded.matrix.get_strs(0, len(loaded.matrix)) == texts
+        assert np.allclose(loaded.matrix.vectors, store.matrix.vectors)
+
+    def test_index_topped_up_in_place(
+        self, embedding_config, fake_client, tmp_path, monkeypatch
+    ):
+        store = make_store(fake_client, tmp_path)
+        texts = [f"text-{i}" for i in range(5)]
+        store.batch_insert_strs(texts[:3])
+        store.build_faiss_index()
+        store.save_to_file()
+        # 保存新增行但不更新索引（如保存索引前中断）
+        store.batch_insert_strs(texts[3:])
+        store.save_to_file()
+        assert read_manifest(store)["index"]["rows"] == 3
+
+        def fail_rebuild(self):
+            raise AssertionError("索引应增量补充而非重建")
+
+        monkeypatch.setattr(EmbeddingStore, "build_faiss_index", fail_rebuild)
+        loaded = reload_store(store)
+        assert loaded.faiss_index.ntotal == 5
+        manifest = read_manifest(loaded)
+        assert manifest["index"] == {"rows": 5, "checksum": loaded.matrix.checksum()}
+        query = np.asarray([fake_embedding("text-4")])
+        assert loaded.search_top_k(query, 1)[0][0] == "entity-" + get_sha256("text-4")
+
+    def test_interrupted_merge(self, embedding_config, fake_client, tmp_path):
+        store = make_store(fake_client, tmp_path)
+        texts = [f"text-{i}" for i in range(4)]
+        store.batch_insert_strs(texts[:2])
+        store.save_to_file()
+        store.batch_insert_strs(texts[2:])
+        store.save_to_file()
+        # 基础文件已替换为全部行，但清单文件尚未更新
+        store._merge_parts()
+        assert len(read_manifest(store)["parts"]) == 2
+
+        loaded = reload_store(store)
+        assert loaded.matrix.get_strs(0, len(loaded.matrix)) == texts
+        assert read_manifest(loaded)["parts"] == [{"file": "entity.parquet", "rows": 4}]
+        assert not os.path.exists(store.dir + "/entity.part-0001.parquet")
+
+    def test_prefix_checksum(self):
+        hashes = np.array([f"h{i}" for i in range(10)], dtype=object)
+        checksum = PrefixChecksum()
+        checksum.advance(hashes, 4)
+        snapshot = checksum.copy()
+        expected = PrefixChecksum().advance(hashes, 10)
+        # 增量推进与一次性计算的结果相同；回退时重新计算
+        assert checksum.advance(hashes, 10) == expected
+        assert snapshot.advance(hashes, 10) == expected
+        assert checksum.advance(hashes, 4) == PrefixChecksum().advance(hashes, 4)
+
+
+class TestParquetFormat:
+    def test_round_trip(self, embedding_config, fake_client, tmp_path):
+        store = make_store(fake_client, tmp_path)
+        texts = [f"text-{i}" for i in range(5)]
+        store.batch_insert_strs(texts)
+        store.save_to_file()
+
+        table = pq.read_table(store.embedding_file_path)
+        assert int(table.schema.metadata[b"format_version"]) == (
+            embedding_store.EMBEDDING_FILE_VERSION
+        )
+        assert pa.types.is_fixed_size_list(table.schema.field("embedding").type)
+
+        loaded = reload_store(store)
+        # 向量按原样读回（不重新归一化，结果逐位一致）
+        assert np.array_equal(loaded.matrix.vectors, store.matrix.vectors)
+        assert loaded.matrix.hash2row == store.matrix.hash2row
+        assert loaded.matrix.get_strs(0, 5) == texts
+
+    def test_legacy_file(self, embedding_config, fake_client, tmp_path):
+        # 旧版本：pandas写入的变长列表、未归一化的向量，且无清单文件
+        texts = [f"text-{i}" for i in range(3)]
+        os.makedirs(tmp_path / "store")
+        pd.DataFrame(
+            {
+                "hash": ["entity-" + get_sha256(text) for text in texts],
+                "embedding": [fake_embedding(text) for text in texts],
+                "str": texts,
+            }
+        ).to_parquet(tmp_path / "store" / "entity.parquet", index=False)
+
+        loaded = make_store(fake_client, tmp_path)
+        loaded.load_from_file()
+        expected = np.asarray([fake_embedding(text) for text in texts])
+        expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+        assert np.allclose(loaded.matrix.vectors, expected, atol=1e-6)
+        assert loaded.matrix.get_strs(0, 3) == texts
+        assert read_manifest(loaded)["rows"] == 3
+
+
+class AxisEmbeddingClient(FakeEmbeddingClient):
+    """返回以首个分量区分相似度的向量：与查询e0的余弦相似度恰为向量的首个分量"""
+
+    def send_batch_embedding_request(self, model, texts):
+        embeddings = []
+        for text in texts:
+            cos = float(text.split("-")[1]) / 10
+            embedding = [cos, np.sqrt(1 - cos * cos)] + [0.0] * 6
+            embeddings.append(embedding)
+        return embeddings
+
+
+def make_search_store(tmp_path):
+    store = make_store(AxisEmbeddingClient(), tmp_path)
+    store.batch_insert_strs(["sim-5", "sim-9", "sim-7", "sim-3"])
+    store.build_faiss_index()
+    return store
+
+
+class TestSearch:
+    def test_search_top_k(self, embedding_config, tmp_path):
+        store = make_search_store(tmp_path)
+        query = [1.0] + [0.0] * 7
+        result = store.search_top_k(query, 2)
+        assert [item_hash for item_hash, _ in result] == [
+            "entity-" + get_sha256("sim-9"),
+            "entity-" + get_sha256("sim-7"),
+        ]
+        assert np.allclose([sim for _, sim in result], [0.9, 0.7])
+        # k超过数据量时仅返回已有的项
+        assert len(store.search_top_k(query, 10)) == 4
+        # 索引下标即矩阵行号
+        assert store.idx2hash.tolist() == store.matrix.hashes.tolist()
+
+    def test_search_top_k_batch_padding(self, embedding_config, tmp_path):
+        store = make_search_store(tmp_path)
+        queries = np.eye(8, dtype=np.float32)[:2]
+        hashes, sims = store.search_top_k_batch(queries, 6)
+        assert hashes.shape == sims.shape == (2, 6)
+        # 结果不足k个时以None与-inf填充
+        assert hashes[0, 4:].tolist() == [None, None]
+        assert np.isneginf(sims[:, 4:]).all()
+        assert hashes[0, 0] == "entity-" + get_sha256("sim-9")
+        assert (np.diff(sims[:, :4], axis=1) <= 0).all()
+
+    def test_range_search(self, embedding_config, tmp_path):
+        store = make_search_store(tmp_path)
+        queries = np.zeros((3, 8), dtype=np.float32)
+        queries[0, 0] = queries[2, 0] = 1.0
+        queries[1, 2] = 1.0
+        # 阈值恰为某项的相似度：该项应被包含
+        row = store.matrix.hash2row["entity-" + get_sha256("sim-5")]
+        threshold = float(store.matrix.vectors[row, 0])
+        lims, hashes, sims = store.range_search(queries, threshold)
+
+        assert lims.tolist() == [0, 3, 3, 6]
+        expected = ["entity-" + get_sha256(f"sim-{i}") for i in (9, 7, 5)]
+        assert hashes[lims[0] : lims[1]].tolist() == expected
+        assert hashes[lims[2] : lims[3]].tolist() == expected
+        assert (sims >= threshold).all()
+
+
+class TestTextStorage:
+    def test_strs_moved_to_arena(self, embedding_config, fake_client, tmp_path):
+        store = make_store(fake_client, tmp_path)
+        texts = [f"text-{i}" for i in range(4)]
+        store.batch_insert_strs(texts)
+        store.save_to_file()
+        # 保存后字符串仅保存在文本存储中
+        assert len(store.matrix.arena) == 4
+        assert all(s is None for s in store.matrix._strs[:4])
+        assert store.matrix.get_strs(0, 4) == texts
+
+        # 中断写入的文本在加载时被丢弃
+        store.matrix.arena.append(["unsaved"])
+        loaded = reload_store(store)
+        assert len(loaded.matrix.arena) == 4
+        assert loaded.matrix.get_strs(0, 4) == texts
+
+
+TRIPLES = [("苹果", "是", "水果"), ("a, b", "'quoted'", "c)"), ("x", "y", "z")]
+
+
+def entity_hash(text):
+    return "entity-" + get_sha256(text)
+
+
+class TestRelationStore:
+    def make_relation_store(self, client, tmp_path):
+        store = RelationEmbeddingStore(client, "relation", str(tmp_path / "store"))
+        store.batch_insert_strs([str(triple) for triple in TRIPLES] + ["not a triple"])
+        return store
+
+    def check_triples(self, store):
+        for triple in TRIPLES:
+            item_hash = "relation-" + get_sha256(str(triple))
+            assert store.get_triple(item_hash) == triple
+            assert store.get_entity_hashes(item_hash) == (
+                entity_hash(triple[0]),
+                entity_hash(triple[2]),
+            )
+        invalid_hash = "relation-" + get_sha256("not a triple")
+        assert store.get_triple(invalid_hash) is None
+        assert store.get_entity_hashes(invalid_hash) == ()
+
+    def test_triple_columns(self, embedding_config, fake_client, tmp_path):
+        store = self.make_relation_store(fake_client, tmp_path)
+        self.check_triples(store)
+        store.save_to_file()
+
+        schema = pq.read_schema(store.embedding_file_path)
+        assert all(name in schema.names for name in store.TRIPLE_COLUMNS)
+        loaded = RelationEmbeddingStore(fake_client, "relation", store.dir)
+        loaded.load_from_file()
+        assert not loaded._triples_parsed
+        self.check_triples(loaded)
+
+    def test_legacy_file_migrated(self, embedding_config, fake_client, tmp_path):
+        store = self.make_relation_store(fake_client, tmp_path)
+        store.save_to_file()
+        # 旧版本：无三元组列与清单文件
+        table = pq.read_table(store.embedding_file_path)
+        pq.write_table(
+            table.drop_columns(list(store.TRIPLE_COLUMNS)), store.embedding_file_path
+        )
+        os.remove(store.manifest_file_path)
+
+        loaded = RelationEmbeddingStore(fake_client, "relation", store.dir)
+        loaded.load_from_file()
+        self.check_triples(loaded)
+        schema = pq.read_schema(store.embedding_file_path)
+        assert all(name in schema.names for name in store.TRIPLE_COLUMNS)
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from src.memory.embedding_store import EmbeddingStore
+from src.memory.utils.faiss_index import (
+    INDEX_TYPES,
+    create_faiss_index,
+    expected_storage_dtype,
+    get_index_storage_dtype,
+    get_index_type,
+    resolve_index_type,
+)
+from src.utils.config import global_config
+
+PARAMS = {
+    "min_ann_size": 100,
+    "hnsw_m": 8,
+    "hnsw_ef_construction": 40,
+    "hnsw_ef_search": 64,
+    "ivf_nlist": 0,
+    "ivf_nprobe": 4,
+    "pq_m": 4,
+    "pq_nbits": 4,
+}
+
+
+def unit_vectors(n: int, dimension: int = 8, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((n, dimension))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+class TestFaissIndex:
+    def test_resolve_index_type(self):
+        assert resolve_index_type("hnsw", 99, PARAMS) == "flat"
+        assert resolve_index_type("hnsw", 100, PARAMS) == "hnsw"
+        assert resolve_index_type("flat", 1000, PARAMS) == "flat"
+        with pytest.raises(ValueError):
+            resolve_index_type("lsh", 1000, PARAMS)
+
+    @pytest.mark.parametrize("index_type", INDEX_TYPES)
+    def test_create_and_search(self, index_type):
+        vectors = unit_vectors(400)
+        index = create_faiss_index(index_type, 8, vectors, PARAMS)
+        index.add(vectors)
+        assert get_index_type(index) == index_type
+        _, ids = index.search(vectors[:5], 1)
+        if index_type != "ivf_pq":
+            # PQ编码为近似值，不要求精确命中
+            assert ids[:, 0].tolist() == list(range(5))
+
+    def test_store_switches_type_with_size(
+        self, embedding_config, fake_client, tmp_path, monkeypatch
+    ):
+        index_params = dict(global_config["embedding"]["index"], **PARAMS)
+        index_params["entity"] = "hnsw"
+        monkeypatch.setitem(global_config["embedding"], "index", index_params)
+        monkeypatch.setitem(index_params, "min_ann_size", 5)
+
+        store = EmbeddingStore(fake_client, "entity", str(tmp_path / "store"))
+        store.batch_insert_strs([f"text-{i}" for i in range(3)])
+        store.update_faiss_index()
+        # 数据量低于min_ann_size时回退至flat
+        assert get_index_type(store.faiss_index) == "flat"
+
+        store.batch_insert_strs([f"text-{i}" for i in range(3, 6)])
+        store.update_faiss_index()
+        # 超过阈值后重建为配置的索引类型
+        assert get_index_type(store.faiss_index) == "hnsw"
+        assert store.faiss_index.ntotal == 6
+
+
+class TestScalarQuantizedIndex:
+    @pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivf_flat"])
+    @pytest.mark.parametrize("storage_dtype", ["float32", "float16", "int8"])
+    def test_storage_dtype(self, index_type, storage_dtype):
+        vectors = unit_vectors(400)
+        index = create_faiss_index(index_type, 8, vectors, PARAMS, storage_dtype)
+        index.add(vectors)
+        assert get_index_type(index) == index_type
+        assert get_index_storage_dtype(index) == storage_dtype
+        _, ids = index.search(vectors[:5], 1)
+        assert ids[:, 0].tolist() == list(range(5))
+
+    def test_ivf_pq_ignores_storage_dtype(self):
+        assert expected_storage_dtype("ivf_pq", "int8") is None
+        assert expected_storage_dtype("hnsw", "int8") == "int8"
+        index = create_faiss_index("ivf_pq", 8, unit_vectors(400), PARAMS, "int8")
+        assert get_index_storage_dtype(index) is None
+
+    def test_empty_int8_index(self):
+        # 空库以[-1, 1]训练量化范围，之后添加的单位向量不越界
+        index = create_faiss_index("flat", 8, unit_vectors(0), PARAMS, "int8")
+        vectors = unit_vectors(20)
+        index.add(vectors)
+        similarities, ids = index.search(vectors, 1)
+        assert ids[:, 0].tolist() == list(range(20))
+        assert np.allclose(similarities[:, 0], 1.0, atol=2e-2)
@@ -0,0 +1,305 @@
+import os
+
+import numpy as np
+import pytest
+from quick_algo import di_graph, pagerank
+
+from src.memory.embedding_store import EmbeddingManager
+from src.memory.kg_manager import KGManager
+from src.memory.utils.hash import get_sha256
+from src.utils.config import global_config
+
+# 段落原文 -> 三元组列表
+PARAGRAPHS = {
+    "小明喜欢苹果，住在北京": [["小明", "喜欢", "苹果"], ["小明", "住在", "北京"]],
+    "小红喜欢香蕉，认识小明": [["小红", "喜欢", "香蕉"], ["小红", "认识", "小明"]],
+    "北京是首都": [["北京", "是", "首都"]],
+    "苹果和香蕉都是水果": [["苹果", "是", "水果"], ["香蕉", "是", "水果"]],
+    "小刚住在上海": [["小刚", "住在", "上海"]],
+}
+# 各实体出现的段落数
+APPEAR_CNT = {
+    "小明": 2, "苹果": 2, "北京": 2, "小红": 1, "香蕉": 2,
+    "首都": 1, "水果": 1, "小刚": 1, "上海": 1,
+}
+
+
+def pg_key(text):
+    return "paragraph-" + get_sha256(text)
+
+
+def ent_key(text):
+    return "entity-" + get_sha256(text)
+
+
+def rel_key(triple):
+    return "relation-" + get_sha256(str(tuple(triple)))
+
+
+def import_paragraphs(embed_manager, kg_manager, paragraphs):
+    raw_paragraphs = {get_sha256(text): text for text in paragraphs}
+    triple_list_data = {
+        get_sha256(text): triples for text, triples in paragraphs.items()
+    }
+    embed_manager.store_new_data_set(raw_paragraphs, triple_list_data)
+    embed_manager.update_faiss_index()
+    kg_manager.build_kg(triple_list_data, embed_manager)
+
+
+@pytest.fixture
+def kg_config(embedding_config, monkeypatch):
+    qa_params = global_config["qa"]["params"]
+    monkeypatch.setitem(qa_params, "ent_filter_top_k", 3)
+    monkeypatch.setitem(qa_params, "ppr_top_k", 10)
+    monkeypatch.setitem(qa_params, "ppr_push_epsilon", 1e-12)
+    # 不建立同义词连接，使图结构只由三元组决定
+    monkeypatch.setitem(global_config["rag"]["params"], "synonym_threshold", 0.999)
+    return global_config
+
+
+@pytest.fixture
+def managers(kg_config, fake_client):
+    embed_manager = EmbeddingManager(fake_client, "agent")
+    kg_manager = KGManager("agent")
+    import_paragraphs(embed_manager, kg_manager, PARAGRAPHS)
+    return embed_manager, kg_manager
+
+
+# 关系检索结果（关系hash, 相似度, 归一化相似度）
+RELATION_HITS = [
+    (rel_key(["小明", "喜欢", "苹果"]), 0.9, 1.0),
+    (rel_key(["小红", "认识", "小明"]), 0.8, 0.75),
+    (rel_key(["苹果", "是", "水果"]), 0.6, 0.25),
+    (rel_key(["小刚", "住在", "上海"]), 0.5, 0.0),
+]
+PARAGRAPH_HITS = [
+    (pg_key("北京是首都"), 0.9),
+    (pg_key("小明喜欢苹果，住在北京"), 0.7),
+    (pg_key("苹果和香蕉都是水果"), 0.5),
+    ("paragraph-not-in-graph", 0.3),
+]
+
+
+def expected_seed_weights():
+    """按原实现（字典逐项计算）得到的种子节点权重，实体按平均相似度保留前ent_filter_top_k个"""
+    params = global_config["qa"]["params"]
+    sims = {"小明": [0.9, 0.8], "苹果": [0.9, 0.6], "小红": [0.8], "水果": [0.6]}
+    sims.update({"小刚": [0.5], "上海": [0.5]})
+    weights = {ent: sum(s) / APPEAR_CNT[ent] for ent, s in sims.items()}
+    w_max, w_min = max(weights.values()), min(weights.values())
+    down_edge = params["paragraph_node_weight"]
+    weights = {
+        ent: (w - w_min) * (1 - down_edge) / (w_max - w_min) + down_edge
+        for ent, w in weights.items()
+    }
+    mean = {ent: np.mean(s) for ent, s in sims.items()}
+    kept = sorted(mean, key=lambda ent: -mean[ent])[: params["ent_filter_top_k"]]
+    seed_weights = {ent_key(ent): weights[ent] for ent in kept}
+    for pg_hash, sim in PARAGRAPH_HITS[:3]:
+        seed_weights[pg_hash] = (sim - 0.3) / (0.9 - 0.3) * down_edge
+    return seed_weights
+
+
+class TestKGSearch:
+    def test_seed_weights(self, managers):
+        embed_manager, kg_manager = managers
+        _, seed_weights = kg_manager.kg_search(
+            RELATION_HITS, PARAGRAPH_HITS, embed_manager
+        )
+        expected = expected_seed_weights()
+        # 仅保留平均相似度最高的3个实体（小明、小红、苹果）
+        assert {ent_key(ent) for ent in ("小明", "小红", "苹果")} < seed_weights.keys()
+        assert ent_key("水果") not in seed_weights
+        assert seed_weights.keys() == expected.keys()
+        for key, weight in expected.items():
+            assert seed_weights[key] == pytest.approx(weight)
+
+    def test_ppr_methods_agree(self, managers, monkeypatch):
+        embed_manager, kg_manager = managers
+        params = global_config["qa"]["params"]
+        results = dict()
+        for method in ("power", "push"):
+            monkeypatch.setitem(params, "ppr_method", method)
+            results[method], _ = kg_manager.kg_search(
+                RELATION_HITS, PARAGRAPH_HITS, embed_manager
+            )
+
+        # 原实现：以字典形式的个性化向量运行完整的PageRank，再筛选、排序文段节点
+        ppr_res = pagerank.run_pagerank(
+            kg_manager.graph,
+            personalization=expected_seed_weights(),
+            max_iter=100,
+            alpha=params["ppr_damping"],
+        )
+        baseline = sorted(
+            (
+                (node_key, score)
+                for node_key, score in ppr_res.items()
+                if node_key.startswith("paragraph") and score > 1e-4
+            ),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+        assert len(baseline) >= 3
+        for method in ("power", "push"):
+            # 种子节点不可达的文段：幂迭代未完全收敛时分数接近0，前向推送则不返回
+            result = [item for item in results[method] if item[1] > 1e-4]
+            assert [node for node, _ in result] == [node for node, _ in baseline]
+            assert [score for _, score in result] == pytest.approx(
+                [score for _, score in baseline], abs=1e-5
+            )
+
+    @pytest.mark.parametrize("method", ["power", "push"])
+    def test_no_positive_seed(self, managers, monkeypatch, method):
+        embed_manager, kg_manager = managers
+        monkeypatch.setitem(global_config["qa"]["params"], "ppr_method", method)
+        # 没有可用的实体种子，KG中的文段均为相似度最低的命中：直接返回文段检索结果
+        paragraph_hits = [("paragraph-not-in-graph", 0.9), (pg_key("北京是首都"), 0.5)]
+        result, seed_weights = kg_manager.kg_search([], paragraph_hits, embed_manager)
+        assert result == paragraph_hits
+        assert seed_weights == {pg_key("北京是首都"): 0.0}
+
+        result, seed_weights = kg_manager.kg_search([], [], embed_manager)
+        assert result == [] and seed_weights == {}
+
+    def test_cache_invalidated_by_import(self, managers):
+        embed_manager, kg_manager = managers
+        first, _ = kg_manager.kg_search(RELATION_HITS, PARAGRAPH_HITS, embed_manager)
+        again, _ = kg_manager.kg_search(RELATION_HITS, PARAGRAPH_HITS, embed_manager)
+        assert again is first
+        assert (kg_manager.ppr_cache.hits, kg_manager.ppr_cache.misses) == (1, 1)
+
+        # 导入新段落后图结构变化，相同的查询不再命中缓存
+        import_paragraphs(
+            embed_manager, kg_manager, {"小明也喜欢水果": [["小明", "喜欢", "水果"]]}
+        )
+        result, _ = kg_manager.kg_search(RELATION_HITS, PARAGRAPH_HITS, embed_manager)
+        assert kg_manager.ppr_cache.misses == 2
+        assert pg_key("小明也喜欢水果") in {node for node, _ in result}
+
+
+def legacy_edge_weights(batches):
+    """按原实现（逐条添加新边、累加已有边的权重）依次导入各批段落后的边权重"""
+    edges = dict()
+    for paragraphs in batches:
+        node_to_node = dict()
+        for text, triples in paragraphs.items():
+            for subject, _, obj in triples:
+                if subject != obj:
+                    for src, tgt in ((subject, obj), (obj, subject)):
+                        key = (ent_key(src), ent_key(tgt))
+                        node_to_node[key] = node_to_node.get(key, 0) + 1.0
+            for subject, _, _ in triples:
+                key = (ent_key(subject), pg_key(text))
+                node_to_node[key] = node_to_node.get(key, 0) + 1.0
+        for key, weight in node_to_node.items():
+            edges[key] = edges.get(key, 0) + weight
+    return edges
+
+
+# 第二批段落：与第一批共享实体与边
+SECOND_BATCH = {
+    "小明又买了苹果": [["小明", "买了", "苹果"], ["小明", "喜欢", "苹果"]],
+    "小红也住在北京": [["小红", "住在", "北京"]],
+}
+
+
+class TestBuildKG:
+    def test_reimport_accumulates(self, kg_config, fake_client):
+        embed_manager = EmbeddingManager(fake_client, "agent")
+        kg_manager = KGManager("agent")
+        import_paragraphs(embed_manager, kg_manager, PARAGRAPHS)
+        first_graph = {
+            (src, tgt): kg_manager.graph[src, tgt]["create_time"]
+            for src, tgt in kg_manager.graph.get_edge_list()
+        }
+        import_paragraphs(embed_manager, kg_manager, SECOND_BATCH)
+
+        graph = kg_manager.graph
+        expected = legacy_edge_weights([PARAGRAPHS, SECOND_BATCH])
+        edges = {
+            (src, tgt): graph[src, tgt]["weight"] for src, tgt in graph.get_edge_list()
+        }
+        assert edges == expected
+
+        # 已有边保留创建时间、更新修改时间；新节点设置内容与类型
+        shared = (ent_key("小明"), ent_key("苹果"))
+        assert graph[shared]["create_time"] == first_graph[shared]
+        assert graph[shared]["update_time"] > graph[shared]["create_time"]
+        assert graph[ent_key("小红")]["type"] == "ent"
+        assert graph[pg_key("小红也住在北京")]["type"] == "pg"
+        assert graph[pg_key("小红也住在北京")]["content"] == "小红也住在北京"
+
+        appear_cnt = dict(APPEAR_CNT, 小明=3, 苹果=3, 小红=2, 北京=3)
+        for ent, cnt in appear_cnt.items():
+            assert kg_manager.ent_appear_cnt[kg_manager.symbols.entity_id(ent)] == cnt
+        assert len(kg_manager.ent_appear_cnt) == len(kg_manager.symbols)
+        assert kg_manager.stored_paragraph_hashes == {
+            get_sha256(text) for text in list(PARAGRAPHS) + list(SECOND_BATCH)
+        }
+
+
+def graph_snapshot(graph):
+    """图的边权重与节点属性"""
+    edges = {
+        (src, tgt): graph[src, tgt]["weight"] for src, tgt in graph.get_edge_list()
+    }
+    nodes = {
+        node: (graph[node]["type"], graph[node]["content"])
+        for node in graph.get_node_list()
+    }
+    return edges, nodes
+
+
+class TestPersistence:
+    def test_save_and_load(self, managers):
+        embed_manager, kg_manager = managers
+        kg_manager.save_to_file()
+        assert os.path.exists(kg_manager.graph_data_path)
+        assert not os.path.exists(kg_manager.legacy_graph_data_path)
+
+        loaded = KGManager("agent")
+        loaded.load_from_file()
+        assert graph_snapshot(loaded.graph) == graph_snapshot(kg_manager.graph)
+        assert np.array_equal(loaded.ent_appear_cnt, kg_manager.ent_appear_cnt)
+        assert loaded.symbols.keys(range(len(loaded.symbols))) == (
+            kg_manager.symbols.keys(range(len(kg_manager.symbols)))
+        )
+        assert loaded.stored_paragraph_hashes == kg_manager.stored_paragraph_hashes
+
+    def test_legacy_graphml_migrated(self, managers):
+        embed_manager, kg_manager = managers
+        kg_manager.save_to_file()
+        expected_search, _ = kg_manager.kg_search(
+            RELATION_HITS, PARAGRAPH_HITS, embed_manager
+        )
+        # 旧版本数据：GraphML格式的图文件，且没有符号表
+        kg_manager.export_graph(kg_manager.legacy_graph_data_path)
+        os.remove(kg_manager.graph_data_path)
+        os.remove(kg_manager.symbol_data_path)
+
+        loaded = KGManager("agent")
+        loaded.load_from_file()
+        assert graph_snapshot(loaded.graph) == graph_snapshot(kg_manager.graph)
+        for ent in APPEAR_CNT:
+            ent_id = loaded.symbols.entity_id(ent)
+            assert loaded.ent_appear_cnt[ent_id] == APPEAR_CNT[ent]
+        result, _ = loaded.kg_search(RELATION_HITS, PARAGRAPH_HITS, embed_manager)
+        assert [node for node, _ in result] == [node for node, _ in expected_search]
+
+        # 保存时转换为二进制格式，之后从二进制格式加载
+        loaded.save_to_file()
+        assert os.path.exists(loaded.graph_data_path)
+        assert os.path.exists(loaded.symbol_data_path)
+        reloaded = KGManager("agent")
+        reloaded.load_from_file()
+        assert graph_snapshot(reloaded.graph) == graph_snapshot(kg_manager.graph)
+
+    def test_export_compressed(self, managers, tmp_path):
+        _, kg_manager = managers
+        kg_manager.export_graph(str(tmp_path / "export.graphmlz"))
+        with open(tmp_path / "export.graphmlz", "rb") as f:
+            # gzip压缩
+            assert f.read(2) == b"\x1f\x8b"
+        graph = di_graph.load_from_file(str(tmp_path / "export.graphmlz"))
+        assert graph_snapshot(graph) == graph_snapshot(kg_manager.graph)
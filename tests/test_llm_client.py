@@ -0,0 +1,76 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from src.utils.llm_client import LLMClient
+
+
+class FakeEmbeddingsAPI:
+    """OpenAI embeddings接口的替身：记录同时在途的请求数，并以乱序返回结果"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def create(self, input, model):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.01)
+        data = [
+            SimpleNamespace(index=i, embedding=[float(len(text))])
+            for i, text in enumerate(input)
+        ]
+        random.shuffle(data)
+        with self._lock:
+            self.in_flight -= 1
+        return SimpleNamespace(data=data)
+
+
+class TestLLMClient:
+    def test_batch_embedding_concurrency_and_order(self):
+        client = LLMClient("http://localhost:8000", "test", max_concurrent_requests=2)
+        api = FakeEmbeddingsAPI()
+        client.client = SimpleNamespace(embeddings=api)
+
+        batches = [["a" * (i + j) for j in range(5)] for i in range(8)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(
+                    lambda texts: client.send_batch_embedding_request("m", texts),
+                    batches,
+                )
+            )
+
+        # 在途请求数不超过max_concurrent_requests，结果按index与输入对齐
+        assert api.max_in_flight <= 2
+        for texts, embeddings in zip(batches, results):
+            assert embeddings == [[float(len(text))] for text in texts]
+
+    def test_concurrency_shared_across_clients(self):
+        # 同一服务商的多个客户端（如各agent各自创建的客户端）共享在途请求数上限
+        api = FakeEmbeddingsAPI()
+        clients = []
+        for _ in range(4):
+            client = LLMClient(
+                "http://localhost:8001", "test", max_concurrent_requests=2
+            )
+            client.client = SimpleNamespace(embeddings=api)
+            clients.append(client)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(
+                executor.map(
+                    lambda i: clients[i % 4].send_batch_embedding_request("m", ["a"]),
+                    range(16),
+                )
+            )
+        assert 0 < api.max_in_flight <= 2
+
+        # 不同模型的请求分别计数
+        client = LLMClient("http://localhost:8001", "test", max_concurrent_requests=2)
+        assert client._request_semaphore("m") is clients[0]._request_semaphore("m")
+        assert client._request_semaphore("n") is not client._request_semaphore("m")
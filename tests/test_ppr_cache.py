@@ -0,0 +1,97 @@
+import numpy as np
+from quick_algo import di_graph, pagerank
+
+from src.memory.ppr_cache import PPRCache
+
+
+def make_graph():
+    graph = di_graph.DiGraph()
+    graph.upsert_edges_from(["a", "b", "c"], ["b", "c", "a"], [1.0, 2.0, 1.0])
+    return graph
+
+
+def seeds(*weights):
+    return np.arange(len(weights), dtype=np.int64), np.asarray(weights, dtype=np.float64)
+
+
+class TestPPRCache:
+    def test_signature_quantization(self):
+        cache = PPRCache(8, 1e-3)
+        key = cache.signature(*seeds(0.5, 0.5), 0.8, 10)
+        # 权重差异小于量化步长、整体缩放、零权重的种子与索引顺序均不影响签名
+        assert cache.signature(*seeds(0.5, 0.5001), 0.8, 10) == key
+        assert cache.signature(*seeds(2.0, 2.0), 0.8, 10) == key
+        assert cache.signature(*seeds(0.5, 0.5, 0.0), 0.8, 10) == key
+        reordered = (np.array([1, 0], dtype=np.int64), np.array([0.5, 0.5]))
+        assert cache.signature(*reordered, 0.8, 10) == key
+        # 超过量化步长、种子或其他参数不同时签名不同
+        assert cache.signature(*seeds(0.5, 0.51), 0.8, 10) != key
+        assert cache.signature(*seeds(0.5, 0.0, 0.5), 0.8, 10) != key
+        assert cache.signature(*seeds(0.5, 0.5), 0.85, 10) != key
+
+    def test_invalidated_by_graph_change(self):
+        graph = make_graph()
+        cache = PPRCache(8, 1e-3)
+        key = cache.signature(*seeds(1.0), 0.8)
+        result = [("a", 1.0)]
+        assert cache.get(graph, key) is None
+        cache.put(graph, key, result, {"iterations": 3, "converged": True})
+        assert cache.get(graph, key) is result
+        assert cache.get(graph, cache.signature(*seeds(1.0001), 0.8)) is result
+
+        # 更新已有边的权重同样改变图结构版本，缓存全部失效
+        version = graph.version
+        graph.upsert_edges_from(["a"], ["b"], [1.0])
+        assert graph.version != version
+        assert cache.get(graph, key) is None
+        assert (cache.hits, cache.misses) == (2, 2)
+
+    def test_put_after_graph_change_is_dropped(self):
+        graph = make_graph()
+        cache = PPRCache(8, 1e-3)
+        key = cache.signature(*seeds(1.0))
+        assert cache.get(graph, key) is None
+        # 计算期间图发生变化：结果不写入缓存
+        graph.upsert_edges_from(["c"], ["d"], [1.0])
+        cache.put(graph, key, [("a", 1.0)], {"pushes": 5})
+        assert cache.get(graph, key) is None
+        assert (cache.push_runs, cache.total_pushes) == (1, 5)
+
+    def test_lru_eviction(self):
+        graph = make_graph()
+        cache = PPRCache(2, 1e-3)
+        keys = [cache.signature(*seeds(1.0), alpha) for alpha in (0.1, 0.2, 0.3)]
+        stats = {"iterations": 1, "converged": True}
+        # 写入前先查询（与kg_search一致：查询时记录图结构版本）
+        for key, score in zip(keys[:2], (0.1, 0.2)):
+            assert cache.get(graph, key) is None
+            cache.put(graph, key, [("a", score)], stats)
+        # 访问最早写入的项，使其成为最近使用的项
+        assert cache.get(graph, keys[0]) is not None
+        assert cache.get(graph, keys[2]) is None
+        cache.put(graph, keys[2], [("a", 0.3)], stats)
+        assert cache.get(graph, keys[1]) is None
+        assert cache.get(graph, keys[0]) is not None
+        assert cache.get(graph, keys[2]) is not None
+
+        disabled = PPRCache(0, 1e-3)
+        assert disabled.get(graph, keys[0]) is None
+        disabled.put(graph, keys[0], [("a", 0.1)], stats)
+        assert disabled.get(graph, keys[0]) is None
+
+    def test_prior(self):
+        graph = make_graph()
+        cache = PPRCache(8, 1e-3)
+        prior = cache.get_prior(graph, 0.8)
+        expected = pagerank.run_pagerank(graph, alpha=0.8, max_iter=100)
+        assert prior.shape == (graph.node_array_size,)
+        for node_name, idx in graph.node_name2idx_map.items():
+            assert prior[idx] == expected[node_name]
+        assert cache.get_prior(graph, 0.8) is prior
+
+        # 图结构变化后重新计算（新节点同样有先验分数）
+        graph.upsert_edges_from(["c"], ["d"], [1.0])
+        new_prior = cache.get_prior(graph, 0.8)
+        assert new_prior is not prior
+        assert new_prior.shape == (graph.node_array_size,)
+        assert new_prior[graph.node_name2idx_map["d"]] > 0
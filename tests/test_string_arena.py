@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+from src.memory import string_arena
+from src.memory.string_arena import StringArena
+
+TEXTS = ["alpha", "", "中文文本", "beta" * 100, "gamma"]
+
+
+def make_arena(tmp_path, compression="none", block_size=2):
+    return StringArena(
+        str(tmp_path / "test.strs"),
+        str(tmp_path / "test.strs.idx"),
+        compression,
+        block_size,
+    )
+
+
+class TestStringArena:
+    @pytest.mark.parametrize("compression", ["none", "zstd"])
+    def test_append_and_read(self, tmp_path, compression):
+        arena = make_arena(tmp_path, compression)
+        arena.append(TEXTS[:3])
+        arena.append(TEXTS[3:])
+        assert len(arena) == 5
+        assert arena.get_many(0, 5) == TEXTS
+        assert arena[2] == "中文文本"
+        # 重新打开后仍可读取
+        assert make_arena(tmp_path, compression).get_many(0, 5) == TEXTS
+
+    def test_zstd_blocks(self, tmp_path):
+        arena = make_arena(tmp_path, "zstd", block_size=2)
+        arena.append(TEXTS)
+        records = arena._records
+        # 每block_size个字符串共用一个压缩块
+        assert len(set(records["block_offset"].tolist())) == 3
+        assert records["block_offset"][0] == records["block_offset"][1]
+        assert (records["codec"] == string_arena._CODEC_ZSTD).all()
+        assert os.path.getsize(arena.data_file_path) < len("".join(TEXTS).encode())
+
+    def test_zstd_unavailable(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(string_arena, "zstandard", None)
+        arena = make_arena(tmp_path, "zstd")
+        assert arena.compression == "none"
+        arena.append(TEXTS)
+        assert arena.get_many(0, 5) == TEXTS
+
+    def test_read_zstd_without_zstandard(self, tmp_path, monkeypatch):
+        make_arena(tmp_path, "zstd").append(TEXTS)
+        monkeypatch.setattr(string_arena, "zstandard", None)
+        arena = make_arena(tmp_path)
+        assert len(arena) == 5
+        with pytest.raises(ImportError, match="zstandard"):
+            arena[0]
+
+    @pytest.mark.parametrize("compression", ["none", "zstd"])
+    def test_truncate_after_partial_write(self, tmp_path, compression):
+        arena = make_arena(tmp_path, compression)
+        arena.append(TEXTS[:3])
+        # 模拟中断的写入：数据文件有多余的字节，索引文件末尾为不完整的记录
+        with open(arena.data_file_path, "ab") as f:
+            f.write(b"garbage")
+        with open(arena.index_file_path, "ab") as f:
+            f.write(b"\x01\x02\x03")
+
+        arena = make_arena(tmp_path, compression)
+        assert len(arena) == 3
+        arena.truncate(3)
+        assert os.path.getsize(arena.index_file_path) == 3 * (
+            string_arena._RECORD_DTYPE.itemsize
+        )
+        arena.append(TEXTS[3:])
+        assert arena.get_many(0, 5) == TEXTS
+
+        arena.truncate(1)
+        assert arena.get_many(0, len(arena)) == TEXTS[:1]
+        with pytest.raises(Exception):
+            arena.truncate(2)
+        arena.reset()
+        assert len(arena) == 0
+        assert os.path.getsize(arena.data_file_path) == 0
@@ -0,0 +1,50 @@
+from src.memory.symbol_table import SymbolTable
+from src.memory.utils.hash import get_sha256
+from src.utils.config import ENT_NAMESPACE, PG_NAMESPACE
+
+
+class TestSymbolTable:
+    def test_intern(self):
+        symbols = SymbolTable()
+        assert symbols.entity_id("apple") == 0
+        assert symbols.paragraph_id("abc") == 1
+        assert symbols.entity_id("apple") == 0
+        assert symbols.key(0) == ENT_NAMESPACE + "-" + get_sha256("apple")
+        assert symbols.keys([1, 0]) == [PG_NAMESPACE + "-abc", symbols.key(0)]
+        # 已有的key（如先以hash加入的实体）补充文本后可按文本查找
+        key = ENT_NAMESPACE + "-" + get_sha256("pear")
+        assert symbols.intern(key) == 2
+        assert symbols.entity_id("pear") == 2
+        assert len(symbols) == 3 and key in symbols
+
+    def test_get_id_does_not_intern(self):
+        symbols = SymbolTable()
+        assert symbols.get_id("entity-missing") is None
+        assert len(symbols) == 0
+
+    def test_save_and_load(self, tmp_path):
+        symbols = SymbolTable()
+        symbols.entity_id("apple")
+        symbols.paragraph_id("abc")
+        symbols.entity_id("pear")
+        symbols.save_to_file(str(tmp_path / "symbols.parquet"))
+
+        # 以图中已有的key对象为准，不重复占用内存
+        canonical = [
+            "".join([PG_NAMESPACE, "-abc"]),
+            "".join([ENT_NAMESPACE, "-", get_sha256("pear")]),
+        ]
+        loaded = SymbolTable()
+        loaded.entity_id("stale")
+        loaded.load_from_file(str(tmp_path / "symbols.parquet"), canonical)
+        assert loaded.keys(range(3)) == symbols.keys(range(3))
+        assert loaded.key(1) is canonical[0]
+        assert loaded.key(2) is canonical[1]
+        assert loaded.entity_id("pear") == 2
+        assert loaded.get_id(symbols.key(0)) == 0
+        assert loaded.get_id(ENT_NAMESPACE + "-" + get_sha256("stale")) is None
+
+        # id不复用：新增节点排在已有节点之后
+        assert loaded.entity_id("banana") == 3
+        loaded.clear()
+        assert len(loaded) == 0
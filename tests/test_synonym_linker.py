@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from src.memory.embedding_store import EmbeddingStore
+from src.memory.symbol_table import SymbolTable
+from src.memory.synonym_linker import link_synonyms
+from .conftest import DIMENSION, FakeEmbeddingClient, fake_embedding
+
+THRESHOLD = 0.8
+TOP_K = 5
+
+
+class ClusterEmbeddingClient(FakeEmbeddingClient):
+    """同一簇（文本前缀相同）的文本得到相近的嵌入向量"""
+
+    def send_batch_embedding_request(self, model, texts):
+        embeddings = []
+        for text in texts:
+            center = np.asarray(fake_embedding(text.split("-")[0]))
+            noise = np.asarray(fake_embedding(text))
+            embeddings.append((center + 0.35 * noise).tolist())
+        return embeddings
+
+
+def legacy_link_synonyms(node_to_node, ent_hashes, ent_store, threshold, top_k):
+    """逐个实体TopK检索后按阈值过滤（原实现）"""
+    synonym_hash_set = set()
+    for ent_hash in ent_hashes:
+        if ent_hash in synonym_hash_set:
+            continue
+        row = ent_store.matrix.hash2row[ent_hash]
+        for res_ent_hash, similarity in ent_store.search_top_k(
+            ent_store.matrix.get_vectors(row), top_k
+        ):
+            if res_ent_hash == ent_hash or similarity < threshold:
+                continue
+            node_to_node[(res_ent_hash, ent_hash)] = similarity
+            node_to_node[(ent_hash, res_ent_hash)] = similarity
+            synonym_hash_set.add(res_ent_hash)
+
+
+@pytest.fixture
+def ent_store(embedding_config, tmp_path):
+    store = EmbeddingStore(ClusterEmbeddingClient(), "entity", str(tmp_path))
+    store.batch_insert_strs([f"c{c}-{i}" for c in range(8) for i in range(12)])
+    store.build_faiss_index()
+    return store
+
+
+class TestSynonymLinker:
+    @pytest.mark.parametrize("batch_size, max_workers", [(1024, 1), (7, 4)])
+    def test_matches_legacy(self, ent_store, batch_size, max_workers):
+        # 以打乱顺序的部分实体为查询（模拟新增实体）
+        order = np.random.default_rng(0).permutation(len(ent_store.matrix))[:60]
+        ent_hashes = ent_store.matrix.hashes[order].tolist()
+
+        expected = dict()
+        legacy_link_synonyms(expected, ent_hashes, ent_store, THRESHOLD, TOP_K)
+
+        symbols = SymbolTable()
+        ent_ids = [symbols.intern(ent_hash) for ent_hash in ent_hashes]
+        node_to_node = dict()
+        new_edge_cnt = link_synonyms(
+            node_to_node,
+            ent_ids,
+            symbols,
+            ent_store,
+            THRESHOLD,
+            TOP_K,
+            batch_size=batch_size,
+            max_workers=max_workers,
+        )
+        result = {
+            (symbols.key(src), symbols.key(dst)): weight
+            for (src, dst), weight in node_to_node.items()
+        }
+
+        assert 0 < len(expected) < len(ent_hashes) * (TOP_K - 1) * 2
+        # 边集合相同，权重仅有浮点误差
+        assert result.keys() == expected.keys()
+        assert max(abs(result[edge] - expected[edge]) for edge in expected) <= 3e-7
+        assert new_edge_cnt == len(expected) // 2
+
+    def test_empty(self, ent_store):
+        assert link_synonyms(dict(), [], SymbolTable(), ent_store, THRESHOLD, TOP_K) == 0